@@ -135,6 +135,13 @@ app.get('/health', (req, res) => {
 // ENDPOINTS PARA ROBÔS DE AUTOMAÇÃO
 // ==========================================================
 
+// Diretório e script de cada robô ('all' = supervisor com STF e STJ em paralelo)
+const ROBOTS = {
+  stf: { dir: 'stf_automation', script: 'run.py' },
+  stj: { dir: 'stj_automation', script: 'run.py' },
+  all: { dir: '.', script: 'supervisor.py' }
+};
+
 // Função auxiliar para executar robô
 const runRobot = (robotType) => {
   return new Promise((resolve, reject) => {
@@ -143,8 +150,8 @@ const runRobot = (robotType) => {
       return;
     }
 
-    const robotDir = robotType === 'stf' ? 'stf_automation' : 'stj_automation';
-    const robotPath = path.join(__dirname, robotDir);
+    const robot = ROBOTS[robotType];
+    const robotPath = path.join(__dirname, robot.dir);
     
     robotStatus = {
       status: 'running',
@@ -159,7 +166,7 @@ const runRobot = (robotType) => {
     console.log(`Iniciando robô ${robotType.toUpperCase()} em: ${robotPath}`);
 
     // Executa o script Python
-    robotProcess = spawn('python', ['run.py'], {
+    robotProcess = spawn('python', [robot.script], {
       cwd: robotPath,
       shell: true
     });
@@ -276,10 +283,93 @@ const runRobot = (robotType) => {
   });
 };
 
+// Portas dos robôs residentes (python run.py --daemon)
+const DAEMON_PORTS = {
+  stf: process.env.STF_DAEMON_PORT || 8765,
+  stj: process.env.STJ_DAEMON_PORT || 8766
+};
+
+// Executa job no robô residente, sem abrir novo processo Python/Chrome
+const runRobotViaDaemon = async (robotType) => {
+  if (robotProcess) {
+    throw new Error('Já existe um robô em execução');
+  }
+
+  const controller = new AbortController();
+  const response = await fetch(`http://127.0.0.1:${DAEMON_PORTS[robotType]}/jobs`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({}),
+    signal: controller.signal
+  });
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.erro || `Daemon respondeu ${response.status}`);
+  }
+
+  // Permite que /api/robot/stop cancele o stream do job
+  robotProcess = { kill: () => controller.abort() };
+  robotStatus = {
+    status: 'running',
+    robot: robotType,
+    processed: 0,
+    total: 0,
+    current: null,
+    message: `Robô ${robotType.toUpperCase()} (residente) em execução...`,
+    logs: []
+  };
+
+  (async () => {
+    let buffer = '';
+    try {
+      for await (const chunk of response.body) {
+        buffer += Buffer.from(chunk).toString();
+        const linhas = buffer.split('\n');
+        buffer = linhas.pop();
+
+        for (const linha of linhas.filter(Boolean)) {
+          const evento = JSON.parse(linha);
+          robotStatus.logs.push(linha);
+
+          if (evento.total !== undefined) robotStatus.total = evento.total;
+          if (evento.processed !== undefined) robotStatus.processed = evento.processed;
+          if (evento.current) robotStatus.current = evento.current;
+          if (evento.action) robotStatus.message = evento.action;
+          if (evento.evento === 'concluido') {
+            robotStatus.status = 'completed';
+            robotStatus.message = `Robô ${robotType.toUpperCase()} finalizado com sucesso`;
+          }
+          if (evento.evento === 'erro') {
+            robotStatus.status = 'error';
+            robotStatus.message = evento.mensagem;
+          }
+        }
+      }
+    } catch (error) {
+      if (robotStatus.status === 'running') {
+        robotStatus.status = 'error';
+        robotStatus.message = error.message;
+      }
+    } finally {
+      robotProcess = null;
+    }
+  })();
+
+  return { status: 'started', robot: robotType, daemon: true };
+};
+
+// Usa o robô residente quando ROBOT_DAEMON=true, senão abre novo processo
+const startRobot = (robotType) => {
+  return process.env.ROBOT_DAEMON === 'true'
+    ? runRobotViaDaemon(robotType)
+    : runRobot(robotType);
+};
+
 // Executar robô STF
 app.post('/api/robot/stf', async (req, res) => {
   try {
-    const result = await runRobot('stf');
+    const result = await startRobot('stf');
     res.json(result);
   } catch (error) {
     res.status(400).json({ error: error.message });
@@ -289,7 +379,17 @@ app.post('/api/robot/stf', async (req, res) => {
 // Executar robô STJ
 app.post('/api/robot/stj', async (req, res) => {
   try {
-    const result = await runRobot('stj');
+    const result = await startRobot('stj');
+    res.json(result);
+  } catch (error) {
+    res.status(400).json({ error: error.message });
+  }
+});
+
+// Executar STF e STJ em paralelo (supervisor; sem modo residente)
+app.post('/api/robot/all', async (req, res) => {
+  try {
+    const result = await runRobot('all');
     res.json(result);
   } catch (error) {
     res.status(400).json({ error: error.message });
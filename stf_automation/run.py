@@ -11,6 +11,11 @@ logger = get_logger(__name__)
 def main():
     """Função principal"""
     try:
+        if "--daemon" in sys.argv:
+            from src.daemon import serve
+            serve()
+            return 0
+        
         # Cria instância e executa
         automation = STFAutomation()
         automation.run()
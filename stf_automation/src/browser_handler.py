@@ -8,15 +8,30 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from typing import Optional
-import time
+from typing import Optional, List, Dict, Any
+from pathlib import Path
 
-from .config import HEADLESS, BROWSER_TIMEOUT, USER_AGENT, STF_URL
+from .config import (
+    HEADLESS, BROWSER_TIMEOUT, USER_AGENT, STF_URL, STF_HOST,
+    PAGE_LOAD_STRATEGY, READY_SELECTORS, CHROME_DISK_CACHE_MB, NETWORK_STATS
+)
 from .utils import get_logger, take_screenshot
+from .driver_cache import resolve_chromedriver
+from .rate_limiter import for_host
+from .resource_blocker import ResourceBlocker
+from .dom_wait import DomWaiter
+from .chrome_profile import acquire_profile, release_profile, CacheMetrics
 
 logger = get_logger(__name__)
 
+# Algum campo de pesquisa visível e habilitado (mesmo critério de wait_until_ready)
+READY_SCRIPT = """
+    return arguments[0].some(function (seletor) {
+        var el = document.querySelector(seletor);
+        return !!el && !el.disabled && el.offsetParent !== null;
+    });
+"""
+
 
 class BrowserHandler:
     """Gerenciador do navegador Chrome para portal STF"""
@@ -25,6 +40,10 @@ class BrowserHandler:
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
         self.timeout = BROWSER_TIMEOUT
+        self.blocker: Optional[ResourceBlocker] = None
+        self.profile_dir: Optional[Path] = None
+        self.cache_metrics: Optional[CacheMetrics] = None
+        self.waiter: Optional[DomWaiter] = None
     
     def start(self) -> bool:
         """
@@ -51,13 +70,37 @@ class BrowserHandler:
             options.add_argument("--window-size=1920,1080")
             options.add_argument("--start-maximized")
             
+            # Não espera subrecursos: a prontidão é decidida por wait_until_ready()
+            if PAGE_LOAD_STRATEGY in ("normal", "eager", "none"):
+                options.page_load_strategy = PAGE_LOAD_STRATEGY
+            
             if HEADLESS:
                 options.add_argument("--headless=new")
                 logger.info("Modo headless ativado")
             
-            service = Service(ChromeDriverManager().install())
+            # Perfil persistente: cache HTTP em disco reaproveitado entre execuções
+            # (o perfil principal se estiver livre, senão um clone para este worker)
+            self.profile_dir = acquire_profile()
+            if self.profile_dir:
+                options.add_argument(f"--user-data-dir={self.profile_dir}")
+                options.add_argument(f"--disk-cache-size={CHROME_DISK_CACHE_MB * 1024 * 1024}")
+                logger.info(f"Perfil do Chrome: {self.profile_dir}")
+            self.cache_metrics = CacheMetrics(self.profile_dir)
+            
+            # Eventos de rede para contabilizar recursos bloqueados/carregados
+            if NETWORK_STATS:
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
+            # Resolve ChromeDriver pelo cache local (rede só na primeira vez)
+            driver_path = resolve_chromedriver()
+            if not driver_path:
+                logger.error("ChromeDriver indisponível")
+                release_profile(self.profile_dir)
+                return False
+            service = Service(driver_path)
             self.driver = webdriver.Chrome(service=service, options=options)
             self.wait = WebDriverWait(self.driver, self.timeout)
+            self.waiter = DomWaiter(self.driver, self.timeout)
             
             # Remove flags de automação
             self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
@@ -68,11 +111,16 @@ class BrowserHandler:
                 """
             })
             
+            # Perfil de bloqueio de imagens, fontes, mídia e terceiros
+            self.blocker = ResourceBlocker(self.driver)
+            self.blocker.install()
+            
             logger.info("Navegador iniciado com sucesso")
             return True
             
         except Exception as e:
             logger.error(f"Erro ao iniciar navegador: {e}")
+            release_profile(self.profile_dir)
             return False
     
     def navigate_to_stf(self) -> bool:
@@ -84,18 +132,20 @@ class BrowserHandler:
         """
         try:
             logger.info(f"Navegando para {STF_URL}")
-            self.driver.get(STF_URL)
-            
-            # Aguarda página carregar
-            self.wait.until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            with for_host(STF_HOST).slot():
+                self.driver.get(STF_URL)
             
-            time.sleep(2)  # Aguarda estabilização
+            # Retorna assim que o campo de pesquisa estiver interagível
+            if not self.wait_until_ready():
+                take_screenshot(self.driver, "timeout_stf")
+                return False
             
             # Verifica se está na página correta
             if "stf.jus.br" in self.driver.current_url:
                 logger.info("Página do STF carregada com sucesso")
+                if not self._ensure_page_functions():
+                    logger.warning("Scripts da página ausentes mesmo sem bloqueio de recursos")
+                self.cache_metrics.record(self.driver)
                 return True
             else:
                 logger.error(f"URL inesperada: {self.driver.current_url}")
@@ -109,6 +159,42 @@ class BrowserHandler:
             logger.error(f"Erro ao navegar para STF: {e}")
             return False
     
+    def wait_until_ready(self, timeout: Optional[int] = None) -> bool:
+        """
+        Aguarda a pesquisa do STF ficar utilizável: campo de número único
+        (ou o seletor de tipo de pesquisa que o exibe) interagível
+        
+        Args:
+            timeout: Timeout personalizado (opcional)
+            
+        Returns:
+            True se a página ficou pronta
+        """
+        condicoes = [
+            EC.element_to_be_clickable((By.CSS_SELECTOR, seletor))
+            for seletor in READY_SELECTORS
+        ]
+        try:
+            WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=0.1).until(
+                EC.any_of(*condicoes)
+            )
+            return True
+        except TimeoutException:
+            logger.error("Timeout aguardando campo de pesquisa do STF")
+            return False
+    
+    def is_ready(self) -> bool:
+        """
+        Confere numa única chamada, sem esperar, se a aba está na página de pesquisa
+        
+        Returns:
+            True se algum campo de READY_SELECTORS está visível e habilitado
+        """
+        try:
+            return bool(self.driver.execute_script(READY_SCRIPT, READY_SELECTORS))
+        except Exception:
+            return False
+    
     def wait_for_element(self, by: By, value: str, timeout: Optional[int] = None) -> bool:
         """
         Aguarda elemento aparecer na página
@@ -130,13 +216,105 @@ class BrowserHandler:
             logger.warning(f"Elemento não encontrado: {value}")
             return False
     
+    def wait_any(self, condicoes: List[Dict[str, Any]], timeout: Optional[float] = None,
+                 nome: Optional[str] = None) -> int:
+        """
+        Aguarda dentro da página a primeira condição verdadeira (MutationObserver)
+        
+        Args:
+            condicoes: Lista de {"tipo", "alvo", "extra"}; tipos: text_gone,
+                text_present, element (extra=True exige visível), count, url
+            timeout: Timeout em segundos (usa padrão se None)
+            nome: Rótulo da espera nas estatísticas
+            
+        Returns:
+            Índice da condição satisfeita ou -1 (timeout/erro)
+        """
+        try:
+            return self.waiter.wait_any(condicoes, timeout, nome)
+        except Exception as e:
+            logger.error(f"Erro ao aguardar condição na página: {e}")
+            return -1
+    
+    def wait_text_gone(self, text: str, timeout: Optional[float] = None) -> bool:
+        """Aguarda o texto sumir da página"""
+        return self.wait_any([{"tipo": "text_gone", "alvo": text}], timeout, "texto sumir") == 0
+    
+    def wait_element(self, selector: str, timeout: Optional[float] = None, visible: bool = False) -> bool:
+        """Aguarda o elemento existir (ou ficar visível) na página"""
+        return self.wait_any(
+            [{"tipo": "element", "alvo": selector, "extra": visible}], timeout, f"elemento {selector}"
+        ) == 0
+    
+    def wait_count_change(self, selector: str, inicial: Optional[int] = None,
+                          timeout: Optional[float] = None) -> bool:
+        """Aguarda a quantidade de elementos mudar (inicial=None: conta no início da espera)"""
+        return self.wait_any(
+            [{"tipo": "count", "alvo": selector, "extra": inicial}], timeout, f"contagem {selector}"
+        ) == 0
+    
+    def wait_url_change(self, url_anterior: str, timeout: Optional[float] = None) -> bool:
+        """Aguarda a URL da aba deixar de ser url_anterior"""
+        return self.wait_any([{"tipo": "url", "alvo": url_anterior}], timeout, "mudança de URL") == 0
+    
+    def _ensure_page_functions(self) -> bool:
+        """
+        Confere se o bloqueio não removeu scripts que a pesquisa exige.
+        Se removeu, desativa o bloqueio e recarrega a página.
+        
+        Returns:
+            True se a página está íntegra
+        """
+        if not self.blocker or not self.blocker.enabled:
+            return True
+        
+        ausentes = self.blocker.missing_page_functions()
+        if not ausentes:
+            return True
+        
+        logger.warning(f"Funções ausentes com bloqueio ativo ({', '.join(ausentes)}) - recarregando sem bloqueio")
+        self.blocker.disable()
+        self.driver.refresh()
+        self.wait_until_ready()
+        return not self.blocker.missing_page_functions()
+    
+    def drain_network_log(self):
+        """Esvazia o log de performance nos contadores do bloqueio (uma vez por consulta)"""
+        if NETWORK_STATS and self.blocker and self.driver:
+            self.blocker.collect()
+    
+    def is_alive(self) -> bool:
+        """
+        Verifica se a sessão do navegador ainda responde
+        
+        Returns:
+            True se o Chrome e a aba atual respondem a comandos
+        """
+        if not self.driver:
+            return False
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception as e:
+            logger.warning(f"Navegador não responde: {e}")
+            return False
+    
     def close(self):
         """Fecha o navegador"""
         try:
             if self.driver:
+                if self.blocker:
+                    self.blocker.report()
+                if self.cache_metrics:
+                    self.cache_metrics.report()
+                if self.waiter:
+                    self.waiter.report()
                 logger.info("Fechando navegador...")
                 self.driver.quit()
                 self.driver = None
                 logger.info("Navegador fechado")
         except Exception as e:
             logger.error(f"Erro ao fechar navegador: {e}")
+        finally:
+            release_profile(self.profile_dir)
+            self.profile_dir = None
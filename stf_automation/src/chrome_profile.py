@@ -0,0 +1,225 @@
+"""
+Perfil persistente do Chrome (cache HTTP em disco entre execuções) e clones por worker
+"""
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Set
+
+from .config import CHROME_PROFILE_DIR, CHROME_PROFILE_CLONES_DIR, PERSISTENT_PROFILE
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Travas da instância que está usando o perfil: nunca vão para o clone
+LOCK_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile")
+CLONE_MARKER = ".clone_de"
+
+_lock = threading.Lock()
+_em_uso: Set[str] = set()  # Perfis abertos por este processo
+
+
+def _lock_is_live(perfil: Path) -> bool:
+    """
+    Verifica se outro Chrome está usando o perfil (trava não obsoleta)
+
+    Args:
+        perfil: Diretório do perfil
+
+    Returns:
+        True se há uma instância viva segurando o perfil
+    """
+    singleton = perfil / "SingletonLock"
+    if os.path.lexists(singleton):
+        # Linux/macOS: link simbólico "host-pid"
+        try:
+            pid = int(os.readlink(singleton).rsplit("-", 1)[1])
+            os.kill(pid, 0)
+            return True
+        except PermissionError:
+            return True
+        except (OSError, ValueError, IndexError):
+            return False
+
+    lockfile = perfil / "lockfile"
+    if lockfile.exists():
+        # Windows: o arquivo fica aberto (e não removível) enquanto o Chrome roda
+        try:
+            lockfile.unlink()
+            return False
+        except OSError:
+            return True
+    return False
+
+
+def _available(perfil: Path) -> bool:
+    return str(perfil) not in _em_uso and not _lock_is_live(perfil)
+
+
+def _copy_tree(origem: Path, destino: Path):
+    """
+    Copia o perfil usando clonagem copy-on-write quando o sistema de
+    arquivos permite (reflink no Linux, clonefile no macOS)
+    """
+    destino.mkdir(parents=True, exist_ok=True)
+    comando = None
+    if sys.platform.startswith("linux"):
+        comando = ["cp", "-a", "--reflink=auto", f"{origem}/.", str(destino)]
+    elif sys.platform == "darwin":
+        comando = ["cp", "-cR", f"{origem}/", str(destino)]
+
+    if comando:
+        try:
+            subprocess.run(comando, check=True, capture_output=True, timeout=120)
+            return
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Clonagem via cp indisponível ({e}) - copiando arquivo a arquivo")
+
+    shutil.copytree(origem, destino, ignore=shutil.ignore_patterns(*LOCK_FILES), dirs_exist_ok=True)
+
+
+def _golden_version() -> str:
+    """Identifica o estado do perfil principal (muda sempre que o Chrome o grava)"""
+    try:
+        return str((CHROME_PROFILE_DIR / "Local State").stat().st_mtime)
+    except OSError:
+        return "vazio"
+
+
+def clone_profile(destino: Path) -> Path:
+    """
+    Atualiza o clone do perfil principal, reaproveitando-o enquanto o
+    perfil principal não mudar
+
+    Args:
+        destino: Diretório do clone
+
+    Returns:
+        Caminho do clone pronto para --user-data-dir
+    """
+    versao = _golden_version()
+    marcador = destino / CLONE_MARKER
+    try:
+        if marcador.read_text(encoding="utf-8") == versao:
+            return destino
+    except OSError:
+        pass
+
+    inicio = time.perf_counter()
+    shutil.rmtree(destino, ignore_errors=True)
+    _copy_tree(CHROME_PROFILE_DIR, destino)
+    for nome in LOCK_FILES:
+        trava = destino / nome
+        if os.path.lexists(trava):
+            trava.unlink()
+    marcador.write_text(versao, encoding="utf-8")
+    logger.info(f"Perfil clonado em {destino.name} ({time.perf_counter() - inicio:.2f}s)")
+    return destino
+
+
+def acquire_profile() -> Optional[Path]:
+    """
+    Reserva um perfil para um novo Chrome: o perfil principal se estiver
+    livre, senão um clone (workers paralelos, outro robô já aberto)
+
+    Returns:
+        Diretório para --user-data-dir ou None (perfil temporário do Chrome)
+    """
+    if not PERSISTENT_PROFILE:
+        return None
+
+    with _lock:
+        if _available(CHROME_PROFILE_DIR):
+            _em_uso.add(str(CHROME_PROFILE_DIR))
+            return CHROME_PROFILE_DIR
+
+        n = 1
+        while not _available(CHROME_PROFILE_CLONES_DIR / f"worker-{n}"):
+            n += 1
+        destino = CHROME_PROFILE_CLONES_DIR / f"worker-{n}"
+        _em_uso.add(str(destino))
+
+    try:
+        return clone_profile(destino)
+    except Exception as e:
+        logger.warning(f"Não foi possível clonar o perfil ({e}) - usando perfil temporário")
+        release_profile(destino)
+        return None
+
+
+def release_profile(perfil: Optional[Path]):
+    """Libera o perfil para o próximo Chrome deste processo"""
+    if perfil:
+        with _lock:
+            _em_uso.discard(str(perfil))
+
+
+class CacheMetrics:
+    """
+    Mede, via Resource Timing API, quanto cada carga do portal trouxe da
+    rede e quanto veio do cache em disco, para comparar a primeira carga
+    com as seguintes (e execuções com perfil frio/quente).
+    """
+
+    SCRIPT = """
+        var entradas = performance.getEntriesByType('navigation')
+            .concat(performance.getEntriesByType('resource'));
+        var nav = performance.getEntriesByType('navigation')[0];
+        var r = {rede: 0, cache: 0, recursos: 0, do_cache: 0,
+                 duracao: nav ? Math.round(nav.domContentLoadedEventEnd) : 0};
+        entradas.forEach(function(e) {
+            if (!e.decodedBodySize) return;  // Terceiros sem Timing-Allow-Origin
+            r.recursos++;
+            if (e.transferSize === 0) { r.do_cache++; r.cache += e.decodedBodySize; }
+            else { r.rede += e.transferSize; }
+        });
+        return r;
+    """
+
+    def __init__(self, perfil: Optional[Path]):
+        self.perfil = perfil
+        self.cargas: List[Dict[str, int]] = []
+
+    def record(self, driver):
+        """Registra a carga atual da aba (chamar após a página ficar pronta)"""
+        try:
+            carga = driver.execute_script(self.SCRIPT)
+        except Exception as e:
+            logger.debug(f"Resource Timing indisponível: {e}")
+            return
+        if not carga:
+            return
+        self.cargas.append(carga)
+        logger.debug(
+            f"Carga {len(self.cargas)}: {carga['duracao']} ms, "
+            f"{carga['rede'] / 1024:.0f} KB da rede, {carga['cache'] / 1024:.0f} KB do cache "
+            f"({carga['do_cache']}/{carga['recursos']} recursos)"
+        )
+
+    def report(self):
+        """Registra no log a primeira carga contra a média das seguintes"""
+        if not self.cargas:
+            return
+
+        primeira = self.cargas[0]
+        origem = "perfil persistente" if self.perfil else "perfil temporário"
+        logger.info(
+            f"Primeira carga ({origem}): {primeira['duracao']} ms, "
+            f"{primeira['rede'] / 1024:.0f} KB da rede, {primeira['cache'] / 1024:.0f} KB do cache"
+        )
+
+        seguintes = self.cargas[1:]
+        if not seguintes:
+            return
+        n = len(seguintes)
+        duracao = sum(c["duracao"] for c in seguintes) / n
+        rede = sum(c["rede"] for c in seguintes) / n
+        logger.info(
+            f"Cargas seguintes ({n}): média {duracao:.0f} ms, {rede / 1024:.0f} KB da rede | "
+            f"economia por carga: {primeira['duracao'] - duracao:.0f} ms, "
+            f"{(primeira['rede'] - rede) / 1024:.0f} KB"
+        )
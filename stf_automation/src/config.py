@@ -16,9 +16,95 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")  # Usa service key para leitura
 # Browser
 HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"
 BROWSER_TIMEOUT = int(os.getenv("BROWSER_TIMEOUT", "60"))
+# normal = espera todos os recursos; eager = só o DOM; none = retorna imediatamente.
+# Em eager/none a navegação termina pelo predicado de prontidão do portal.
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "eager").lower()
+# Perfil persistente em CHROME_PROFILE_DIR: cache HTTP e sessão reaproveitados entre execuções
+PERSISTENT_PROFILE = os.getenv("PERSISTENT_PROFILE", "True").lower() == "true"
+CHROME_DISK_CACHE_MB = int(os.getenv("CHROME_DISK_CACHE_MB", "256"))
+
+# Pool de navegadores pré-aquecidos
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_POOL_ACQUIRE_TIMEOUT = int(os.getenv("DRIVER_POOL_ACQUIRE_TIMEOUT", "120"))
+
+# Cache local do ChromeDriver (compartilhado entre os robôs STF e STJ)
+DRIVER_CACHE_DIR = Path(os.getenv("DRIVER_CACHE_DIR", str(Path.home() / ".monitor_chromedriver")))
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")  # Caminho explícito, ignora o cache
+DRIVER_OFFLINE = os.getenv("DRIVER_OFFLINE", "False").lower() == "true"
 
 # URLs
 STF_URL = "https://portal.stf.jus.br/"
+STF_HOST = "portal.stf.jus.br"
+
+STF_PROCESSOS_URL = "https://portal.stf.jus.br/processos/"
+
+# Pesquisa por URL (listarProcessos.asp?numeroUnico=) em vez do formulário + volta à página inicial
+# Desligada por padrão: ainda não validada contra o portal
+URL_SEARCH = os.getenv("URL_SEARCH", "False").lower() == "true"
+
+# Motor de consulta: "selenium" (navegador) ou "http" (fragmentos das abas direto, navegador só como fallback)
+STF_ENGINE = os.getenv("STF_ENGINE", "selenium").lower()
+HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "20"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+
+# Modo pipeline: pesquisa/extração no navegador e gravação no banco em etapas assíncronas
+# ligadas por filas limitadas (a gravação de um item corre junto com a pesquisa do próximo)
+PIPELINE = os.getenv("PIPELINE", "False").lower() == "true"
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))  # Itens em espera entre etapas
+
+# Página utilizável quando qualquer um destes campos da pesquisa estiver interagível
+# (o campo de número único só aparece após escolher o tipo de pesquisa)
+READY_SELECTORS = ["#pesquisaPrincipalNumeroUnico", "#tipo-pesquisa-processo"]
+
+# Prazo (segundos) para a página de detalhe carregar partes e aba Decisões antes da extração
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "6"))
+
+# Cadeias de seletores por campo (CSS ou XPath), reordenadas pela taxa de acerto
+# observada; cada cadeia é testada numa única chamada com prazo curto
+SELECTOR_PROBE_TIMEOUT = float(os.getenv("SELECTOR_PROBE_TIMEOUT", "2"))
+SELECTOR_CHAINS = {
+    "aba_decisoes": [
+        "li.li-decisoes a[href='#decisoes']",
+        "a[href='#decisoes']",
+        "//a[contains(@href, '#decisoes')]//span[contains(text(), 'Decisões')]/..",
+        "//span[text()='Decisões']/..",
+    ],
+    "movimentacao": [
+        "#decisoes > div > div:first-child",
+        "#decisoes ul li:first-child",
+        "div[id='decisoes'] > div",
+    ],
+    "numero_superior": [
+        "//section//div[@class='row']//div[@class='col-md-9']//h2",
+        "//section//h2",
+        ".processo-titulo",
+    ],
+}
+
+# Modo daemon (python run.py --daemon): navegador residente recebendo jobs via HTTP local
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("STF_DAEMON_PORT", "8765"))
+
+# Bloqueio de recursos via CDP (imagens, fontes, mídia e hosts de terceiros)
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "True").lower() == "true"
+# Log de performance do ChromeDriver (contadores de rede do relatório de bloqueio)
+NETWORK_STATS = os.getenv("NETWORK_STATS", "True").lower() == "true"
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+]
+BLOCKED_HOSTS = [
+    "fonts.googleapis.com", "fonts.gstatic.com", "use.fontawesome.com",
+    "vlibras.gov.br", "www.googletagmanager.com", "www.google-analytics.com",
+    "cdn.appdynamics.com", "noticias-stf-wp-prd.s3.sa-east-1.amazonaws.com",
+    "www.youtube.com",
+]
+# Hosts isentos de BLOCKED_HOSTS (jQuery UI e overlay de carregamento usados pela
+# pesquisa; não é lista de permissão: os demais hosts carregam)
+# e funções JS que a página precisa expor após o carregamento
+ALLOWED_HOSTS = ["portal.stf.jus.br", "code.jquery.com", "cdn.jsdelivr.net"]
+REQUIRED_PAGE_FUNCTIONS = ["jQuery"]
 
 # Configurações gerais
 MAX_RETRIES = 3
@@ -31,7 +117,22 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 BASE_DIR = Path(__file__).parent.parent
 LOGS_DIR = BASE_DIR / "logs"
 SCREENSHOTS_DIR = BASE_DIR / "screenshots"
+CHROME_PROFILE_DIR = BASE_DIR / "chrome_profile"
+CHROME_PROFILE_CLONES_DIR = BASE_DIR / "chrome_profile_clones"
+# Estratégia de preenchimento de campos aprendida (ver input_fill.py)
+INPUT_FILL_STATE_FILE = BASE_DIR / "input_fill.json"
+# Cache tjsp → identificador do processo no portal (SQLite); False = sempre pesquisar
+ID_CACHE = os.getenv("ID_CACHE", "True").lower() == "true"
+ID_CACHE_FILE = BASE_DIR / "identificadores.db"
+
+# Limite de requisições por host (token bucket comum a threads e processos)
+RATE_LIMIT = os.getenv("RATE_LIMIT", "True").lower() == "true"
+RATE_LIMIT_PER_SEC = float(os.getenv("RATE_LIMIT_PER_SEC", "2"))        # Taxa sustentada
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "4"))            # Requisições seguidas (detalhe + abas)
+RATE_LIMIT_MIN_PER_SEC = float(os.getenv("RATE_LIMIT_MIN_PER_SEC", "0.1"))  # Piso após erros/429/503
+RATE_LIMIT_FILE = BASE_DIR / "rate_limit.db"
 
 # Criar diretórios se não existirem
 LOGS_DIR.mkdir(exist_ok=True)
 SCREENSHOTS_DIR.mkdir(exist_ok=True)
+CHROME_PROFILE_DIR.mkdir(exist_ok=True)
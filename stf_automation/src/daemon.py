@@ -0,0 +1,217 @@
+"""
+Modo daemon: robô STF residente com navegador já no portal
+
+Inicie com `python run.py --daemon` e envie jobs via HTTP local:
+
+    POST /jobs  {}                              -> varredura completa (Em trâmite)
+    POST /jobs  {"tjsps": ["...", "..."]}       -> apenas os processos indicados
+    GET  /health                                -> estado do navegador
+
+A resposta de /jobs é um stream NDJSON com um evento por atualização de
+progresso e um evento final com as estatísticas.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Optional
+
+from .config import DAEMON_HOST, DAEMON_PORT
+from .main import STFAutomation
+from .driver_pool import shared_pool, close_shared_pool
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StreamProgress:
+    """
+    Substituto da ProgressWindow que envia cada atualização como uma linha
+    JSON para o cliente HTTP do job
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.connected = True
+
+    def send(self, evento: str, **dados):
+        """Escreve um evento no stream (ignora cliente desconectado)"""
+        if not self.connected:
+            return
+        linha = json.dumps({"evento": evento, **dados}, ensure_ascii=False, default=str)
+        try:
+            self.wfile.write(linha.encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError:
+            self.connected = False
+            logger.warning("Cliente do job desconectou - processamento continua")
+
+    def update(self, **kwargs):
+        self.send("progresso", **kwargs)
+
+    def complete(self, success: bool = True):
+        self.send("status", status="Concluído" if success else "Falhou")
+
+    def close(self):
+        pass
+
+
+class RobotDaemon:
+    """Mantém uma STFAutomation com navegador aberto e executa jobs em série"""
+
+    def __init__(self):
+        self.automation = STFAutomation()
+        self.job_lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Abre o navegador e leva ao portal uma única vez (e aquece o pool de reserva)"""
+        if not self.automation.setup():
+            return False
+        shared_pool()
+        return True
+
+    def select_processos(self, tjsps: Optional[List[str]]) -> List[Dict]:
+        """
+        Monta a lista de trabalho do job
+
+        Args:
+            tjsps: Números a processar (None = varredura completa)
+
+        Returns:
+            Lista de processos no formato do Supabase
+        """
+        if not tjsps:
+            return self.automation.supabase.get_processos_stf_pendentes()
+
+        pedidos = [t.strip('%') for t in tjsps]
+        em_tramite = {
+            p.get("tjsp", "").strip('%'): p
+            for p in self.automation.supabase.get_processos_stf_pendentes()
+        }
+        return [em_tramite.get(t, {"tjsp": t, "situacao": "Em trâmite"}) for t in pedidos]
+
+    def run_job(self, tjsps: Optional[List[str]], progress: StreamProgress) -> bool:
+        """
+        Executa um job reaproveitando o navegador residente
+
+        Args:
+            tjsps: Números a processar (None = varredura completa)
+            progress: Destino dos eventos de progresso
+
+        Returns:
+            True se o job foi executado
+        """
+        automation = self.automation
+        inicio = time.perf_counter()
+
+        automation.reset_stats()
+        automation.stats["tempo_inicio"] = datetime.now()
+        automation.progress_window = progress
+
+        try:
+            if not automation.ensure_ready():
+                progress.send("erro", mensagem="Navegador não ficou pronto")
+                return False
+
+            processos = self.select_processos(tjsps)
+            progress.send("inicio", total=len(processos),
+                          pronto_em=round(time.perf_counter() - inicio, 3))
+
+            if processos:
+                automation.run_batch(processos)
+            return True
+        finally:
+            automation.progress_window = None
+            progress.send("concluido", stats=automation.stats,
+                          duracao=round(time.perf_counter() - inicio, 1))
+
+    def close(self):
+        self.automation.browser.close()
+        if self.automation.http_engine:
+            self.automation.http_engine.close()
+        if self.automation.id_cache:
+            self.automation.id_cache.report()
+        close_shared_pool()
+
+
+def _make_handler(daemon: RobotDaemon):
+    """Cria o handler HTTP ligado à instância do daemon"""
+
+    class JobHandler(BaseHTTPRequestHandler):
+        def _json(self, status: int, corpo: Dict):
+            dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._json(404, {"erro": "rota não encontrada"})
+                return
+            self._json(200, {
+                "robo": "STF",
+                "navegador": daemon.automation.browser.is_alive(),
+                "ocupado": daemon.job_lock.locked(),
+            })
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                self._json(404, {"erro": "rota não encontrada"})
+                return
+
+            try:
+                tamanho = int(self.headers.get("Content-Length", 0))
+                corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+            except ValueError:
+                self._json(400, {"erro": "JSON inválido"})
+                return
+
+            tjsps = corpo.get("tjsps")
+            if corpo.get("tjsp"):
+                tjsps = [corpo["tjsp"]]
+
+            if not daemon.job_lock.acquire(blocking=False):
+                self._json(409, {"erro": "Já existe um job em execução"})
+                return
+
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                self.end_headers()
+                daemon.run_job(tjsps, StreamProgress(self.wfile))
+            except Exception as e:
+                logger.error(f"Erro no job: {e}")
+            finally:
+                daemon.job_lock.release()
+
+        def log_message(self, format, *args):
+            logger.debug(f"daemon: {format % args}")
+
+    return JobHandler
+
+
+def serve(host: str = DAEMON_HOST, port: int = DAEMON_PORT):
+    """
+    Inicia o daemon e atende jobs até Ctrl+C
+
+    Args:
+        host: Endereço de escuta (padrão somente local)
+        port: Porta HTTP
+    """
+    daemon = RobotDaemon()
+    if not daemon.start():
+        logger.error("Falha ao preparar navegador do daemon")
+        return
+
+    server = ThreadingHTTPServer((host, port), _make_handler(daemon))
+    logger.info(f"Daemon STF aguardando jobs em http://{host}:{port}/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Daemon interrompido pelo usuário")
+    finally:
+        server.server_close()
+        daemon.close()
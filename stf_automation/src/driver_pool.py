@@ -0,0 +1,329 @@
+"""
+Pool de navegadores Chrome pré-aquecidos no portal STF
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, List, Dict
+
+from .browser_handler import BrowserHandler
+from .config import DRIVER_POOL_SIZE, DRIVER_POOL_ACQUIRE_TIMEOUT, STF_URL
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Espera entre tentativas de abrir um navegador do pool (dobra a cada falha)
+LAUNCH_RETRY_BASE_S = 5
+LAUNCH_RETRY_MAX_S = 60
+# Tentativas por vaga antes de desistir (a vaga volta a ser preenchida no próximo descarte)
+LAUNCH_MAX_ATTEMPTS = 3
+
+
+class DriverPool:
+    """
+    Mantém N navegadores já abertos na página inicial do STF.
+
+    Os navegadores são emprestados ao daemon quando a sessão cai, no lugar
+    de reabrir o Chrome a frio. O pool nunca passa de N Chromes entre
+    livres, emprestados e em abertura: a vaga de um navegador descartado é
+    reposta em segundo plano. Uma abertura que falha é tentada de novo, com
+    espera crescente, até LAUNCH_MAX_ATTEMPTS vezes.
+    """
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle: "queue.Queue[BrowserHandler]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._all: List[BrowserHandler] = []
+        self._leased: Dict[int, float] = {}
+        self._launching = 0
+        self._closed = False
+        self.stats: Dict[str, List[float]] = {
+            "launch_times": [],  # Segundos para abrir Chrome + portal
+            "lease_times": [],   # Segundos que cada empréstimo ficou em uso
+        }
+        self.replaced = 0
+        self.launch_failures = 0
+
+    def start(self) -> bool:
+        """
+        Abre os N navegadores em paralelo e aguarda ficarem prontos
+
+        Returns:
+            True se pelo menos um navegador ficou disponível
+        """
+        logger.info(f"Aquecendo pool com {self.size} navegador(es)...")
+        with self._lock:
+            self._launching += self.size
+        threads = [
+            threading.Thread(target=self._launch_into_pool, daemon=True)
+            for _ in range(self.size)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        disponiveis = self._idle.qsize()
+        logger.info(f"Pool pronto: {disponiveis}/{self.size} navegador(es) disponíveis")
+        return disponiveis > 0
+
+    def _launch(self) -> Optional[BrowserHandler]:
+        """Abre um navegador e leva até a página de consulta"""
+        inicio = time.perf_counter()
+        browser = BrowserHandler()
+
+        if not browser.start() or not browser.navigate_to_stf():
+            browser.close()
+            with self._lock:
+                self.launch_failures += 1
+            logger.error("Falha ao abrir navegador para o pool")
+            return None
+
+        duracao = time.perf_counter() - inicio
+        with self._lock:
+            self.stats["launch_times"].append(duracao)
+            self._all.append(browser)
+        logger.info(f"Navegador do pool pronto em {duracao:.1f}s")
+        return browser
+
+    def _launch_into_pool(self, tentativa: int = 0):
+        """
+        Abre um navegador e o coloca na fila de disponíveis (nova tentativa se
+        falhar, até LAUNCH_MAX_ATTEMPTS). A vaga já foi contada em _launching.
+        """
+        browser = None if self._closed else self._launch()
+        if browser is None and not self._closed and tentativa + 1 < LAUNCH_MAX_ATTEMPTS:
+            espera = min(LAUNCH_RETRY_MAX_S, LAUNCH_RETRY_BASE_S * 2 ** tentativa)
+            logger.warning(f"Nova tentativa de abrir navegador do pool em {espera}s")
+            timer = threading.Timer(espera, self._launch_into_pool, args=(tentativa + 1,))
+            timer.daemon = True
+            timer.start()
+            return
+
+        with self._lock:
+            self._launching -= 1
+        if browser is None:
+            if not self._closed:
+                logger.error(f"Navegador do pool não abriu após {LAUNCH_MAX_ATTEMPTS} tentativas - vaga fica vazia")
+            return
+        if self._closed:
+            self._discard(browser)
+            return
+        self._idle.put(browser)
+
+    def _live(self) -> int:
+        """Navegadores do pool abertos (livres ou emprestados) mais os em abertura (chamar com _lock)"""
+        return len(self._all) + self._launching
+
+    def _refill(self):
+        """Abre substitutos em segundo plano até o pool voltar a ter N navegadores"""
+        with self._lock:
+            if self._closed:
+                return
+            faltam = self.size - self._live()
+            if faltam <= 0:
+                return
+            self._launching += faltam
+            self.replaced += faltam
+        for _ in range(faltam):
+            threading.Thread(target=self._launch_into_pool, daemon=True).start()
+
+    def _discard(self, browser: BrowserHandler):
+        """Fecha e remove navegador do pool (e repõe a vaga)"""
+        with self._lock:
+            if browser in self._all:
+                self._all.remove(browser)
+        browser.close()
+        self._refill()
+
+    def acquire(self, timeout: int = DRIVER_POOL_ACQUIRE_TIMEOUT) -> Optional[BrowserHandler]:
+        """
+        Empresta um navegador pronto
+
+        Args:
+            timeout: Segundos máximos de espera por um navegador livre
+
+        Returns:
+            BrowserHandler ou None se nenhum ficou disponível
+        """
+        prazo = time.monotonic() + timeout
+        while True:
+            try:
+                browser = self._idle.get(timeout=min(0.5, max(0.0, prazo - time.monotonic())))
+            except queue.Empty:
+                with self._lock:
+                    # Todos emprestados e nenhum abrindo: esperar não adianta
+                    sem_chance = self._launching == 0 and self._idle.empty()
+                if sem_chance or time.monotonic() >= prazo:
+                    logger.warning("Nenhum navegador disponível no pool")
+                    return None
+                continue
+            if browser.is_alive():
+                break
+            logger.warning("Navegador ocioso do pool morreu - descartado")
+            self._discard(browser)
+        with self._lock:
+            self._leased[id(browser)] = time.perf_counter()
+        return browser
+
+    def release(self, browser: BrowserHandler, descartar: bool = False):
+        """
+        Devolve navegador ao pool (ou o fecha, se o pool já tem N navegadores)
+
+        Args:
+            browser: Navegador obtido via acquire() ou aberto fora do pool
+            descartar: True para fechar em vez de reaproveitar (reciclagem)
+        """
+        with self._lock:
+            inicio = self._leased.pop(id(browser), None)
+            if inicio is not None:
+                self.stats["lease_times"].append(time.perf_counter() - inicio)
+
+        if self._closed or descartar:
+            self._discard(browser)
+            return
+
+        if not browser.is_alive():
+            logger.warning("Navegador devolvido quebrado - descartado")
+            self._discard(browser)
+            return
+
+        with self._lock:
+            # Navegador aberto fora do pool só entra se houver vaga
+            sem_vaga = browser not in self._all and self._live() >= self.size
+        if sem_vaga:
+            self._discard(browser)
+            return
+
+        # Garante que o próximo worker receba o navegador no portal
+        try:
+            na_consulta = STF_URL.split("?")[0] in browser.driver.current_url
+        except Exception:
+            na_consulta = False
+        if not na_consulta and not browser.navigate_to_stf():
+            self._discard(browser)
+            return
+
+        with self._lock:
+            if browser not in self._all:
+                self._all.append(browser)
+        self._idle.put(browser)
+
+    @contextmanager
+    def lease(self, timeout: int = DRIVER_POOL_ACQUIRE_TIMEOUT):
+        """
+        Context manager que empresta e devolve um navegador
+
+        Uso:
+            with pool.lease() as browser:
+                ...
+        """
+        browser = self.acquire(timeout)
+        try:
+            yield browser
+        finally:
+            if browser is not None:
+                self.release(browser)
+
+    def report(self):
+        """Registra no log os tempos de abertura e de empréstimo"""
+        with self._lock:
+            launch = list(self.stats["launch_times"])
+            lease = list(self.stats["lease_times"])
+
+        logger.info("=" * 60)
+        logger.info("POOL DE NAVEGADORES")
+        if launch:
+            logger.info(
+                f"  Aberturas: {len(launch)} | média {sum(launch)/len(launch):.1f}s | "
+                f"máx {max(launch):.1f}s"
+            )
+        if lease:
+            logger.info(
+                f"  Empréstimos: {len(lease)} | média {sum(lease)/len(lease):.1f}s | "
+                f"máx {max(lease):.1f}s"
+            )
+        logger.info(f"  Substituídos: {self.replaced} | Falhas de abertura: {self.launch_failures}")
+        logger.info("=" * 60)
+
+    def close(self):
+        """
+        Fecha os navegadores livres do pool. Os emprestados continuam com
+        quem os pegou e são fechados na devolução (release) ou pelo dono.
+        """
+        self._closed = True
+        livres = []
+        while True:
+            try:
+                livres.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for browser in livres:
+            self._discard(browser)
+        with self._lock:
+            emprestados = len(self._leased)
+        if emprestados:
+            logger.info(f"Pool encerrado com {emprestados} navegador(es) ainda emprestado(s)")
+        logger.info("Pool de navegadores encerrado")
+
+
+_shared: Optional[DriverPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> Optional[DriverPool]:
+    """
+    Pool do processo, criado na primeira chamada e aquecido em segundo plano
+
+    Returns:
+        DriverPool ou None se DRIVER_POOL_SIZE for 0 (navegadores abertos a frio)
+    """
+    global _shared
+    if DRIVER_POOL_SIZE <= 0:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = DriverPool()
+            threading.Thread(target=_shared.start, name="driver-pool", daemon=True).start()
+        return _shared
+
+
+def lease_browser() -> Optional[BrowserHandler]:
+    """
+    Empresta um navegador já no portal do pool do processo. Não cria o pool:
+    sem ele (execução curta, motor HTTP) quem chama abre o Chrome a frio.
+
+    Returns:
+        BrowserHandler ou None (pool não iniciado ou sem navegador livre)
+    """
+    with _shared_lock:
+        pool = _shared
+    return pool.acquire() if pool else None
+
+
+def release_browser(browser: BrowserHandler, descartar: bool = False):
+    """
+    Devolve um navegador ao pool do processo (ou fecha, sem pool)
+
+    Args:
+        browser: Navegador a devolver
+        descartar: True para fechar em vez de reaproveitar
+    """
+    with _shared_lock:
+        pool = _shared
+    if pool:
+        pool.release(browser, descartar=descartar)
+    else:
+        browser.close()
+
+
+def close_shared_pool():
+    """Fecha o pool do processo e registra os tempos no log"""
+    global _shared
+    with _shared_lock:
+        pool, _shared = _shared, None
+    if pool:
+        pool.report()
+        pool.close()
@@ -0,0 +1,263 @@
+"""
+Consulta ao portal STF por HTTP direto (sem navegador)
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import requests
+from lxml import html
+from requests.adapters import HTTPAdapter
+
+from .config import STF_PROCESSOS_URL, STF_HOST, HTTP_TIMEOUT, HTTP_POOL_SIZE, USER_AGENT
+from .rate_limiter import for_host
+from .utils import get_logger, escape_json_string, format_processo_number
+
+logger = get_logger(__name__)
+
+# Fragmentos carregados pela página de detalhe (um por aba)
+ABAS = {
+    "partes": "abaPartes.asp",
+    "decisoes": "abaDecisoes.asp",
+    "andamentos": "abaAndamentos.asp",
+}
+
+INCIDENTE_PATTERN = re.compile(r"detalhe\.asp\?incidente=(\d+)")
+
+
+def _texto(el) -> str:
+    """Texto do elemento com espaços normalizados (equivalente a innerText.trim())"""
+    return " ".join(el.text_content().split())
+
+
+def is_not_found(doc: html.HtmlElement) -> bool:
+    """Página de 'Processo não encontrado'"""
+    return any("Processo não encontrado" in _texto(el) for el in doc.cssselect(".message-404"))
+
+
+def parse_incidente(doc: html.HtmlElement) -> Optional[str]:
+    """
+    Incidente do processo: campo oculto da página de detalhe ou, numa lista
+    de resultados, o único link de detalhe
+
+    Returns:
+        Número do incidente ou None se ausente/ambíguo
+    """
+    campo = doc.cssselect("input#incidente")
+    if campo and campo[0].get("value"):
+        return campo[0].get("value").strip()
+
+    encontrados = {
+        m.group(1)
+        for a in doc.cssselect("a[href]")
+        for m in [INCIDENTE_PATTERN.search(a.get("href"))] if m
+    }
+    return encontrados.pop() if len(encontrados) == 1 else None
+
+
+def parse_numero_superior(doc: html.HtmlElement) -> str:
+    """
+    Classe e número do processo no cabeçalho do detalhe, cortado como no
+    EXTRACTOR_SCRIPT do scraper (11 caracteres para ARE, 10 demais)
+    """
+    campo = doc.cssselect("input#classe-numero-processo")
+    numero = (campo[0].get("value") or "").strip() if campo else ""
+    if not numero:
+        titulo = doc.cssselect(".processo-titulo")
+        numero = titulo[0].text.replace("\xa0", " ").strip() if titulo and titulo[0].text else ""
+    if not numero:
+        return "-"
+    return numero[:11] if "ARE" in numero else numero[:10]
+
+
+def parse_partes(fragmento: html.HtmlElement) -> str:
+    """Partes resumidas no formato 'SIGLA - NOME • ...' (mesmo do script do scraper)"""
+    resultado = []
+    for linha in fragmento.cssselect("#partes-resumidas > div"):
+        filhos = list(linha)
+        if len(filhos) < 2:
+            continue
+        sigla = re.sub(r"\(.*?\)", "", _texto(filhos[0]))
+        nome = _texto(filhos[1])
+        if sigla and nome:
+            resultado.append(f"{sigla} - {nome}")
+    return escape_json_string(" • ".join(resultado)) if resultado else "-"
+
+
+def parse_movimentacao(fragmento: html.HtmlElement) -> str:
+    """Primeiro item da aba Decisões"""
+    for seletor in (".processo-andamentos > .andamento-item", ".andamento-item", "ul li"):
+        itens = fragmento.cssselect(seletor)
+        if itens and _texto(itens[0]):
+            return escape_json_string(_texto(itens[0]))
+    return "-"
+
+
+def parse_decisao(fragmento: html.HtmlElement) -> str:
+    """Primeiro item da timeline (mesmo XPath do EXTRACTOR_SCRIPT do scraper)"""
+    itens = fragmento.xpath("//ul[contains(@class, 'timeline')]//li[1]//div[@class='description']")
+    if itens and _texto(itens[0]):
+        return escape_json_string(_texto(itens[0]))
+    return "-"
+
+
+class STFHttpEngine:
+    """
+    Resolve o número único no incidente do processo e busca os fragmentos
+    das abas (partes, decisões, andamentos) em paralelo, numa sessão HTTP
+    reaproveitada, sem clicar em abas nem navegar.
+
+    Retorna os mesmos campos gravados por STFAutomation._processar_encontrado.
+    Quando a resposta não se parece com nenhuma das páginas conhecidas,
+    lookup() retorna None e o item deve seguir pelo navegador.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "pt-BR,pt;q=0.9",
+        })
+        self.pool = ThreadPoolExecutor(max_workers=len(ABAS) + 1, thread_name_prefix="stf-http")
+        self.stats = {"consultas": 0, "respondidas": 0, "fallbacks": 0, "requisicoes": 0, "ms": 0.0}
+
+    def _get(self, url: str, params: Optional[Dict[str, str]] = None) -> Optional[html.HtmlElement]:
+        """
+        Busca uma página ou fragmento e devolve a árvore HTML
+
+        Returns:
+            Documento parseado ou None se o status não for 200
+        """
+        limiter = for_host(STF_HOST)
+        with limiter.slot():
+            inicio = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT,
+                                            headers={"Referer": STF_PROCESSOS_URL})
+            except requests.Timeout:
+                limiter.penalize("timeout na requisição")
+                raise
+            finally:
+                self.stats["requisicoes"] += 1
+                self.stats["ms"] += (time.perf_counter() - inicio) * 1000
+        limiter.feedback_status(response.status_code)
+
+        # A página de não encontrado pode vir com 404
+        if response.status_code not in (200, 404) or not response.content.strip():
+            logger.warning(f"Resposta inesperada do STF: HTTP {response.status_code} em {response.url}")
+            return None
+        return html.fromstring(response.content, base_url=response.url)
+
+    def _read_incidente(self, incidente: str, detalhe: Optional[html.HtmlElement] = None,
+                        numero: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        Busca em paralelo os fragmentos das abas (e o detalhe, se ainda não
+        veio) e monta os campos do processo
+
+        Args:
+            incidente: Incidente do processo no portal
+            detalhe: Página de detalhe já obtida pela pesquisa
+            numero: Número único a conferir no detalhe (entrada do cache)
+
+        Returns:
+            Campos do processo ou None se algum fragmento essencial faltou
+            (ou o detalhe não é mais do processo esperado)
+        """
+        link = f"{STF_PROCESSOS_URL}detalhe.asp?incidente={incidente}"
+        futuros = {
+            aba: self.pool.submit(self._get, STF_PROCESSOS_URL + pagina, {"incidente": incidente})
+            for aba, pagina in ABAS.items()
+        }
+        if detalhe is None or not detalhe.cssselect("input#classe-numero-processo"):
+            futuros["detalhe"] = self.pool.submit(self._get, link)
+        fragmentos = {aba: futuro.result() for aba, futuro in futuros.items()}
+        detalhe = fragmentos.get("detalhe", detalhe)
+
+        if detalhe is None or fragmentos["partes"] is None or fragmentos["decisoes"] is None:
+            return None
+        if numero and (parse_incidente(detalhe) != incidente
+                       or numero not in re.sub(r"\D", "", detalhe.text_content())):
+            return None
+
+        andamentos = fragmentos["andamentos"]
+        return {
+            "reu": parse_partes(fragmentos["partes"]),
+            "superior": parse_numero_superior(detalhe),
+            "decisao": parse_decisao(andamentos) if andamentos is not None else "-",
+            "movimentacao": parse_movimentacao(fragmentos["decisoes"]),
+            "link": link,
+        }
+
+    def lookup(self, tjsp: str, cache=None) -> Optional[Dict[str, Any]]:
+        """
+        Pesquisa um processo pelo número único (ou direto pelo incidente do
+        cache de identificadores)
+
+        Args:
+            tjsp: Número TJSP do processo
+            cache: IdentifierCache opcional; o incidente encontrado é gravado nele
+
+        Returns:
+            {"encontrado": bool, "dados": dict} ou None se o item deve ir para o navegador
+        """
+        self.stats["consultas"] += 1
+        try:
+            numero = format_processo_number(tjsp)
+
+            entrada = cache.get(tjsp) if cache else None
+            if entrada and entrada["identificador"]:
+                dados = self._read_incidente(entrada["identificador"], numero=numero)
+                if dados:
+                    self.stats["respondidas"] += 1
+                    return {"encontrado": True, "dados": dados}
+                cache.invalidate(tjsp, "incidente não abre mais o detalhe do processo")
+
+            doc = self._get(STF_PROCESSOS_URL + "listarProcessos.asp", {"numeroUnico": numero})
+            if doc is None:
+                return self._fallback(tjsp, "sem resposta da pesquisa")
+
+            if is_not_found(doc):
+                self.stats["respondidas"] += 1
+                return {"encontrado": False, "dados": {}}
+
+            incidente = parse_incidente(doc)
+            if not incidente:
+                return self._fallback(tjsp, "incidente não identificado")
+
+            dados = self._read_incidente(incidente, detalhe=doc)
+            if not dados:
+                return self._fallback(tjsp, "fragmento das abas indisponível")
+
+            self.stats["respondidas"] += 1
+            if cache:
+                cache.put(tjsp, incidente, dados["link"])
+            logger.info(f"HTTP: incidente {incidente} lido ({self.stats['requisicoes']} requisições no total)")
+            return {"encontrado": True, "dados": dados}
+
+        except Exception as e:
+            return self._fallback(tjsp, str(e))
+
+    def _fallback(self, tjsp: str, motivo: str) -> None:
+        self.stats["fallbacks"] += 1
+        logger.warning(f"HTTP: {motivo} para {tjsp} - usando o navegador")
+        return None
+
+    def report(self):
+        """Registra no log quantas consultas o HTTP resolveu e o tempo médio por requisição"""
+        if not self.stats["consultas"]:
+            return
+        media = self.stats["ms"] / self.stats["requisicoes"] if self.stats["requisicoes"] else 0
+        logger.info(
+            f"Motor HTTP: {self.stats['respondidas']}/{self.stats['consultas']} consultas sem navegador, "
+            f"{self.stats['fallbacks']} pelo navegador, média {media:.0f} ms por requisição"
+        )
+
+    def close(self):
+        """Encerra a sessão HTTP e o pool de requisições"""
+        self.report()
+        self.pool.shutdown(wait=False)
+        self.session.close()
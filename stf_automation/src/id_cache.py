@@ -0,0 +1,128 @@
+"""
+Cache persistente tjsp → identificador do processo no portal (SQLite)
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from .config import ID_CACHE_FILE
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS identificadores (
+        portal TEXT NOT NULL,
+        tjsp TEXT NOT NULL,
+        identificador TEXT,
+        url TEXT NOT NULL,
+        gravado_em REAL NOT NULL,
+        usado_em REAL,
+        PRIMARY KEY (portal, tjsp)
+    )
+"""
+
+
+class IdentifierCache:
+    """
+    Guarda, para cada número TJSP já encontrado, o identificador do processo
+    no portal (registro no STJ, incidente no STF) e a URL da página de
+    detalhes. Numa execução seguinte o robô abre a URL direto, sem passar
+    pelo formulário de pesquisa.
+
+    O identificador de um processo não muda, mas a URL pode deixar de
+    resolver (portal reestruturado, processo reautuado): quem usa o cache
+    chama invalidate() e refaz a pesquisa, e o item é regravado no fim.
+    """
+
+    def __init__(self, portal: str, caminho=ID_CACHE_FILE):
+        self.portal = portal
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(caminho), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+        self.stats = {"acertos": 0, "faltas": 0, "invalidacoes": 0, "gravacoes": 0}
+
+    def get(self, tjsp: str) -> Optional[Dict[str, str]]:
+        """
+        Busca o processo no cache
+
+        Args:
+            tjsp: Número TJSP
+
+        Returns:
+            {"identificador", "url"} ou None se ausente
+        """
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT identificador, url FROM identificadores WHERE portal = ? AND tjsp = ?",
+                (self.portal, tjsp)
+            ).fetchone()
+            if linha:
+                self._conn.execute(
+                    "UPDATE identificadores SET usado_em = ? WHERE portal = ? AND tjsp = ?",
+                    (time.time(), self.portal, tjsp)
+                )
+                self._conn.commit()
+        if not linha:
+            self.stats["faltas"] += 1
+            return None
+        self.stats["acertos"] += 1
+        return {"identificador": linha[0] or "", "url": linha[1]}
+
+    def put(self, tjsp: str, identificador: Optional[str], url: str):
+        """
+        Grava (ou substitui) o identificador do processo
+
+        Args:
+            tjsp: Número TJSP
+            identificador: Registro/incidente no portal (pode ser vazio)
+            url: URL da página de detalhes
+        """
+        if not url:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO identificadores (portal, tjsp, identificador, url, gravado_em) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.portal, tjsp, identificador or "", url, time.time())
+                )
+                self._conn.commit()
+            self.stats["gravacoes"] += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Não foi possível gravar {tjsp} no cache de identificadores: {e}")
+
+    def invalidate(self, tjsp: str, motivo: str):
+        """
+        Remove o processo do cache (URL não resolve mais)
+
+        Args:
+            tjsp: Número TJSP
+            motivo: Descrição para o log
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM identificadores WHERE portal = ? AND tjsp = ?", (self.portal, tjsp)
+            )
+            self._conn.commit()
+        self.stats["invalidacoes"] += 1
+        logger.info(f"Cache de identificadores: {tjsp} invalidado ({motivo})")
+
+    def report(self):
+        """Registra no log o aproveitamento do cache"""
+        if not (self.stats["acertos"] or self.stats["faltas"]):
+            return
+        logger.info(
+            f"Cache de identificadores ({self.portal}): {self.stats['acertos']} acertos, "
+            f"{self.stats['faltas']} faltas, {self.stats['invalidacoes']} invalidações, "
+            f"{self.stats['gravacoes']} gravações"
+        )
+
+    def close(self):
+        """Fecha o banco"""
+        self.report()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,159 @@
+"""
+Preenchimento de campos com estratégias intercambiáveis e aprendizado por portal
+"""
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .config import INPUT_FILL_STATE_FILE
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Ordem padrão: da mais rápida para a mais lenta (digitação fica como último recurso)
+STRATEGIES = ["js_set", "cdp_insert", "typing"]
+
+# Valor atribuído pelo setter nativo (funciona também com campos controlados por framework)
+JS_SET_SCRIPT = """
+    var el = document.querySelector(arguments[0]);
+    if (!el) return null;
+    el.focus();
+    var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    setter.call(el, arguments[1]);
+    ['input', 'keyup', 'change'].forEach(function(tipo) {
+        el.dispatchEvent(new Event(tipo, { bubbles: true }));
+    });
+    return el.value;
+"""
+
+FOCUS_CLEAR_SCRIPT = """
+    var el = document.querySelector(arguments[0]);
+    if (!el) return false;
+    el.focus();
+    el.select();
+    el.value = '';
+    return true;
+"""
+
+READ_VALUE_SCRIPT = """
+    var el = document.querySelector(arguments[0]);
+    return el ? el.value : null;
+"""
+
+_lock = threading.Lock()
+_state: Optional[Dict[str, Dict]] = None
+
+
+def _normalize(valor: Optional[str]) -> str:
+    """Remove máscara (pontos, hífens, espaços) para comparar o conteúdo digitado"""
+    return re.sub(r"[^0-9A-Za-z]", "", valor or "").upper()
+
+
+def _load_state() -> Dict[str, Dict]:
+    """Lê (uma vez por processo) o que já foi aprendido em execuções anteriores"""
+    global _state
+    if _state is None:
+        try:
+            with open(INPUT_FILL_STATE_FILE, encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+
+def _save_state():
+    try:
+        with open(INPUT_FILL_STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(_state, f, indent=2)
+    except OSError as e:
+        logger.debug(f"Não foi possível gravar estratégias de preenchimento: {e}")
+
+
+class InputFiller:
+    """
+    Preenche um campo tentando as estratégias em ordem e confere o valor
+    final contra o esperado após cada tentativa.
+
+    - js_set: atribui o valor de uma vez e dispara input/keyup/change;
+    - cdp_insert: foca o campo e insere o texto via CDP Input.insertText;
+    - typing: digitação caractere por caractere fornecida pelo scraper.
+
+    A estratégia que funcionou por último no portal passa a ser tentada
+    primeiro (também nas próximas execuções), então o caminho lento só é
+    usado quando as rápidas falham.
+    """
+
+    def __init__(self, browser, portal: str, typing: Callable[[str, str], None]):
+        """
+        Args:
+            browser: BrowserHandler da aba
+            portal: Chave do aprendizado (ex: 'STF')
+            typing: Digitação lenta (seletor, valor) usada como último recurso
+        """
+        self.browser = browser
+        self.portal = portal
+        self._typing = typing
+
+    def _order(self) -> List[str]:
+        with _lock:
+            preferida = _load_state().get(self.portal, {}).get("preferida")
+        if preferida in STRATEGIES:
+            return [preferida] + [s for s in STRATEGIES if s != preferida]
+        return list(STRATEGIES)
+
+    def _learn(self, estrategia: str, sucesso: bool):
+        with _lock:
+            estado = _load_state().setdefault(self.portal, {"preferida": None, "contagem": {}})
+            contagem = estado["contagem"].setdefault(estrategia, {"sucesso": 0, "falha": 0})
+            contagem["sucesso" if sucesso else "falha"] += 1
+            if sucesso and estado["preferida"] != estrategia:
+                logger.info(f"Preenchimento no {self.portal}: estratégia '{estrategia}' passa a ser a preferida")
+                estado["preferida"] = estrategia
+            _save_state()
+
+    def _apply(self, estrategia: str, seletor: str, valor: str):
+        driver = self.browser.driver
+        if estrategia == "js_set":
+            driver.execute_script(JS_SET_SCRIPT, seletor, valor)
+        elif estrategia == "cdp_insert":
+            if not driver.execute_script(FOCUS_CLEAR_SCRIPT, seletor):
+                return
+            driver.execute_cdp_cmd("Input.insertText", {"text": valor})
+        else:
+            self._typing(seletor, valor)
+
+    def fill(self, seletor: str, valor: str) -> Optional[str]:
+        """
+        Preenche o campo e confere o resultado
+
+        Args:
+            seletor: Seletor CSS do campo
+            valor: Texto esperado no campo
+
+        Returns:
+            Nome da estratégia que funcionou ou None se todas falharam
+        """
+        esperado = _normalize(valor)
+        for estrategia in self._order():
+            inicio = time.perf_counter()
+            try:
+                self._apply(estrategia, seletor, valor)
+                obtido = self.browser.driver.execute_script(READ_VALUE_SCRIPT, seletor)
+            except Exception as e:
+                logger.debug(f"Estratégia '{estrategia}' falhou: {e}")
+                obtido = None
+
+            if _normalize(obtido) == esperado:
+                logger.debug(
+                    f"Campo preenchido via '{estrategia}' em "
+                    f"{(time.perf_counter() - inicio) * 1000:.0f} ms: {obtido}"
+                )
+                self._learn(estrategia, True)
+                return estrategia
+
+            logger.warning(f"Preenchimento via '{estrategia}' resultou em '{obtido}' (esperado {valor})")
+            self._learn(estrategia, False)
+
+        return None
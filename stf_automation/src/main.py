@@ -1,15 +1,26 @@
 """
 Classe principal para automação STF
 """
+import threading
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
 from .browser_handler import BrowserHandler
 from .scraper import STFScraper
 from .supabase_client import SupabaseClient
 from .utils import get_logger, format_processo_number
 from .progress_window import ProgressWindow
+from .driver_cache import resolve_chromedriver
+from .driver_pool import lease_browser, release_browser, close_shared_pool
+from .startup import StartupProfiler, bootstrap
+from .http_engine import STFHttpEngine
+from .id_cache import IdentifierCache
+from .page_outcome import Outcome, OUTCOMES
+from .selector_registry import SELECTORS_REGISTRY
+from .rate_limiter import report_all as report_rate_limits
+from .pipeline import PipelineRunner
+from .config import STF_ENGINE, ID_CACHE, STF_PROCESSOS_URL, PIPELINE
 
 logger = get_logger(__name__)
 
@@ -23,93 +34,80 @@ class STFAutomation:
         self.scraper: Optional[STFScraper] = None
         self.supabase = SupabaseClient()
         self.progress_window = None  # Janela de progresso flutuante
-        
-        # Estatísticas
+        # Motor HTTP: o navegador só é aberto quando algum item precisa de fallback
+        self.http_engine = STFHttpEngine() if STF_ENGINE == "http" else None
+        # tjsp → incidente já resolvido em execuções anteriores
+        self.id_cache = IdentifierCache("STF") if ID_CACHE else None
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Zera as estatísticas (cada execução/job começa do zero)"""
+        OUTCOMES.reset()
         self.stats = {
             "total": 0,
             "sucesso": 0,
             "erro": 0,
             "nao_encontrado": 0,
+            "consultas_http": 0,
+            "via_cache": 0,
             "tempo_inicio": None,
             "tempo_fim": None
         }
     
-    def run(self):
-        """Executa automação completa"""
+    def run(self, progresso=None):
+        """
+        Executa automação completa
+        
+        Args:
+            progresso: Janela de progresso a usar no lugar da própria (supervisor)
+        """
         try:
             logger.info("=" * 80)
             logger.info("INICIANDO AUTOMAÇÃO STF")
             logger.info("=" * 80)
             
             # Inicia janela de progresso flutuante
-            self.progress_window = ProgressWindow("STF")
+            self.progress_window = progresso or ProgressWindow("STF")
             self.progress_window.start()
             self.progress_window.update(status="Inicializando...")
             
             self.stats["tempo_inicio"] = datetime.now()
             
-            # Inicia navegador
-            self.progress_window.update(action="Iniciando navegador...")
-            if not self.browser.start():
-                logger.error("Falha ao iniciar navegador")
-                self._close_progress(success=False)
-                return
-            
-            # Inicializa scraper
-            self.scraper = STFScraper(self.browser)
-            
-            # Navega para página do STF
-            self.progress_window.update(action="Acessando portal STF...")
-            if not self.browser.navigate_to_stf():
-                logger.error("Falha ao acessar portal STF")
-                self.browser.close()
-                self._close_progress(success=False)
-                return
-            
-            # Busca processos pendentes
+            # Busca processos pendentes enquanto o navegador abre e acessa o portal
             self.progress_window.update(status="Buscando processos...")
-            processos = self.supabase.get_processos_stf_pendentes()
+            profiler = StartupProfiler()
+            if self.http_engine:
+                # Navegador fica para o primeiro item que precisar de fallback
+                start_browser = lambda abortar: True
+            else:
+                start_browser = lambda abortar: self._start_browser(abortar, profiler)
+            processos, pronto = bootstrap(
+                self.supabase.get_processos_stf_pendentes,
+                start_browser,
+                profiler
+            )
+            profiler.report()
             
             if not processos:
                 logger.info("Nenhum processo pendente encontrado")
                 self.progress_window.update(status="Nenhum processo encontrado")
-                self.browser.close()
                 self._close_progress(success=True)
                 return
             
-            self.stats["total"] = len(processos)
-            logger.info(f"Total de processos a processar: {self.stats['total']}")
-            
-            # Atualiza janela de progresso com total
-            self.progress_window.update(
-                total=self.stats["total"],
-                processed=0,
-                status="Em execução..."
-            )
+            if not pronto:
+                self._close_progress(success=False)
+                return
             
             # Processa cada processo
-            for idx, processo in enumerate(processos, 1):
-                tjsp = processo.get("tjsp")
-                
-                # Atualiza progresso
-                self.progress_window.update(
-                    processed=idx,
-                    current=tjsp,
-                    action="Iniciando pesquisa..."
-                )
-                
-                logger.info("-" * 80)
-                logger.info(f"Processando {idx}/{self.stats['total']}: {tjsp}")
-                logger.info("-" * 80)
-                
-                self.process_single(tjsp)
+            self.run_batch(processos)
             
             # Fecha navegador
             self.browser.close()
-            
-            # Finaliza
-            self.stats["tempo_fim"] = datetime.now()
-            self._print_stats()
+            if self.http_engine:
+                self.http_engine.close()
+            if self.id_cache:
+                self.id_cache.report()
+            close_shared_pool()
             
             logger.info("=" * 80)
             logger.info("AUTOMAÇÃO STF FINALIZADA")
@@ -122,8 +120,150 @@ class STFAutomation:
             logger.error(f"Erro na execução da automação: {e}")
             if self.browser:
                 self.browser.close()
+            if self.http_engine:
+                self.http_engine.close()
+            close_shared_pool()
             self._close_progress(success=False, error=str(e))
     
+    def setup(self) -> bool:
+        """
+        Inicia navegador, scraper e acessa o portal STF
+        
+        Returns:
+            True se sucesso
+        """
+        return self._start_browser(threading.Event(), StartupProfiler())
+    
+    def _start_browser(self, abortar: threading.Event, profiler: StartupProfiler) -> bool:
+        """
+        Abre o navegador até o portal, conferindo entre as etapas se a
+        inicialização foi abortada (lista de processos vazia)
+        
+        Args:
+            abortar: Evento sinalizado quando o navegador não é mais necessário
+            profiler: Registro das fases da inicialização
+            
+        Returns:
+            True se o navegador ficou pronto
+        """
+        try:
+            with profiler.fase("navegador", "resolução do ChromeDriver"):
+                resolve_chromedriver()
+            if abortar.is_set():
+                return False
+            
+            if self.progress_window:
+                self.progress_window.update(action="Iniciando navegador...")
+            with profiler.fase("navegador", "abertura do Chrome"):
+                iniciado = self.browser.start()
+            if not iniciado:
+                logger.error("Falha ao iniciar navegador")
+                return False
+            if abortar.is_set():
+                self.browser.close()
+                return False
+            
+            # Inicializa scraper
+            self.scraper = STFScraper(self.browser)
+            
+            # Navega para página do STF
+            if self.progress_window:
+                self.progress_window.update(action="Acessando portal STF...")
+            with profiler.fase("navegador", "primeira navegação"):
+                no_portal = self.browser.navigate_to_stf()
+            if not no_portal or abortar.is_set():
+                if not no_portal:
+                    logger.error("Falha ao acessar portal STF")
+                self.browser.close()
+                return False
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao iniciar navegador: {e}")
+            self.browser.close()
+            return False
+    
+    def ensure_ready(self) -> bool:
+        """
+        Garante navegador vivo e na página inicial do STF, reabrindo se preciso
+        
+        Returns:
+            True se pronto para pesquisar
+        """
+        if not self.browser.is_alive():
+            logger.warning("Navegador indisponível - reiniciando")
+            novo = lease_browser()
+            if novo:
+                # Já vem do pool na página inicial
+                release_browser(self.browser, descartar=True)
+                self._adopt_browser(novo)
+                return True
+            self.browser.close()
+            return self.setup()
+        
+        if self.browser.is_ready():
+            return True
+        return self.browser.navigate_to_stf()
+    
+    def _adopt_browser(self, browser: BrowserHandler):
+        """Passa a usar um navegador emprestado do pool (já no portal)"""
+        self.browser = browser
+        self.scraper = STFScraper(browser)
+    
+    def run_batch(self, processos: List[Dict[str, Any]]):
+        """
+        Processa uma lista de processos com o navegador já no portal
+        e imprime as estatísticas ao final
+        
+        Args:
+            processos: Lista de dicts com tjsp/situacao
+        """
+        self.stats["total"] = len(processos)
+        logger.info(f"Total de processos a processar: {self.stats['total']}")
+        
+        # Atualiza janela de progresso com total
+        if self.progress_window:
+            self.progress_window.update(
+                total=self.stats["total"],
+                processed=0,
+                status="Em execução..."
+            )
+        
+        if PIPELINE and len(processos) > 1:
+            PipelineRunner(self).run(processos)
+        else:
+            self._run_serial(processos)
+        
+        # Finaliza
+        self.stats["tempo_fim"] = datetime.now()
+        self._print_stats()
+    
+    def _run_serial(self, processos: List[Dict[str, Any]]):
+        """Processa um por vez no navegador (ou motor HTTP)"""
+        for idx, processo in enumerate(processos, 1):
+            tjsp = processo.get("tjsp")
+            
+            # Atualiza progresso
+            if self.progress_window:
+                self.progress_window.update(
+                    processed=idx,
+                    current=tjsp,
+                    action="Iniciando pesquisa..."
+                )
+            
+            logger.info("-" * 80)
+            logger.info(f"Processando {idx}/{self.stats['total']}: {tjsp}")
+            logger.info("-" * 80)
+            
+            if self.http_engine and self.process_http(tjsp):
+                continue
+            if self.http_engine and not self.ensure_ready():
+                logger.error("Navegador indisponível para o fallback")
+                self._registrar_erro(tjsp)
+                continue
+            self.process_single(tjsp)
+    
     def _close_progress(self, success=True, error=None):
         """Fecha a janela de progresso"""
         if self.progress_window:
@@ -141,92 +281,155 @@ class STFAutomation:
             tjsp: Número TJSP do processo
         """
         try:
-            # Formata número (remove caracteres especiais)
-            numero = format_processo_number(tjsp)
+            desfecho = self._pesquisar(tjsp)
+            if desfecho is None:
+                self._registrar_erro(tjsp)
+                return
             
+            if desfecho == Outcome.NAO_ENCONTRADO:
+                self._processar_nao_encontrado(tjsp)
+            elif desfecho == Outcome.DETALHES:
+                self._processar_encontrado(tjsp)
+            else:
+                # Lista ambígua, captcha, sessão expirada ou página de erro: não grava nada
+                logger.error(f"Pesquisa de {tjsp} sem página de detalhe: {desfecho.value}")
+                self._registrar_erro(tjsp)
+            
+            # Volta para página inicial (o próximo item por URL não precisa)
+            if not self.scraper.url_search:
+                self.scraper.voltar_pagina_inicial()
+            
+        except Exception as e:
+            logger.error(f"Erro ao processar {tjsp}: {e}")
+            self._registrar_erro(tjsp)
+            # Tenta voltar à página inicial
+            try:
+                if not self.scraper.url_search:
+                    self.scraper.voltar_pagina_inicial()
+            except:
+                pass
+    
+    def _pesquisar(self, tjsp: str) -> Optional[Outcome]:
+        """
+        Abre o detalhe já conhecido ou pesquisa o processo e classifica a página
+        
+        Args:
+            tjsp: Número TJSP do processo
+            
+        Returns:
+            Desfecho da página, ou None se a pesquisa nem chegou ao resultado
+        """
+        # Contabiliza o tráfego da consulta anterior antes que o log de rede acumule
+        self.browser.drain_network_log()
+        
+        # Formata número (remove caracteres especiais)
+        numero = format_processo_number(tjsp)
+        
+        # Detalhe já conhecido: abre direto, sem o formulário de pesquisa
+        cache = self.id_cache.get(tjsp) if self.id_cache else None
+        if cache:
+            if self.progress_window:
+                self.progress_window.update(current=tjsp, action="Abrindo detalhe conhecido...")
+            if self.scraper.abrir_detalhe_cache(cache["url"], numero):
+                self.stats["via_cache"] += 1
+                return Outcome.DETALHES
+            self.id_cache.invalidate(tjsp, "URL não abre mais o detalhe do processo")
+            if not self.browser.navigate_to_stf():
+                return None
+        
+        # Pesquisa por URL; sem resultado, recarrega o portal e usa o formulário
+        por_url = False
+        if self.scraper.url_search:
+            if self.progress_window:
+                self.progress_window.update(current=tjsp, action="Pesquisando no portal...")
+            por_url = self.scraper.pesquisar_por_url(numero)
+            if not por_url and not self.browser.navigate_to_stf():
+                return None
+        
+        if not por_url:
             # Atualiza janela de progresso
             if self.progress_window:
                 self.progress_window.update(current=tjsp, action="Selecionando tipo de pesquisa...")
             
             # Seleciona tipo de pesquisa (Número único)
             if not self.scraper.selecionar_tipo_pesquisa():
-                self._registrar_erro(tjsp)
-                return
+                return None
             
             # Digita número
             if self.progress_window:
                 self.progress_window.update(action="Digitando número do processo...")
             if not self.scraper.digitar_numero_processo(numero):
-                self._registrar_erro(tjsp)
-                return
+                return None
             
             # Clica em Pesquisar
             if self.progress_window:
                 self.progress_window.update(action="Pesquisando no portal...")
             if not self.scraper.clicar_pesquisar():
-                self._registrar_erro(tjsp)
-                return
-            
-            # Verifica se processo foi encontrado
-            if self.progress_window:
-                self.progress_window.update(action="Verificando resultado...")
-            encontrado = self.scraper.verificar_processo_encontrado()
-            
-            if not encontrado:
-                self._processar_nao_encontrado(tjsp)
-            else:
-                self._processar_encontrado(tjsp)
+                return None
+        
+        # Verifica se processo foi encontrado
+        if self.progress_window:
+            self.progress_window.update(action="Verificando resultado...")
+        desfecho = self.scraper.classificar_resultado()
+        if desfecho == Outcome.DETALHES:
+            self._gravar_cache(tjsp)
+        return desfecho
+    
+    def process_http(self, tjsp: str) -> bool:
+        """
+        Processa um único processo pelo motor HTTP
+        
+        Args:
+            tjsp: Número TJSP do processo
             
-            # Volta para página inicial
-            self.scraper.voltar_pagina_inicial()
+        Returns:
+            True se o item foi resolvido; False se deve seguir pelo navegador
+        """
+        resultado = self._consultar_http(tjsp)
+        if resultado is None:
+            return False
+        
+        if resultado["encontrado"]:
+            self._processar_encontrado(tjsp, resultado["dados"])
+        else:
+            self._processar_nao_encontrado(tjsp)
+        return True
+    
+    def _consultar_http(self, tjsp: str) -> Optional[Dict[str, Any]]:
+        """
+        Consulta o processo pelo motor HTTP
+        
+        Args:
+            tjsp: Número TJSP do processo
             
-        except Exception as e:
-            logger.error(f"Erro ao processar {tjsp}: {e}")
-            self._registrar_erro(tjsp)
-            # Tenta voltar à página inicial
-            try:
-                self.scraper.voltar_pagina_inicial()
-            except:
-                pass
+        Returns:
+            Resultado de STFHttpEngine.lookup, ou None se deve seguir pelo navegador
+        """
+        if self.progress_window:
+            self.progress_window.update(current=tjsp, action="Consultando portal (HTTP)...")
+        
+        resultado = self.http_engine.lookup(tjsp, self.id_cache)
+        if resultado is not None:
+            self.stats["consultas_http"] += 1
+        return resultado
     
-    def _processar_encontrado(self, tjsp: str):
+    def _processar_encontrado(self, tjsp: str, dados: Optional[Dict[str, str]] = None):
         """
         Processa um processo encontrado
         
         Args:
             tjsp: Número TJSP
+            dados: Campos já lidos pelo motor HTTP (None = extrair do navegador)
         """
         try:
-            logger.info(f"Extraindo dados do processo {tjsp}...")
-            
-            # Atualiza janela de progresso
-            if self.progress_window:
-                self.progress_window.update(action="Extraindo dados do processo...")
-            
-            # Extrai dados
-            partes = self.scraper.extrair_partes()
-            numero_superior = self.scraper.extrair_numero_superior()
-            decisao = self.scraper.extrair_decisao()
-            movimentacao = self.scraper.extrair_movimentacao()
-            link = self.scraper.obter_link_atual()
-            
-            # Prepara dados para atualização
-            dados_processo = {
-                "reu": partes,
-                "superior": numero_superior,
-                "decisao": decisao,
-                "movimentacao": movimentacao,
-                "link": link,
-                "pesquisa_stf": datetime.now().isoformat()
-            }
+            if dados is None:
+                dados = self._extrair(tjsp)
             
             # Atualiza janela de progresso
             if self.progress_window:
                 self.progress_window.update(action="Atualizando banco de dados...")
             
-            # Atualiza no banco
-            if self.supabase.update_processo(tjsp, dados_processo):
-                logger.info(f"Processo {tjsp} atualizado com sucesso")
+            if self._gravar_encontrado(tjsp, dados):
                 self.stats["sucesso"] += 1
             else:
                 self._registrar_erro(tjsp)
@@ -235,6 +438,53 @@ class STFAutomation:
             logger.error(f"Erro ao processar dados de {tjsp}: {e}")
             self._registrar_erro(tjsp)
     
+    def _extrair(self, tjsp: str) -> Dict[str, str]:
+        """
+        Extrai os dados da página de detalhe aberta
+        
+        Args:
+            tjsp: Número TJSP
+            
+        Returns:
+            Dict com os campos gravados no banco
+        """
+        logger.info(f"Extraindo dados do processo {tjsp}...")
+        
+        # Atualiza janela de progresso
+        if self.progress_window:
+            self.progress_window.update(action="Extraindo dados do processo...")
+        
+        # Extrai todos os campos numa única chamada
+        return self.scraper.extrair_dados()
+    
+    def _gravar_encontrado(self, tjsp: str, dados: Dict[str, str]) -> bool:
+        """
+        Grava os dados extraídos no banco
+        
+        Args:
+            tjsp: Número TJSP
+            dados: Campos extraídos
+            
+        Returns:
+            True se o banco foi atualizado
+        """
+        # Prepara dados para atualização
+        dados_processo = dict(dados, pesquisa_stf=datetime.now().isoformat())
+        
+        # Atualiza no banco
+        if self.supabase.update_processo(tjsp, dados_processo):
+            logger.info(f"Processo {tjsp} atualizado com sucesso")
+            return True
+        return False
+    
+    def _gravar_cache(self, tjsp: str):
+        """Guarda o incidente do detalhe aberto para as próximas execuções"""
+        if not self.id_cache:
+            return
+        incidente = self.scraper.obter_incidente()
+        if incidente:
+            self.id_cache.put(tjsp, incidente, f"{STF_PROCESSOS_URL}detalhe.asp?incidente={incidente}")
+    
     def _processar_nao_encontrado(self, tjsp: str):
         """
         Processa um processo não encontrado
@@ -243,23 +493,7 @@ class STFAutomation:
             tjsp: Número TJSP
         """
         try:
-            logger.warning(f"Processo {tjsp} não encontrado no STF")
-            
-            # Define mensagem padrão
-            movimentacao = "Não há movimentação no STF"
-            
-            # Atualiza no banco
-            dados_processo = {
-                "reu": "-",
-                "superior": "-",
-                "decisao": "-",
-                "movimentacao": movimentacao,
-                "link": "-",
-                "pesquisa_stf": datetime.now().isoformat()
-            }
-            
-            if self.supabase.update_processo(tjsp, dados_processo):
-                logger.info(f"Processo {tjsp} marcado como não encontrado")
+            if self._gravar_nao_encontrado(tjsp):
                 self.stats["nao_encontrado"] += 1
             else:
                 self._registrar_erro(tjsp)
@@ -268,6 +502,36 @@ class STFAutomation:
             logger.error(f"Erro ao processar não encontrado {tjsp}: {e}")
             self._registrar_erro(tjsp)
     
+    def _gravar_nao_encontrado(self, tjsp: str) -> bool:
+        """
+        Grava a mensagem padrão de processo não encontrado
+        
+        Args:
+            tjsp: Número TJSP
+            
+        Returns:
+            True se o banco foi atualizado
+        """
+        logger.warning(f"Processo {tjsp} não encontrado no STF")
+        
+        # Define mensagem padrão
+        movimentacao = "Não há movimentação no STF"
+        
+        # Atualiza no banco
+        dados_processo = {
+            "reu": "-",
+            "superior": "-",
+            "decisao": "-",
+            "movimentacao": movimentacao,
+            "link": "-",
+            "pesquisa_stf": datetime.now().isoformat()
+        }
+        
+        if self.supabase.update_processo(tjsp, dados_processo):
+            logger.info(f"Processo {tjsp} marcado como não encontrado")
+            return True
+        return False
+    
     def _registrar_erro(self, tjsp: str):
         """
         Registra erro no processamento
@@ -296,6 +560,13 @@ class STFAutomation:
         logger.info(f"✓ Sucesso: {self.stats['sucesso']}")
         logger.info(f"⚠ Não encontrados: {self.stats['nao_encontrado']}")
         logger.info(f"✗ Erros: {self.stats['erro']}")
+        OUTCOMES.report()
+        SELECTORS_REGISTRY.report()
+        report_rate_limits()
+        if self.stats["via_cache"]:
+            logger.info(f"⏩ Abertos pelo cache: {self.stats['via_cache']}")
+        if self.stats["consultas_http"]:
+            logger.info(f"🌐 Consultas via HTTP: {self.stats['consultas_http']}")
         
         if self.stats["total"] > 0:
             taxa_sucesso = ((self.stats["sucesso"] + self.stats["nao_encontrado"]) / self.stats["total"]) * 100
@@ -0,0 +1,302 @@
+"""
+Pipeline em etapas (asyncio): lista → pesquisa → extração → gravação
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .config import PIPELINE_QUEUE_SIZE
+from .page_outcome import Outcome
+from .utils import get_logger, deferred_logging, deferred_screenshots
+
+logger = get_logger(__name__)
+
+# Sentinela de fim de fila
+_FIM = object()
+
+
+class Etapa:
+    """
+    Uma etapa do pipeline: função síncrona aplicada a cada item
+
+    executor:
+        "loop"      roda no laço de eventos (trabalho curto, sem E/S)
+        "navegador" roda na thread única do Selenium
+        "io"        roda numa thread de E/S (asyncio.to_thread)
+
+    reserva/libera: a etapa que reserva o navegador só o devolve quando a
+    etapa que libera termina o mesmo item (a pesquisa do próximo processo
+    espera a extração do anterior, que ainda usa a página).
+    """
+
+    def __init__(self, nome: str, funcao: Callable[[Dict], Optional[Dict]], executor: str = "loop",
+                 reserva: bool = False, libera: bool = False):
+        self.nome = nome
+        self.funcao = funcao
+        self.executor = executor
+        self.reserva = reserva
+        self.libera = libera
+        self.itens = 0
+        self.ocupada_s = 0.0
+
+
+class StagedPipeline:
+    """
+    Liga as etapas por filas asyncio limitadas e mede a ocupação de cada uma
+    (tempo trabalhando / tempo total), para mostrar onde está o gargalo.
+
+    A função da etapa devolve o item (segue para a próxima) ou None (descarta).
+    Uma exceção descarta o item e chama ao_falhar; o item que passa pela
+    última etapa vai para ao_concluir. Ambos rodam no laço de eventos.
+    """
+
+    def __init__(self, etapas: List[Etapa], ao_concluir: Callable[[Dict], None],
+                 ao_falhar: Callable[[Dict, Exception], None], tamanho_fila: int = PIPELINE_QUEUE_SIZE):
+        self.fonte = Etapa("lista", None)
+        self.etapas = etapas
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.tamanho_fila = max(1, tamanho_fila)
+        self.duracao_s = 0.0
+        self._thread_navegador: Optional[ThreadPoolExecutor] = None
+        self._navegador: Optional[asyncio.Semaphore] = None
+
+    def run(self, itens: Iterable[Dict]):
+        """
+        Processa os itens até a última etapa
+
+        Args:
+            itens: Lista ou gerador de itens (consumido sob demanda pela fila)
+        """
+        self._thread_navegador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="navegador")
+        inicio = time.perf_counter()
+        try:
+            asyncio.run(self._run(itens))
+        finally:
+            self.duracao_s = time.perf_counter() - inicio
+            self._thread_navegador.shutdown(wait=True)
+
+    async def _run(self, itens: Iterable[Dict]):
+        self._navegador = asyncio.Semaphore(1)
+        filas = [asyncio.Queue(maxsize=self.tamanho_fila) for _ in self.etapas]
+        tarefas = [asyncio.create_task(self._produzir(itens, filas[0]))]
+        for indice, etapa in enumerate(self.etapas):
+            saida = filas[indice + 1] if indice + 1 < len(filas) else None
+            tarefas.append(asyncio.create_task(self._consumir(etapa, filas[indice], saida)))
+        await asyncio.gather(*tarefas)
+
+    async def _produzir(self, itens: Iterable[Dict], saida: asyncio.Queue):
+        """Etapa inicial: alimenta a primeira fila à medida que ela esvazia"""
+        iterador = iter(itens)
+        while True:
+            inicio = time.perf_counter()
+            item = next(iterador, _FIM)
+            self.fonte.ocupada_s += time.perf_counter() - inicio
+            await saida.put(item)
+            if item is _FIM:
+                return
+            self.fonte.itens += 1
+
+    async def _consumir(self, etapa: Etapa, entrada: asyncio.Queue, saida: Optional[asyncio.Queue]):
+        while True:
+            item = await entrada.get()
+            if item is _FIM:
+                if saida:
+                    await saida.put(_FIM)
+                return
+
+            if etapa.reserva:
+                await self._navegador.acquire()
+            inicio = time.perf_counter()
+            try:
+                resultado = await self._executar(etapa, item)
+            except Exception as e:
+                logger.error(f"Pipeline: erro na etapa {etapa.nome}: {e}")
+                self.ao_falhar(item, e)
+                resultado = None
+            etapa.ocupada_s += time.perf_counter() - inicio
+            etapa.itens += 1
+            if etapa.libera or (etapa.reserva and resultado is None):
+                self._navegador.release()
+
+            if resultado is None:
+                continue
+            if saida:
+                await saida.put(resultado)
+            else:
+                self.ao_concluir(resultado)
+
+    async def _executar(self, etapa: Etapa, item: Dict) -> Any:
+        if etapa.executor == "navegador":
+            return await asyncio.get_running_loop().run_in_executor(self._thread_navegador, etapa.funcao, item)
+        if etapa.executor == "io":
+            return await asyncio.to_thread(etapa.funcao, item)
+        return etapa.funcao(item)
+
+    def report(self):
+        """Registra no log a ocupação de cada etapa e o gargalo"""
+        if not self.duracao_s or not self.fonte.itens:
+            return
+        logger.info(f"Pipeline: {self.fonte.itens} item(ns) em {self.duracao_s:.1f}s")
+        etapas = [self.fonte] + self.etapas
+        for etapa in etapas:
+            logger.info(
+                f"  • {etapa.nome:14s}: ocupada {etapa.ocupada_s / self.duracao_s:6.1%} "
+                f"({etapa.ocupada_s:.1f}s, {etapa.itens} item(ns))"
+            )
+        gargalo = max(etapas, key=lambda e: e.ocupada_s)
+        logger.info(f"  Gargalo: {gargalo.nome}")
+
+
+class PipelineRunner:
+    """
+    Processa a lista em etapas ligadas por filas limitadas:
+    lista → pesquisa → extração → gravação.
+
+    Pesquisa (com a classificação da página de resultado) e extração usam o
+    navegador (thread única, um item por vez); o PATCH no Supabase roda numa
+    thread de E/S, então a gravação de um processo corre junto com a
+    pesquisa do próximo. Durante o pipeline, logs e capturas de tela também
+    são gravados em threads próprias.
+
+    Com o motor HTTP, a consulta acontece na etapa de pesquisa e o navegador
+    só entra no fallback. Os contadores são os mesmos da execução em série.
+    """
+
+    def __init__(self, automation):
+        self.automation = automation
+        self.total = 0
+        self.concluidos = 0
+        self.pipeline = StagedPipeline(
+            [
+                Etapa("pesquisa", self._pesquisa, executor="navegador", reserva=True),
+                Etapa("extração", self._extracao, executor="navegador", libera=True),
+                Etapa("gravação", self._gravacao, executor="io"),
+            ],
+            ao_concluir=self._concluir,
+            ao_falhar=self._falhou,
+        )
+
+    def run(self, processos: List[Dict[str, Any]]):
+        """
+        Processa a lista e registra a ocupação das etapas
+
+        Args:
+            processos: Lista de dicts com tjsp/situacao
+        """
+        self.total = len(processos)
+        logger.info(f"Modo pipeline: {self.total} processo(s) em etapas")
+        itens = (self._novo_item(indice, processo) for indice, processo in enumerate(processos, 1))
+        with deferred_logging(), deferred_screenshots():
+            self.pipeline.run(itens)
+        self.pipeline.report()
+
+    @staticmethod
+    def _novo_item(indice: int, processo: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "indice": indice,
+            "tjsp": processo.get("tjsp"),
+            "desfecho": None,      # Outcome da página (ou do motor HTTP)
+            "navegador": False,    # Passou pelo Selenium (precisa voltar à página inicial)
+            "dados": None,
+            "gravado": False,
+            "erro": None,
+        }
+
+    # Etapas no navegador
+
+    def _pesquisa(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Pesquisa o processo (HTTP ou navegador) e classifica a página"""
+        automation = self.automation
+        tjsp = item["tjsp"]
+        logger.info("-" * 80)
+        logger.info(f"Processando {item['indice']}/{self.total}: {tjsp}")
+        logger.info("-" * 80)
+
+        if automation.http_engine:
+            resultado = automation._consultar_http(tjsp)
+            if resultado is not None:
+                if resultado["encontrado"]:
+                    item.update(desfecho=Outcome.DETALHES, dados=resultado["dados"])
+                else:
+                    item["desfecho"] = Outcome.NAO_ENCONTRADO
+                return item
+            if not automation.ensure_ready():
+                logger.error("Navegador indisponível para o fallback")
+                item["erro"] = "navegador indisponível para o fallback"
+                return item
+
+        item["navegador"] = True
+        try:
+            desfecho = automation._pesquisar(tjsp)
+        except Exception as e:
+            logger.error(f"Erro ao processar {tjsp}: {e}")
+            item["erro"] = str(e)
+            return item
+
+        if desfecho is None:
+            # Parou antes do resultado: como na execução em série, não volta à página inicial
+            item.update(erro="falha na pesquisa", navegador=False)
+        elif desfecho in (Outcome.DETALHES, Outcome.NAO_ENCONTRADO):
+            item["desfecho"] = desfecho
+        else:
+            # Lista ambígua, captcha, sessão expirada ou página de erro: não grava nada
+            logger.error(f"Pesquisa de {tjsp} sem página de detalhe: {desfecho.value}")
+            item["erro"] = desfecho.value
+        return item
+
+    def _extracao(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrai os dados do detalhe e volta à página inicial quando preciso"""
+        automation = self.automation
+        if not item["navegador"]:
+            return item
+        try:
+            if item["desfecho"] == Outcome.DETALHES and not item["erro"]:
+                item["dados"] = automation._extrair(item["tjsp"])
+        except Exception as e:
+            logger.error(f"Erro ao processar dados de {item['tjsp']}: {e}")
+            item["erro"] = str(e)
+
+        # Volta para página inicial (o próximo item por URL não precisa)
+        try:
+            if not automation.scraper.url_search:
+                automation.scraper.voltar_pagina_inicial()
+        except Exception:
+            pass
+        return item
+
+    # Etapa fora do navegador
+
+    def _gravacao(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Grava o resultado no Supabase (thread de E/S)"""
+        automation = self.automation
+        if item["erro"]:
+            return item
+        try:
+            if item["desfecho"] == Outcome.NAO_ENCONTRADO:
+                item["gravado"] = automation._gravar_nao_encontrado(item["tjsp"])
+            elif item["desfecho"] == Outcome.DETALHES:
+                item["gravado"] = automation._gravar_encontrado(item["tjsp"], item["dados"])
+        except Exception as e:
+            logger.error(f"Erro ao gravar {item['tjsp']}: {e}")
+        return item
+
+    def _concluir(self, item: Dict[str, Any]):
+        stats = self.automation.stats
+        if item["erro"] or not item["gravado"]:
+            self.automation._registrar_erro(item["tjsp"])
+        elif item["desfecho"] == Outcome.NAO_ENCONTRADO:
+            stats["nao_encontrado"] += 1
+        else:
+            stats["sucesso"] += 1
+        self._avancar()
+
+    def _falhou(self, item: Dict[str, Any], erro: Exception):
+        self.automation._registrar_erro(item["tjsp"])
+        self._avancar()
+
+    def _avancar(self):
+        self.concluidos += 1
+        if self.automation.progress_window:
+            self.automation.progress_window.update(processed=self.concluidos)
@@ -0,0 +1,232 @@
+"""
+Limite de requisições por host (token bucket em SQLite, comum a threads e processos)
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from .config import (
+    RATE_LIMIT, RATE_LIMIT_FILE, RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST, RATE_LIMIT_MIN_PER_SEC,
+)
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS buckets (
+        host TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        atualizado_em REAL NOT NULL,
+        taxa REAL NOT NULL
+    )
+"""
+
+# Status HTTP que indicam que o portal pediu para ir mais devagar
+STATUS_SOBRECARGA = (429, 503)
+
+# Balde parado há mais que isso pertence a uma execução anterior: volta à taxa configurada
+OCIOSO_S = 60
+
+
+class HostRateLimiter:
+    """
+    Token bucket por host: até `rajada` requisições seguidas e, depois,
+    `taxa` por segundo. O estado fica num banco SQLite (uma linha por host),
+    então workers em threads, o daemon e execuções paralelas dividem o
+    mesmo orçamento.
+
+    A taxa se adapta: cai pela metade a cada página de erro, captcha,
+    timeout ou HTTP 429/503 (até RATE_LIMIT_MIN_PER_SEC) e volta aos poucos,
+    10% da taxa configurada a cada resposta normal. Um balde sem uso há
+    mais de OCIOSO_S segundos volta à taxa configurada.
+
+    Cada processo acumula o tempo parado esperando ficha contra o tempo
+    das requisições em si, para o relatório.
+    """
+
+    def __init__(self, host: str, taxa: float = RATE_LIMIT_PER_SEC, rajada: float = RATE_LIMIT_BURST,
+                 caminho=RATE_LIMIT_FILE):
+        self.host = host
+        self.taxa_maxima = taxa
+        self.rajada = max(1.0, rajada)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(caminho), check_same_thread=False, timeout=10,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        agora = time.time()
+        self._conn.execute(
+            "INSERT OR IGNORE INTO buckets (host, tokens, atualizado_em, taxa) VALUES (?, ?, ?, ?)",
+            (host, self.rajada, agora, taxa)
+        )
+        # Taxa reduzida numa execução anterior não vale para esta (o balde de quem
+        # ainda está rodando em paralelo não fica ocioso e é mantido)
+        self._conn.execute(
+            "UPDATE buckets SET tokens = ?, atualizado_em = ?, taxa = ? WHERE host = ? AND atualizado_em < ?",
+            (self.rajada, agora, taxa, host, agora - OCIOSO_S)
+        )
+        self.stats = {"fichas": 0, "espera_s": 0.0, "trabalho_s": 0.0, "reducoes": 0}
+
+    def _tentar(self) -> float:
+        """
+        Reabastece o balde e tenta consumir uma ficha (transação exclusiva)
+
+        Returns:
+            0 se consumiu, senão segundos até a próxima ficha
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, atualizado_em, taxa = self._conn.execute(
+                    "SELECT tokens, atualizado_em, taxa FROM buckets WHERE host = ?", (self.host,)
+                ).fetchone()
+                agora = time.time()
+                tokens = min(self.rajada, tokens + max(0.0, agora - atualizado_em) * taxa)
+                espera = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    espera = (1 - tokens) / taxa
+                self._conn.execute(
+                    "UPDATE buckets SET tokens = ?, atualizado_em = ? WHERE host = ?",
+                    (tokens, agora, self.host)
+                )
+                self._conn.execute("COMMIT")
+                return espera
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self) -> float:
+        """
+        Aguarda uma ficha do host
+
+        Returns:
+            Segundos esperados
+        """
+        if not RATE_LIMIT:
+            return 0.0
+        inicio = time.perf_counter()
+        try:
+            while True:
+                espera = self._tentar()
+                if espera <= 0:
+                    break
+                # Acorda a cada 1 s no máximo: outro processo pode ter mudado a taxa
+                time.sleep(min(espera, 1.0))
+        except sqlite3.Error as e:
+            logger.warning(f"Limite de requisições indisponível para {self.host}: {e}")
+        esperado = time.perf_counter() - inicio
+        with self._lock:
+            self.stats["fichas"] += 1
+            self.stats["espera_s"] += esperado
+        if esperado >= 1:
+            logger.debug(f"{self.host}: {esperado:.1f}s aguardando limite de requisições")
+        return esperado
+
+    @contextmanager
+    def slot(self):
+        """
+        Aguarda a ficha e mede o tempo da requisição dentro do bloco
+
+        Uso:
+            with limiter.slot():
+                driver.get(url)
+        """
+        self.acquire()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                self.stats["trabalho_s"] += duracao
+
+    def _ajustar_taxa(self, fator: float, incremento: float = 0.0) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (taxa,) = self._conn.execute(
+                    "SELECT taxa FROM buckets WHERE host = ?", (self.host,)
+                ).fetchone()
+                nova = min(self.taxa_maxima, max(RATE_LIMIT_MIN_PER_SEC, taxa * fator + incremento))
+                if nova != taxa:
+                    self._conn.execute("UPDATE buckets SET taxa = ? WHERE host = ?", (nova, self.host))
+                self._conn.execute("COMMIT")
+                return nova
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def penalize(self, motivo: str):
+        """
+        Reduz a taxa pela metade (página de erro, captcha, timeout, HTTP 429/503)
+
+        Args:
+            motivo: Descrição para o log
+        """
+        if not RATE_LIMIT:
+            return
+        try:
+            nova = self._ajustar_taxa(0.5)
+        except sqlite3.Error as e:
+            logger.warning(f"Não foi possível reduzir a taxa de {self.host}: {e}")
+            return
+        with self._lock:
+            self.stats["reducoes"] += 1
+        logger.warning(f"{self.host}: {motivo} - taxa reduzida para {nova:.2f} req/s")
+
+    def reward(self):
+        """Recupera 10% da taxa configurada após uma resposta normal"""
+        if not RATE_LIMIT:
+            return
+        try:
+            self._ajustar_taxa(1.0, self.taxa_maxima * 0.1)
+        except sqlite3.Error as e:
+            logger.debug(f"Não foi possível recuperar a taxa de {self.host}: {e}")
+
+    def feedback_status(self, status: int):
+        """Ajusta a taxa pelo status HTTP da resposta"""
+        if status in STATUS_SOBRECARGA:
+            self.penalize(f"HTTP {status}")
+        elif status < 500:
+            self.reward()
+
+    def report(self):
+        """Registra no log o tempo parado pelo limite contra o tempo das requisições"""
+        with self._lock:
+            stats = dict(self.stats)
+        if not stats["fichas"]:
+            return
+        logger.info(
+            f"Limite de requisições ({self.host}): {stats['fichas']} requisições, "
+            f"{stats['espera_s']:.1f}s aguardando contra {stats['trabalho_s']:.1f}s trabalhando, "
+            f"{stats['reducoes']} redução(ões) de taxa"
+        )
+
+
+_limiters: Dict[str, HostRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def for_host(host: str) -> HostRateLimiter:
+    """
+    Limitador do host (um por processo; o balde no banco é comum a todos)
+
+    Args:
+        host: Nome do host (ex: processo.stj.jus.br)
+    """
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostRateLimiter(host)
+        return _limiters[host]
+
+
+def report_all():
+    """Registra no log o relatório de todos os hosts usados no processo"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        limiter.report()
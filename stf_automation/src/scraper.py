@@ -2,17 +2,178 @@
 Extração de dados do portal STF
 """
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from typing import Optional, Dict, Any
 import time
 
+from .config import STF_PROCESSOS_URL, STF_HOST, URL_SEARCH, EXTRACTION_TIMEOUT
 from .utils import get_logger, take_screenshot, escape_json_string
+from .input_fill import InputFiller
+from .page_outcome import Outcome, OUTCOMES, BLOCKERS_JS
+from .selector_registry import SELECTORS_REGISTRY
+from .rate_limiter import for_host
 
 logger = get_logger(__name__)
 
+# Conteúdo do processo, mensagem de não encontrado ou lista de resultados
+RESULT_MARKERS = [
+    {"tipo": "element", "alvo": "#partes-resumidas > div"},
+    {"tipo": "element", "alvo": ".message-404"},
+    {"tipo": "element", "alvo": "a[href*='detalhe.asp?incidente=']"},
+]
+
+# Falhas seguidas da pesquisa por URL antes de voltar ao formulário
+URL_SEARCH_MAX_FAILURES = 3
+
+# Classificador da página de resultado: só consultas pontuais por seletor
+CLASSIFIER_SCRIPT = BLOCKERS_JS + r"""
+    var bloqueada = bloqueio();
+    if (bloqueada) return bloqueada;
+
+    var aviso = document.querySelector('.message-404');
+    if (aviso && aviso.textContent.indexOf('Processo não encontrado') !== -1) return 'nao_encontrado';
+
+    if (document.getElementById('incidente') || document.querySelector('#partes-resumidas > div')) {
+        return 'detalhes';
+    }
+    if (document.querySelectorAll("a[href*='detalhe.asp?incidente=']").length > 1) {
+        return 'multiplos_processos';
+    }
+    return 'erro';
+"""
+
+
+# Extração da página de detalhe numa única chamada: aguarda (MutationObserver)
+# as partes e o conteúdo da aba Decisões, que o portal carrega sozinho via
+# jQuery .load; se a aba ainda estiver vazia na metade do prazo, clica nela
+# dentro da página. Devolve os campos, o seletor de origem e o tempo (ms) de cada um.
+EXTRACTOR_SCRIPT = r"""
+    var cadeias = arguments[0], limite = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var t0 = performance.now();
+    var registro = {dados: {}, tempos: {}, seletores: {}};
+    var obs = null, timerAba = null, timerFim = null, concluido = false;
+
+    function normalizar(t) {
+        return (t || '').replace(/\s+/g, ' ').trim();
+    }
+    // Texto como exibido (quebras de linha preservadas, sem conteúdo oculto), igual ao .text do Selenium
+    function textoVisivel(el) {
+        return (el.innerText || el.textContent || '').trim();
+    }
+    function localizar(s) {
+        try {
+            if (s.charAt(0) === '/' || s.charAt(0) === '(') {
+                return document.evaluate(s, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            }
+            return document.querySelector(s);
+        } catch (e) {
+            return null;
+        }
+    }
+    function primeiroComTexto(cadeia) {
+        for (var i = 0; i < cadeia.length; i++) {
+            var el = localizar(cadeia[i]);
+            var texto = el ? textoVisivel(el) : '';
+            if (texto) return {seletor: cadeia[i], texto: texto};
+        }
+        return null;
+    }
+    function medir(campo, fn) {
+        var inicio = performance.now();
+        try { return fn(); }
+        finally { registro.tempos[campo] = Math.round((performance.now() - inicio) * 100) / 100; }
+    }
+    function pronta() {
+        return !!document.querySelector('#partes-resumidas > div') && !!primeiroComTexto(cadeias.movimentacao);
+    }
+
+    function extrair() {
+        if (concluido) return;
+        concluido = true;
+        if (obs) obs.disconnect();
+        clearTimeout(timerAba);
+        clearTimeout(timerFim);
+        registro.tempos.espera = Math.round(performance.now() - t0);
+
+        // Partes resumidas: 'SIGLA - NOME' separadas por ' • '
+        registro.dados.reu = medir('reu', function() {
+            var resultado = [];
+            document.querySelectorAll('#partes-resumidas > div').forEach(function(linha) {
+                if (linha.children.length < 2) return;
+                var sigla = textoVisivel(linha.children[0]).replace(/\(.*?\)/g, '');
+                var nome = textoVisivel(linha.children[1]);
+                if (sigla && nome) resultado.push(sigla + ' - ' + nome);
+            });
+            if (resultado.length) registro.seletores.reu = '#partes-resumidas > div';
+            return resultado.join(' • ');
+        });
+
+        // Classe e número: 11 caracteres para ARE, 10 para as demais classes
+        registro.dados.superior = medir('superior', function() {
+            var numero = '';
+            var campo = document.getElementById('classe-numero-processo');
+            if (campo && normalizar(campo.value)) {
+                numero = normalizar(campo.value);
+                registro.seletores.superior = 'input#classe-numero-processo';
+            } else {
+                var achado = primeiroComTexto(cadeias.numero_superior);
+                if (achado) {
+                    numero = achado.texto;
+                    registro.seletores.superior = achado.seletor;
+                }
+            }
+            if (!numero) return '';
+            return numero.indexOf('ARE') !== -1 ? numero.slice(0, 11) : numero.slice(0, 10);
+        });
+
+        // Decisão: primeiro item da timeline de andamentos
+        registro.dados.decisao = medir('decisao', function() {
+            var seletor = "//ul[contains(@class, 'timeline')]//li[1]//div[@class='description']";
+            var el = localizar(seletor);
+            var texto = el ? textoVisivel(el) : '';
+            if (texto) registro.seletores.decisao = seletor;
+            return texto;
+        });
+
+        // Movimentação: primeiro item com texto da aba Decisões
+        registro.dados.movimentacao = medir('movimentacao', function() {
+            var achado = primeiroComTexto(cadeias.movimentacao);
+            if (!achado) return '';
+            registro.seletores.movimentacao = achado.seletor;
+            return achado.texto;
+        });
+
+        registro.dados.link = window.location.href;
+        registro.seletores.link = 'location.href';
+        registro.tempos.total = Math.round((performance.now() - t0) * 100) / 100;
+        done(registro);
+    }
+
+    function clicarAba() {
+        if (concluido || primeiroComTexto(cadeias.movimentacao)) return;
+        registro.seletores.aba_decisoes = null;
+        for (var i = 0; i < cadeias.aba_decisoes.length; i++) {
+            var el = localizar(cadeias.aba_decisoes[i]);
+            if (el) {
+                el.click();
+                registro.seletores.aba_decisoes = cadeias.aba_decisoes[i];
+                return;
+            }
+        }
+    }
+
+    if (pronta()) { extrair(); return; }
+
+    obs = new MutationObserver(function() {
+        if (pronta()) extrair();
+    });
+    obs.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    timerAba = setTimeout(clicarAba, limite / 2);
+    timerFim = setTimeout(extrair, limite);
+"""
 
 class STFScraper:
     """Extrator de dados do portal STF"""
@@ -27,6 +188,14 @@ class STFScraper:
         self.browser = browser_handler
         self.driver = browser_handler.driver
         self.wait = browser_handler.wait
+        self.filler = InputFiller(browser_handler, "STF", self._digitar_caractere_a_caractere)
+        # Pesquisa por URL: cada item é uma navegação, sem voltar à página inicial
+        self.url_search = URL_SEARCH
+        self._falhas_url = 0
+        # Toda navegação/pesquisa passa pelo limite de requisições do host
+        self.limiter = for_host(STF_HOST)
+        # Último registro de extrair_dados (tempos e seletores de origem por campo)
+        self.ultima_extracao: Dict[str, Any] = {}
     
     def selecionar_tipo_pesquisa(self) -> bool:
         """
@@ -43,15 +212,15 @@ class STFScraper:
                 EC.element_to_be_clickable((By.ID, "tipo-pesquisa-processo"))
             )
             combo.click()
-            time.sleep(0.5)
             
             # Pressiona Down 2 vezes para terceira opção
             combo.send_keys(Keys.DOWN)
-            time.sleep(0.2)
             combo.send_keys(Keys.DOWN)
-            time.sleep(0.2)
             combo.send_keys(Keys.ENTER)
-            time.sleep(0.5)
+            
+            # O campo de número único aparece assim que o tipo é aplicado
+            if not self.browser.wait_element("#pesquisaPrincipalNumeroUnico", timeout=5, visible=True):
+                logger.warning("Campo de número único não apareceu após selecionar o tipo")
             
             logger.info("Tipo de pesquisa selecionado")
             return True
@@ -63,7 +232,8 @@ class STFScraper:
     
     def digitar_numero_processo(self, numero: str) -> bool:
         """
-        Digita número do processo caractere por caractere com controle preciso
+        Preenche o número do processo e confere o valor do campo.
+        A estratégia (JS, CDP ou digitação) é escolhida pelo InputFiller.
         
         Args:
             numero: Número do processo (apenas dígitos)
@@ -74,62 +244,69 @@ class STFScraper:
         try:
             logger.info(f"Digitando número do processo: {numero}")
             
-            # Localiza o campo
-            campo = self.wait.until(
+            # Garante que o campo está disponível
+            self.wait.until(
                 EC.element_to_be_clickable((By.ID, "pesquisaPrincipalNumeroUnico"))
             )
             
-            # Clica no campo para focá-lo
-            campo.click()
-            time.sleep(0.3)
-            
-            # Limpa completamente o campo usando várias técnicas
-            campo.clear()
-            time.sleep(0.2)
-            
-            # Usa JavaScript para garantir que o campo está vazio
-            self.driver.execute_script("""
-                arguments[0].value = '';
-                arguments[0].focus();
-            """, campo)
-            time.sleep(0.3)
-            
-            # Envia CTRL+A + DELETE para garantir limpeza total
-            campo.send_keys(Keys.CONTROL + "a")
-            time.sleep(0.1)
-            campo.send_keys(Keys.DELETE)
-            time.sleep(0.3)
-            
-            # Agora digita caractere por caractere com delay adequado
-            for i, char in enumerate(numero):
-                campo.send_keys(char)
-                time.sleep(0.12)  # Delay entre caracteres
-                
-                # Log de progresso a cada 5 caracteres
-                if (i + 1) % 5 == 0:
-                    logger.debug(f"Digitados {i + 1}/{len(numero)} caracteres")
-            
-            time.sleep(0.5)
-            
-            # Verifica se o valor foi definido corretamente
-            # O site pode formatar automaticamente o número (adicionar hífens/pontos)
-            valor_atual = campo.get_attribute('value')
-            valor_atual_limpo = valor_atual.replace('-', '').replace('.', '')
-            numero_limpo = numero.replace('-', '').replace('.', '')
-            
-            if valor_atual_limpo == numero_limpo:
-                logger.info(f"Número digitado com sucesso: {valor_atual}")
+            # O site pode formatar automaticamente o número (adicionar hífens/pontos);
+            # a conferência do InputFiller ignora a máscara
+            estrategia = self.filler.fill("#pesquisaPrincipalNumeroUnico", numero)
+            if estrategia:
+                logger.info(f"Número digitado com sucesso ({estrategia})")
                 return True
-            else:
-                logger.warning(f"Valor no campo ({valor_atual}) diferente do esperado ({numero})")
-                logger.warning(f"Esperado (limpo): {numero_limpo}, Obtido (limpo): {valor_atual_limpo}")
-                return False
+            
+            logger.warning(f"Nenhuma estratégia conseguiu preencher o número {numero}")
+            take_screenshot(self.driver, "erro_digitacao")
+            return False
             
         except Exception as e:
             logger.error(f"Erro ao digitar número: {e}")
             take_screenshot(self.driver, "erro_digitacao")
             return False
     
+    def _digitar_caractere_a_caractere(self, seletor: str, numero: str):
+        """
+        Digitação caractere por caractere com controle preciso (último recurso)
+        
+        Args:
+            seletor: Seletor CSS do campo
+            numero: Número do processo
+        """
+        campo = self.driver.find_element(By.CSS_SELECTOR, seletor)
+        
+        # Clica no campo para focá-lo
+        campo.click()
+        time.sleep(0.3)
+        
+        # Limpa completamente o campo usando várias técnicas
+        campo.clear()
+        time.sleep(0.2)
+        
+        # Usa JavaScript para garantir que o campo está vazio
+        self.driver.execute_script("""
+            arguments[0].value = '';
+            arguments[0].focus();
+        """, campo)
+        time.sleep(0.3)
+        
+        # Envia CTRL+A + DELETE para garantir limpeza total
+        campo.send_keys(Keys.CONTROL + "a")
+        time.sleep(0.1)
+        campo.send_keys(Keys.DELETE)
+        time.sleep(0.3)
+        
+        # Agora digita caractere por caractere com delay adequado
+        for i, char in enumerate(numero):
+            campo.send_keys(char)
+            time.sleep(0.12)  # Delay entre caracteres
+            
+            # Log de progresso a cada 5 caracteres
+            if (i + 1) % 5 == 0:
+                logger.debug(f"Digitados {i + 1}/{len(numero)} caracteres")
+        
+        time.sleep(0.5)
+    
     def clicar_pesquisar(self) -> bool:
         """
         Clica no botão Pesquisar
@@ -143,10 +320,17 @@ class STFScraper:
             botao = self.wait.until(
                 EC.element_to_be_clickable((By.ID, "btnPesquisar"))
             )
-            botao.click()
-            
-            # Aguarda página processar
-            time.sleep(3)
+            url_anterior = self.driver.current_url
+            with self.limiter.slot():
+                botao.click()
+            
+            # Aguarda a página do processo ou a mensagem de não encontrado
+            indice = self.browser.wait_any([
+                {"tipo": "url", "alvo": url_anterior},
+                {"tipo": "text_present", "alvo": "Processo não encontrado"},
+            ], timeout=15, nome="resultado da pesquisa")
+            if indice == -1:
+                self.limiter.penalize("resultado da pesquisa não carregou no prazo")
             
             logger.info("Pesquisa iniciada")
             return True
@@ -155,261 +339,158 @@ class STFScraper:
             logger.error(f"Erro ao clicar em Pesquisar: {e}")
             return False
     
-    def verificar_processo_encontrado(self) -> bool:
+    def pesquisar_por_url(self, numero: str) -> bool:
         """
-        Verifica se o processo foi encontrado ou se retornou 'Processo não encontrado'
+        Pesquisa abrindo direto a URL da listagem pelo número único (sem
+        selecionar tipo, digitar nem voltar à página inicial depois)
         
-        Returns:
-            True se processo encontrado, False se não encontrado
-        """
-        try:
-            # Aguarda página carregar
-            time.sleep(2)
+        Args:
+            numero: Número único (apenas dígitos)
             
-            # Verifica se aparece mensagem de não encontrado
-            try:
-                body_text = self.driver.find_element(By.TAG_NAME, "body").text
-                
-                if "Processo não encontrado" in body_text:
-                    logger.warning("Processo não encontrado no STF")
-                    return False
-                
-                # Se não tem mensagem de erro, considera encontrado
-                logger.info("Processo encontrado")
-                return True
-                
-            except Exception:
-                # Se não conseguiu verificar, assume encontrado
-                return True
-                
-        except Exception as e:
-            logger.error(f"Erro ao verificar se processo foi encontrado: {e}")
-            return True  # Em caso de erro, assume encontrado para tentar extrair
-    
-    def extrair_partes(self) -> str:
-        """
-        Extrai partes do processo usando JavaScript
-        
         Returns:
-            String com partes formatadas ou "-"
+            True se a página trouxe detalhe, lista ou não encontrado
         """
         try:
-            logger.info("Extraindo partes do processo...")
-            
-            # JavaScript para extrair partes
-            js_script = """
-                const linhas = document.querySelectorAll("#partes-resumidas > div");
-                let resultado = [];
-
-                linhas.forEach(div => {
-                    const sigla = div.children[0]?.innerText?.trim().replace(/\\(.*?\\)/g, '');
-                    const nome = div.children[1]?.innerText?.trim();
-                    if (sigla && nome) {
-                        resultado.push(`${sigla} - ${nome}`);
-                    }
-                });
-
-                return resultado.join(' • ');
-            """
-            
-            partes = self.driver.execute_script(js_script)
-            
-            if partes:
-                logger.info(f"Partes extraídas: {partes[:100]}...")
-                return escape_json_string(partes)
-            else:
-                logger.warning("Nenhuma parte encontrada")
-                return "-"
-                
+            logger.info(f"Pesquisando por URL: {numero}")
+            with self.limiter.slot():
+                self.driver.get(f"{STF_PROCESSOS_URL}listarProcessos.asp?numeroUnico={numero}")
+            encontrou = self.browser.wait_any(RESULT_MARKERS, timeout=15, nome="pesquisa por URL") != -1
+            if not encontrou:
+                self.limiter.penalize("pesquisa por URL sem resultado no prazo")
+                self._falha_url("página sem resultado")
+                return False
+            self._falhas_url = 0
+            return True
         except Exception as e:
-            logger.error(f"Erro ao extrair partes: {e}")
-            return "-"
+            self._falha_url(str(e))
+            return False
     
-    def extrair_numero_superior(self) -> str:
-        """
-        Extrai número do processo superior
-        
-        Returns:
-            Número superior ou "-"
-        """
-        try:
-            # Busca o número do processo no cabeçalho da página
-            # Tenta primeiro pelo seletor mais específico
-            try:
-                elemento = self.driver.find_element(By.XPATH, "//section//div[@class='row']//div[@class='col-md-9']//h2")
-                numero = elemento.text.strip()
-            except:
-                # Fallback: busca qualquer h2 na página de detalhe
-                elemento = self.driver.find_element(By.XPATH, "//section//h2[contains(@class, '') or not(@class)]")
-                numero = elemento.text.strip()
-            
-            # Extrai apenas primeiros 11 (ou 10) caracteres conforme lógica do PA
-            if numero:
-                if "ARE" in numero:
-                    numero = numero[:11]
-                else:
-                    numero = numero[:10]
-                
-                logger.info(f"Número superior extraído: {numero}")
-                return numero
-            else:
-                return "-"
-                
-        except Exception as e:
-            logger.warning(f"Número superior não encontrado: {e}")
-            return "-"
+    def _falha_url(self, motivo: str):
+        """Conta uma falha da pesquisa por URL e desliga o modo após falhas seguidas"""
+        self._falhas_url += 1
+        logger.warning(f"Pesquisa por URL falhou ({motivo})")
+        if self.url_search and self._falhas_url >= URL_SEARCH_MAX_FAILURES:
+            logger.warning("Pesquisa por URL desativada nesta execução - usando o formulário")
+            self.url_search = False
     
-    def extrair_decisao(self) -> str:
+    def classificar_resultado(self) -> Outcome:
         """
-        Extrai última decisão
+        Classifica a página após a pesquisa com seletores pontuais dentro da
+        página (sem ler o texto inteiro do body)
         
         Returns:
-            Texto da decisão ou "-"
+            Outcome.DETALHES, NAO_ENCONTRADO, MULTIPLOS ou um desfecho de bloqueio
         """
         try:
-            # Busca primeiro item da lista de decisões
-            # O mesmo conteúdo da movimentação geralmente serve como decisão
-            decisao = "-"
-            
-            # Como já temos a movimentação, podemos usar ela como decisão
-            # ou buscar especificamente na aba Decisões
-            try:
-                elemento = self.driver.find_element(By.XPATH, "//ul[contains(@class, 'timeline')]//li[1]//div[@class='description']")
-                decisao = elemento.text.strip()
-            except:
-                # Se não encontrar, usa a movimentação mesmo
-                logger.debug("Usando movimentação como decisão")
-                return "-"
+            # Aguarda o conteúdo do processo, a mensagem de não encontrado ou uma lista de resultados
+            self.browser.wait_any(RESULT_MARKERS, timeout=10, nome="detalhe do processo")
             
-            if decisao:
-                logger.info(f"Decisão extraída: {decisao[:100]}...")
-                return escape_json_string(decisao)
-            else:
-                return "-"
-                
+            desfecho = Outcome.parse(self.driver.execute_script(CLASSIFIER_SCRIPT))
         except Exception as e:
-            logger.warning(f"Decisão não encontrada: {e}")
-            return "-"
+            logger.error(f"Erro ao classificar resultado da pesquisa: {e}")
+            desfecho = Outcome.DESCONHECIDO
+        
+        OUTCOMES.record(desfecho)
+        if desfecho.is_blocking:
+            self.limiter.penalize(f"página de resultado '{desfecho.value}'")
+        else:
+            self.limiter.reward()
+        if desfecho == Outcome.DETALHES:
+            logger.info("Processo encontrado")
+        elif desfecho == Outcome.NAO_ENCONTRADO:
+            logger.warning("Processo não encontrado no STF")
+        else:
+            logger.warning(f"Resultado da pesquisa: {desfecho.value}")
+            take_screenshot(self.driver, f"resultado_{desfecho.value}")
+        return desfecho
     
-    def clicar_aba_decisoes(self) -> bool:
+    def extrair_dados(self) -> Dict[str, str]:
         """
-        Clica na aba 'Decisões' para expandir a seção
+        Extrai partes, número superior, decisão, movimentação e link numa
+        única chamada dentro da página (EXTRACTOR_SCRIPT); a aba Decisões só é
+        clicada se continuar vazia na metade do prazo de extração
         
         Returns:
-            True se sucesso
+            Dict com reu, superior, decisao, movimentacao e link ("-" quando ausente)
         """
+        cadeias = {nome: SELECTORS_REGISTRY.chain(nome) for nome in ("movimentacao", "numero_superior", "aba_decisoes")}
         try:
-            logger.info("Clicando na aba Decisões...")
-            
-            # Procura pelo link com texto "Decisões" dentro da li com classe li-decisoes
-            # Tenta múltiplos seletores para maior robustez
-            seletores = [
-                "li.li-decisoes a[href='#decisoes']",
-                "a[href='#decisoes']",
-                "//a[contains(@href, '#decisoes')]//span[contains(text(), 'Decisões')]/..",
-                "//span[text()='Decisões']/.."
-            ]
-            
-            elemento = None
-            for seletor in seletores:
-                try:
-                    if seletor.startswith("//"):
-                        # XPath
-                        elemento = self.wait.until(
-                            EC.element_to_be_clickable((By.XPATH, seletor))
-                        )
-                    else:
-                        # CSS Selector
-                        elemento = self.wait.until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, seletor))
-                        )
-                    break
-                except TimeoutException:
-                    continue
-            
-            if elemento:
-                elemento.click()
-                time.sleep(1)
-                logger.info("Aba Decisões clicada com sucesso")
-                return True
-            else:
-                logger.warning("Não foi possível encontrar aba Decisões")
-                return False
-                
+            logger.info("Extraindo dados do processo...")
+            registro = self.driver.execute_async_script(
+                EXTRACTOR_SCRIPT, cadeias, int(EXTRACTION_TIMEOUT * 1000)
+            ) or {}
         except Exception as e:
-            logger.error(f"Erro ao clicar na aba Decisões: {e}")
-            take_screenshot(self.driver, "erro_aba_decisoes")
-            return False
+            logger.error(f"Erro ao extrair dados do processo: {e}")
+            take_screenshot(self.driver, "erro_extracao")
+            registro = {}
+        
+        self.ultima_extracao = registro
+        brutos = registro.get("dados") or {}
+        seletores = registro.get("seletores") or {}
+        
+        SELECTORS_REGISTRY.record_match("movimentacao", seletores.get("movimentacao"))
+        if seletores.get("superior") != "input#classe-numero-processo":
+            SELECTORS_REGISTRY.record_match("numero_superior", seletores.get("superior"))
+        if "aba_decisoes" in seletores:
+            SELECTORS_REGISTRY.record_match("aba_decisoes", seletores["aba_decisoes"])
+        
+        dados = {
+            "reu": escape_json_string(brutos["reu"]) if brutos.get("reu") else "-",
+            "superior": brutos.get("superior") or "-",
+            "decisao": escape_json_string(brutos["decisao"]) if brutos.get("decisao") else "-",
+            "movimentacao": escape_json_string(brutos["movimentacao"]) if brutos.get("movimentacao") else "-",
+            "link": brutos.get("link") or "-",
+        }
+        
+        logger.info(f"Dados extraídos em {registro.get('tempos', {}).get('total', '?')} ms: "
+                    f"superior={dados['superior']} movimentação={dados['movimentacao'][:80]}")
+        logger.debug(f"Extração: tempos={registro.get('tempos')} seletores={seletores}")
+        if dados["movimentacao"] == "-":
+            logger.warning("Movimentação não encontrada em nenhum seletor da cadeia")
+            take_screenshot(self.driver, "erro_extracao_movimentacao")
+        return dados
     
-    def extrair_movimentacao(self) -> str:
+    def obter_incidente(self) -> Optional[str]:
         """
-        Extrai última movimentação/decisão
+        Lê o incidente do processo (campo oculto da página de detalhe)
         
         Returns:
-            Texto da movimentação ou "-"
+            Incidente ou None se não estiver numa página de detalhe
         """
         try:
-            # Clica na aba Decisões (substitui os 40 TABs)
-            if not self.clicar_aba_decisoes():
-                logger.warning("Não foi possível abrir aba Decisões, tentando método alternativo...")
-                # Fallback: usa o método antigo com TABs
-                for _ in range(40):
-                    self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.TAB)
-                    time.sleep(0.02)
-                
-                time.sleep(0.3)
-                self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ENTER)
-                time.sleep(1)
-            
-            # Extrai movimentação da aba de decisões
-            # Tenta primeiro no conteúdo da aba decisoes
-            seletores_decisao = [
-                "#decisoes > div > div:first-child",
-                "#decisoes ul li:first-child",
-                "div[id='decisoes'] > div"
-            ]
-            
-            movimentacao = None
-            for seletor in seletores_decisao:
-                try:
-                    elemento = self.driver.find_element(By.CSS_SELECTOR, seletor)
-                    movimentacao = elemento.text.strip()
-                    if movimentacao:
-                        break
-                except:
-                    continue
-            
-            # Se não encontrou, tenta o seletor original
-            if not movimentacao:
-                selector = "html > body > div:eq(0) > div:eq(1) > section > div > div > div > div > div > div > div:eq(1) > div:eq(3) > div:eq(3) > div > div:eq(0) > div"
-                elemento = self.driver.find_element(By.CSS_SELECTOR, selector)
-                movimentacao = elemento.text.strip()
-            
-            if movimentacao:
-                logger.info(f"Movimentação extraída: {movimentacao[:100]}...")
-                return escape_json_string(movimentacao)
-            else:
-                return "-"
-                
+            return self.driver.execute_script(
+                "var el = document.getElementById('incidente'); return el ? el.value : null;"
+            ) or None
         except Exception as e:
-            logger.warning(f"Movimentação não encontrada: {e}")
-            take_screenshot(self.driver, "erro_extracao_movimentacao")
-            return "-"
+            logger.debug(f"Incidente não encontrado: {e}")
+            return None
     
-    def obter_link_atual(self) -> str:
+    def abrir_detalhe_cache(self, url: str, numero: str) -> bool:
         """
-        Obtém URL atual do processo
+        Abre direto a página de detalhe guardada no cache de identificadores
         
+        Args:
+            url: URL de detalhe gravada numa execução anterior
+            numero: Número único (apenas dígitos) a conferir na página
+            
         Returns:
-            URL ou "-"
+            True se a URL ainda leva ao detalhe do mesmo processo
         """
         try:
-            url = self.driver.current_url
-            logger.info(f"Link do processo: {url}")
-            return url
+            logger.info(f"Abrindo detalhe do cache: {url}")
+            with self.limiter.slot():
+                self.driver.get(url)
+            self.browser.wait_any([
+                {"tipo": "element", "alvo": "#partes-resumidas > div"},
+                {"tipo": "text_present", "alvo": "Processo não encontrado"},
+            ], timeout=10, nome="detalhe do cache")
+            return bool(self.driver.execute_script("""
+                return !!document.getElementById('incidente') &&
+                       (document.body.textContent || '').replace(/\\D/g, '').indexOf(arguments[0]) !== -1;
+            """, numero))
         except Exception as e:
-            logger.error(f"Erro ao obter link: {e}")
-            return "-"
+            logger.warning(f"URL do cache não abriu: {e}")
+            return False
     
     def voltar_pagina_inicial(self) -> bool:
         """
@@ -425,9 +506,10 @@ class STFScraper:
             logo = self.wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "img[alt='Supremo Tribunal Federal']"))
             )
-            logo.click()
-            
-            time.sleep(2)
+            with self.limiter.slot():
+                logo.click()
+            if not self.browser.wait_until_ready():
+                raise TimeoutException("Página inicial não ficou pronta")
             logger.info("Retornou à página inicial")
             return True
             
@@ -437,7 +519,6 @@ class STFScraper:
             try:
                 from .config import STF_URL
                 self.driver.get(STF_URL)
-                time.sleep(2)
-                return True
+                return self.browser.wait_until_ready()
             except:
                 return False
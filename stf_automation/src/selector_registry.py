@@ -0,0 +1,197 @@
+"""
+Registro central de seletores com cadeias de fallback e taxa de acerto
+"""
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import SELECTOR_CHAINS, SELECTOR_PROBE_TIMEOUT
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Testa a cadeia inteira dentro da página (CSS ou XPath iniciado por "/" ou "(")
+# e resolve com o primeiro seletor que casar; reavalia a cada mutação do DOM
+# até o prazo. Seletores inválidos são devolvidos para o log, não abortam a cadeia.
+PROBE_SCRIPT = """
+    var seletores = arguments[0], limite = arguments[1], exigirVisivel = arguments[2], exigirTexto = arguments[3];
+    var done = arguments[arguments.length - 1];
+    var inicio = performance.now();
+    var obs = null, timer = null, invalidos = {};
+
+    function localizar(s) {
+        try {
+            if (s.charAt(0) === '/' || s.charAt(0) === '(') {
+                return document.evaluate(s, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            }
+            return document.querySelector(s);
+        } catch (e) {
+            invalidos[s] = true;
+            return null;
+        }
+    }
+    function visivel(el) {
+        return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    }
+    function avaliar() {
+        for (var i = 0; i < seletores.length; i++) {
+            if (invalidos[seletores[i]]) continue;
+            var el = localizar(seletores[i]);
+            if (!el || (exigirVisivel && !visivel(el))) continue;
+            var texto = (el.innerText || el.textContent || '').trim();
+            if (exigirTexto && !texto) continue;
+            return {indice: i, elemento: el, texto: texto};
+        }
+        return null;
+    }
+    function terminar(achado) {
+        if (obs) obs.disconnect();
+        clearTimeout(timer);
+        achado = achado || {indice: -1, elemento: null, texto: ''};
+        achado.ms = Math.round(performance.now() - inicio);
+        achado.invalidos = Object.keys(invalidos);
+        done(achado);
+    }
+
+    var achado = avaliar();
+    if (achado || limite <= 0) { terminar(achado); return; }
+
+    obs = new MutationObserver(function() {
+        var a = avaliar();
+        if (a) terminar(a);
+    });
+    obs.observe(document.documentElement, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['style', 'class', 'hidden']
+    });
+    timer = setTimeout(function() { terminar(avaliar()); }, limite);
+"""
+
+
+class SelectorRegistry:
+    """
+    Cadeias de seletores por campo de um portal. Cada cadeia é testada numa
+    única chamada dentro da página, com prazo curto, em vez de um
+    WebDriverWait longo por seletor; assim um seletor que deixou de existir
+    custa milissegundos, não o timeout do navegador.
+
+    Cada seletor acumula tentativas e acertos; chain() devolve a cadeia
+    ordenada pela taxa de acerto observada (com suavização, para que
+    seletores ainda não testados mantenham a ordem original).
+    """
+
+    def __init__(self, portal: str, cadeias: Dict[str, Sequence[str]]):
+        self.portal = portal
+        self._cadeias = {nome: list(seletores) for nome, seletores in cadeias.items()}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
+            lambda: defaultdict(lambda: {"tentativas": 0, "acertos": 0})
+        )
+
+    def _taxa(self, nome: str, seletor: str) -> float:
+        registro = self.stats[nome][seletor]
+        return (registro["acertos"] + 1) / (registro["tentativas"] + 2)
+
+    def chain(self, nome: str) -> List[str]:
+        """
+        Cadeia do campo, do seletor mais certeiro para o menos
+
+        Args:
+            nome: Nome da cadeia (chave de SELECTOR_CHAINS)
+
+        Returns:
+            Lista de seletores
+        """
+        with self._lock:
+            original = self._cadeias[nome]
+            return sorted(original, key=lambda s: (-self._taxa(nome, s), original.index(s)))
+
+    def record(self, nome: str, seletor: Optional[str], tentados: Sequence[str]):
+        """
+        Registra o resultado de uma busca
+
+        Args:
+            nome: Nome da cadeia
+            seletor: Seletor que casou (None se nenhum)
+            tentados: Seletores avaliados, incluindo o que casou
+        """
+        with self._lock:
+            for tentado in tentados:
+                self.stats[nome][tentado]["tentativas"] += 1
+            if seletor:
+                self.stats[nome][seletor]["acertos"] += 1
+
+    def record_match(self, nome: str, seletor: Optional[str]):
+        """
+        Registra um acerto obtido fora de probe() (script que já avaliou a
+        cadeia na ordem de chain()): conta como tentados os anteriores a ele
+
+        Args:
+            nome: Nome da cadeia
+            seletor: Seletor que casou (None se nenhum)
+        """
+        cadeia = self.chain(nome)
+        if seletor in cadeia:
+            self.record(nome, seletor, cadeia[:cadeia.index(seletor) + 1])
+        else:
+            self.record(nome, None, cadeia)
+
+    def probe(self, driver, nome: str, timeout: float = SELECTOR_PROBE_TIMEOUT,
+              visivel: bool = False, com_texto: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Procura o primeiro seletor da cadeia presente na página, numa única
+        chamada que aguarda no máximo `timeout` segundos
+
+        Args:
+            driver: WebDriver da aba
+            nome: Nome da cadeia
+            timeout: Prazo em segundos (0 = só o estado atual)
+            visivel: Exige elemento visível
+            com_texto: Exige texto não vazio
+
+        Returns:
+            {"seletor", "elemento", "texto", "ms"} ou None se nenhum casou
+        """
+        cadeia = self.chain(nome)
+        try:
+            achado = driver.execute_async_script(
+                PROBE_SCRIPT, cadeia, int(timeout * 1000), visivel, com_texto
+            )
+        except Exception as e:
+            logger.warning(f"Seletores '{nome}' não puderam ser testados: {e}")
+            return None
+
+        for invalido in achado.get("invalidos") or []:
+            logger.warning(f"Seletor inválido na cadeia '{nome}': {invalido}")
+
+        indice = achado.get("indice", -1)
+        if indice == -1:
+            self.record(nome, None, cadeia)
+            logger.debug(f"Nenhum seletor de '{nome}' casou em {achado.get('ms')} ms")
+            return None
+
+        seletor = cadeia[indice]
+        self.record(nome, seletor, cadeia[:indice + 1])
+        logger.debug(f"Seletor de '{nome}': {seletor} ({achado.get('ms')} ms)")
+        return {"seletor": seletor, "elemento": achado["elemento"],
+                "texto": achado.get("texto") or "", "ms": achado.get("ms")}
+
+    def report(self):
+        """Registra no log a taxa de acerto de cada seletor"""
+        with self._lock:
+            linhas = [
+                f"  {nome}: " + ", ".join(
+                    f"{seletor} {registro['acertos']}/{registro['tentativas']}"
+                    for seletor, registro in seletores.items() if registro["tentativas"]
+                )
+                for nome, seletores in sorted(self.stats.items())
+                if any(registro["tentativas"] for registro in seletores.values())
+            ]
+        if linhas:
+            logger.info(f"Seletores ({self.portal}, acertos/tentativas):")
+            for linha in linhas:
+                logger.info(linha)
+
+
+# Registro do portal (taxas acumuladas durante a execução)
+SELECTORS_REGISTRY = SelectorRegistry("STF", SELECTOR_CHAINS)
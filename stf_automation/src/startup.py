@@ -0,0 +1,105 @@
+"""
+Inicialização concorrente: busca da lista no Supabase em paralelo com a
+abertura do navegador, com registro do caminho crítico
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Tuple
+
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StartupProfiler:
+    """Registra início e fim de cada fase, agrupadas por ramo (thread)"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.fases: List[Tuple[str, str, float, float]] = []
+
+    @contextmanager
+    def fase(self, ramo: str, nome: str):
+        """
+        Mede uma fase da inicialização
+
+        Uso:
+            with profiler.fase("navegador", "abertura do Chrome"):
+                ...
+        """
+        inicio = time.perf_counter() - self.t0
+        try:
+            yield
+        finally:
+            fim = time.perf_counter() - self.t0
+            with self._lock:
+                self.fases.append((ramo, nome, inicio, fim))
+
+    def report(self):
+        """Registra no log as fases de cada ramo e qual deles ditou o tempo total"""
+        with self._lock:
+            fases = sorted(self.fases, key=lambda f: f[2])
+        if not fases:
+            return
+
+        fim_por_ramo: Dict[str, float] = {}
+        for ramo, _, _, fim in fases:
+            fim_por_ramo[ramo] = max(fim_por_ramo.get(ramo, 0.0), fim)
+        critico = max(fim_por_ramo, key=fim_por_ramo.get)
+
+        logger.info("=" * 60)
+        logger.info("INICIALIZAÇÃO - CAMINHO CRÍTICO")
+        for ramo, nome, inicio, fim in fases:
+            marcador = "*" if ramo == critico else " "
+            logger.info(f" {marcador} [{ramo}] {nome}: +{inicio:.2f}s, {fim - inicio:.2f}s")
+        for ramo, fim in fim_por_ramo.items():
+            if ramo != critico:
+                logger.info(f"  Folga de '{ramo}': {fim_por_ramo[critico] - fim:.2f}s")
+        logger.info(f"  Pronto em {fim_por_ramo[critico]:.2f}s (caminho crítico: {critico})")
+        logger.info("=" * 60)
+
+
+def bootstrap(
+    fetch: Callable[[], List[Dict]],
+    start_browser: Callable[[threading.Event], bool],
+    profiler: StartupProfiler,
+) -> Tuple[List[Dict], bool]:
+    """
+    Executa a busca da lista e a abertura do navegador ao mesmo tempo
+
+    Se a lista vier vazia, sinaliza o ramo do navegador para abortar (ele
+    fecha o Chrome ao terminar a etapa em andamento) e retorna sem esperá-lo.
+
+    Args:
+        fetch: Busca a lista de trabalho (roda na thread atual)
+        start_browser: Abre o navegador até o portal; recebe o evento de
+            abortar e deve conferi-lo entre as etapas
+        profiler: Registro das fases
+
+    Returns:
+        (processos, navegador_pronto)
+    """
+    abortar = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup")
+    navegador = pool.submit(start_browser, abortar)
+
+    try:
+        with profiler.fase("supabase", "busca da lista de processos"):
+            processos = fetch() or []
+    except Exception:
+        abortar.set()
+        pool.shutdown(wait=False)
+        raise
+
+    if not processos:
+        logger.info("Lista vazia - abortando abertura do navegador")
+        abortar.set()
+        pool.shutdown(wait=False)
+        return [], False
+
+    pronto = navegador.result()
+    pool.shutdown()
+    return processos, pronto
@@ -2,12 +2,19 @@
 Funções utilitárias
 """
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from .config import LOGS_DIR, SCREENSHOTS_DIR
 
+# Escrita das capturas de tela fora da thread do navegador (pipeline); None = grava na hora
+_screenshot_writer: Optional[ThreadPoolExecutor] = None
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -66,6 +73,12 @@ def take_screenshot(driver, name: str) -> Optional[str]:
         filename = f"{name}_{timestamp}.png"
         filepath = SCREENSHOTS_DIR / filename
         
+        writer = _screenshot_writer
+        if writer:
+            # Só a captura usa o navegador; o arquivo é gravado em segundo plano
+            writer.submit(_write_screenshot, filepath, driver.get_screenshot_as_png())
+            return str(filepath)
+        
         driver.save_screenshot(str(filepath))
         return str(filepath)
         
@@ -75,6 +88,84 @@ def take_screenshot(driver, name: str) -> Optional[str]:
         return None
 
 
+def _write_screenshot(filepath: Path, png: bytes):
+    try:
+        filepath.write_bytes(png)
+    except Exception as e:
+        get_logger(__name__).error(f"Erro ao capturar screenshot: {e}")
+
+
+@contextmanager
+def deferred_screenshots():
+    """
+    Grava os arquivos de take_screenshot numa thread própria enquanto o bloco
+    roda; o bloco termina só depois de todas as capturas estarem em disco
+    """
+    global _screenshot_writer
+    _screenshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshots")
+    try:
+        yield
+    finally:
+        writer, _screenshot_writer = _screenshot_writer, None
+        writer.shutdown(wait=True)
+
+
+class _DeferredHandler(logging.Handler):
+    """Entrega o registro aos handlers originais do logger numa thread própria"""
+    
+    def __init__(self, fila: "queue.SimpleQueue", destinos: List[logging.Handler]):
+        super().__init__()
+        self.fila = fila
+        self.destinos = destinos
+    
+    def emit(self, record: logging.LogRecord):
+        # Mensagem e traceback resolvidos agora: os objetos podem mudar até a escrita
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.fila.put((self.destinos, record))
+
+
+def _write_logs(fila: "queue.SimpleQueue"):
+    while True:
+        item = fila.get()
+        if item is None:
+            return
+        destinos, record = item
+        for handler in destinos:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+@contextmanager
+def deferred_logging():
+    """
+    Escreve os logs (arquivo e console) numa thread própria enquanto o bloco
+    roda, sem segurar quem registrou a mensagem
+    """
+    # Cada módulo do pacote tem handlers próprios (get_logger)
+    pacote = __name__.rsplit(".", 1)[0]
+    loggers = [
+        lg for nome, lg in list(logging.root.manager.loggerDict.items())
+        if isinstance(lg, logging.Logger) and nome.split(".")[0] == pacote and lg.handlers
+    ]
+    fila: "queue.SimpleQueue" = queue.SimpleQueue()
+    originais = {lg: lg.handlers[:] for lg in loggers}
+    for lg, handlers in originais.items():
+        lg.handlers = [_DeferredHandler(fila, handlers)]
+    escritor = threading.Thread(target=_write_logs, args=(fila,), name="logs", daemon=True)
+    escritor.start()
+    try:
+        yield
+    finally:
+        for lg, handlers in originais.items():
+            lg.handlers = handlers
+        fila.put(None)
+        escritor.join()
+
+
 def format_processo_number(numero: str) -> str:
     """
     Formata número do processo removendo caracteres especiais
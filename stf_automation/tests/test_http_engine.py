@@ -0,0 +1,97 @@
+"""
+Teste offline do parser do motor HTTP do STF
+Usa as páginas salvas em examples/ (não acessa o portal)
+
+Execute: python -m unittest tests.test_http_engine
+"""
+import sys
+import os
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import html
+
+from src.http_engine import (
+    is_not_found, parse_incidente, parse_numero_superior,
+    parse_partes, parse_movimentacao, parse_decisao,
+)
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+
+def carregar(nome: str) -> html.HtmlElement:
+    with open(os.path.join(EXAMPLES_DIR, nome), "rb") as f:
+        return html.fromstring(f.read())
+
+
+class TestPaginaValida(unittest.TestCase):
+    """page_valida.html: detalhe do RE 1538879 com as abas já carregadas"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.doc = carregar("page_valida.html")
+
+    def test_encontrado(self):
+        self.assertFalse(is_not_found(self.doc))
+
+    def test_incidente(self):
+        self.assertEqual(parse_incidente(self.doc), "7178763")
+
+    def test_numero_superior(self):
+        self.assertEqual(parse_numero_superior(self.doc), "RE 1538879")
+
+    def test_partes(self):
+        partes = parse_partes(self.doc)
+        self.assertTrue(partes.startswith("RECTE. - A.E.S.F."))
+        self.assertIn("ADV. - WAGNER SILVA FRANCO (279063/SP)", partes)
+        self.assertIn("RECDO. - MINISTÉRIO PÚBLICO DO ESTADO DE SÃO PAULO", partes)
+        self.assertEqual(partes.count(" • "), 3)
+
+    def test_movimentacao(self):
+        # O fragmento de abaDecisoes.asp é o conteúdo de #decisoes
+        decisoes = self.doc.cssselect("#decisoes")[0]
+        self.assertEqual(
+            parse_movimentacao(decisoes),
+            "10/03/2025 Determinada a devolução pelo regime da repercussão geral "
+            "PRESIDÊNCIA Tema nº 905 - RE 973837"
+        )
+
+    def test_decisao_sem_timeline(self):
+        andamentos = self.doc.cssselect("#andamentos")[0]
+        self.assertEqual(parse_decisao(andamentos), "-")
+
+
+class TestPaginaInvalida(unittest.TestCase):
+    """page_invalida.html: resposta de 'Processo não encontrado'"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.doc = carregar("page_invalida.html")
+
+    def test_nao_encontrado(self):
+        self.assertTrue(is_not_found(self.doc))
+
+    def test_sem_dados(self):
+        self.assertIsNone(parse_incidente(self.doc))
+        self.assertEqual(parse_partes(self.doc), "-")
+        self.assertEqual(parse_numero_superior(self.doc), "-")
+
+
+class TestFragmento(unittest.TestCase):
+    """Fragmentos soltos, como chegam de abaPartes.asp/abaDecisoes.asp"""
+
+    def test_partes_fragmento(self):
+        doc = carregar("page_valida.html")
+        fragmento = html.fromstring(html.tostring(doc.cssselect("#partes-resumidas")[0]))
+        self.assertEqual(parse_partes(fragmento), parse_partes(doc))
+
+    def test_decisoes_fragmento(self):
+        doc = carregar("page_valida.html")
+        fragmento = html.fromstring(html.tostring(doc.cssselect("#decisoes > div")[0]))
+        self.assertEqual(parse_movimentacao(fragmento), parse_movimentacao(doc.cssselect("#decisoes")[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Teste offline do pipeline em etapas (não abre navegador nem acessa o banco)
+
+Execute: python -m unittest tests.test_pipeline
+"""
+import sys
+import os
+import time
+import threading
+import unittest
+from collections import defaultdict
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pipeline import StagedPipeline, Etapa
+
+
+class TestStagedPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.eventos = []
+        self.concluidos = []
+        self.falhas = []
+        self.extracao_iniciou = defaultdict(threading.Event)
+
+    def _pipeline(self, gravacao):
+        def pesquisa(item):
+            self.eventos.append(("pesquisa", item["n"]))
+            time.sleep(0.01)
+            return item
+
+        def extracao(item):
+            self.eventos.append(("extração", item["n"]))
+            self.extracao_iniciou[item["n"]].set()
+            return item
+
+        return StagedPipeline(
+            [
+                Etapa("pesquisa", pesquisa, executor="navegador", reserva=True),
+                Etapa("extração", extracao, executor="navegador", libera=True),
+                Etapa("gravação", gravacao, executor="io"),
+            ],
+            ao_concluir=self.concluidos.append,
+            ao_falhar=lambda item, erro: self.falhas.append(item["n"]),
+        )
+
+    def test_navegador_atende_um_item_por_vez(self):
+        pipeline = self._pipeline(lambda item: item)
+        pipeline.run({"n": n} for n in range(5))
+        esperado = [(etapa, n) for n in range(5) for etapa in ("pesquisa", "extração")]
+        self.assertEqual(self.eventos, esperado)
+        self.assertEqual([item["n"] for item in self.concluidos], list(range(5)))
+
+    def test_gravacao_sobrepoe_a_proxima_pesquisa(self):
+        total = 6
+        sobrepostas = []
+
+        def gravacao(item):
+            # A gravação do item N só termina depois que a extração do N+1 começou
+            # (em série ela nunca começaria e a espera estouraria o prazo)
+            proximo = item["n"] + 1
+            if proximo < total:
+                sobrepostas.append(self.extracao_iniciou[proximo].wait(timeout=5))
+            return item
+
+        pipeline = self._pipeline(gravacao)
+        pipeline.run({"n": n} for n in range(total))
+        self.assertEqual(sobrepostas, [True] * (total - 1))
+        self.assertEqual([item["n"] for item in self.concluidos], list(range(total)))
+
+    def test_excecao_descarta_so_o_item(self):
+        def gravacao(item):
+            if item["n"] == 1:
+                raise RuntimeError("falha no PATCH")
+            return item
+
+        pipeline = self._pipeline(gravacao)
+        pipeline.run({"n": n} for n in range(3))
+        self.assertEqual(self.falhas, [1])
+        self.assertEqual([item["n"] for item in self.concluidos], [0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
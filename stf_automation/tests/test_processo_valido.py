@@ -53,7 +53,7 @@ def testar_processo_valido():
             logger.info("✅ Processo encontrado! Extraindo movimentação...")
             
             # Extrai movimentação
-            movimentacao = scraper.extrair_movimentacao()
+            movimentacao = scraper.extrair_dados()["movimentacao"]
             
             if movimentacao:
                 logger.info(f"✅ Movimentação extraída com sucesso!")
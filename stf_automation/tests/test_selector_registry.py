@@ -0,0 +1,41 @@
+"""
+Teste offline da reordenação das cadeias de seletores (não abre navegador)
+
+Execute: python -m unittest tests.test_selector_registry
+"""
+import sys
+import os
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.selector_registry import SelectorRegistry
+
+
+class TestCadeia(unittest.TestCase):
+
+    def setUp(self):
+        self.registro = SelectorRegistry("STF", {"aba": ["#a", "#b", "//c"]})
+
+    def test_ordem_original_sem_historico(self):
+        self.assertEqual(self.registro.chain("aba"), ["#a", "#b", "//c"])
+
+    def test_reordena_pelo_acerto(self):
+        for _ in range(3):
+            self.registro.record("aba", "//c", ["#a", "#b", "//c"])
+        self.assertEqual(self.registro.chain("aba")[0], "//c")
+
+    def test_falha_total_nao_muda_ordem(self):
+        self.registro.record("aba", None, ["#a", "#b", "//c"])
+        self.assertEqual(self.registro.chain("aba"), ["#a", "#b", "//c"])
+
+    def test_record_match_conta_os_anteriores(self):
+        self.registro.record_match("aba", "#b")
+        self.assertEqual(self.registro.stats["aba"]["#a"], {"tentativas": 1, "acertos": 0})
+        self.assertEqual(self.registro.stats["aba"]["#b"], {"tentativas": 1, "acertos": 1})
+        self.assertEqual(self.registro.stats["aba"]["//c"]["tentativas"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,20 +7,32 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from typing import Optional, List
+from selenium.common.exceptions import TimeoutException
+from typing import Optional, List, Dict, Any
 from pathlib import Path
 import time
 
 from .config import (
     HEADLESS, BROWSER_TIMEOUT, USER_AGENT, 
-    CHROME_PROFILE_DIR, STJ_URL, MAX_RETRIES
+    STJ_URL, STJ_HOST, MAX_RETRIES, PAGE_LOAD_STRATEGY, SELECTORS,
+    CDP_EVAL, CHROME_DISK_CACHE_MB, NETWORK_STATS
 )
 from .utils import get_logger, take_screenshot
+from .driver_cache import resolve_chromedriver
+from .resource_blocker import ResourceBlocker
+from .dom_wait import DomWaiter
+from .rate_limiter import for_host
+from .cdp_channel import CDPChannel, CDPEvaluationError, CDPNotSentError, CDPResponseLostError
+from .chrome_profile import acquire_profile, release_profile, CacheMetrics
 
 logger = get_logger(__name__)
 
+# Formulário de pesquisa utilizável: campo do número e função de consulta definidos
+READY_SCRIPT = """
+    return !!document.querySelector(arguments[0]) &&
+           typeof quandoClicaConsultar === 'function';
+"""
+
 
 class BrowserHandler:
     """Gerenciador do navegador Chrome"""
@@ -29,6 +41,11 @@ class BrowserHandler:
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
         self.timeout = BROWSER_TIMEOUT
+        self.blocker: Optional[ResourceBlocker] = None
+        self.cdp: Optional[CDPChannel] = None
+        self.waiter: Optional[DomWaiter] = None
+        self.profile_dir: Optional[Path] = None
+        self.cache_metrics: Optional[CacheMetrics] = None
     
     def start(self) -> bool:
         """
@@ -55,32 +72,117 @@ class BrowserHandler:
             options.add_argument("--window-size=1920,1080")
             options.add_argument("--start-maximized")
             
+            # Abas em segundo plano continuam carregando em ritmo normal (modo multi-abas)
+            options.add_argument("--disable-background-timer-throttling")
+            options.add_argument("--disable-renderer-backgrounding")
+            options.add_argument("--disable-backgrounding-occluded-windows")
+            
+            # Não espera subrecursos: a prontidão é decidida por wait_until_ready()
+            if PAGE_LOAD_STRATEGY in ("normal", "eager", "none"):
+                options.page_load_strategy = PAGE_LOAD_STRATEGY
+            
             if HEADLESS:
                 options.add_argument("--headless=new")
                 logger.info("Modo headless ativado")
             
-            # Instala/atualiza ChromeDriver automaticamente
-            service = Service(ChromeDriverManager().install())
+            # Perfil persistente: cache HTTP em disco reaproveitado entre execuções
+            # (o perfil principal se estiver livre, senão um clone para este worker)
+            self.profile_dir = acquire_profile()
+            if self.profile_dir:
+                options.add_argument(f"--user-data-dir={self.profile_dir}")
+                options.add_argument(f"--disk-cache-size={CHROME_DISK_CACHE_MB * 1024 * 1024}")
+                logger.info(f"Perfil do Chrome: {self.profile_dir}")
+            self.cache_metrics = CacheMetrics(self.profile_dir)
+            
+            # Eventos de rede para contabilizar recursos bloqueados/carregados
+            if NETWORK_STATS:
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
+            # Resolve ChromeDriver pelo cache local (rede só na primeira vez)
+            driver_path = resolve_chromedriver()
+            if not driver_path:
+                logger.error("ChromeDriver indisponível")
+                release_profile(self.profile_dir)
+                return False
+            service = Service(driver_path)
             
             self.driver = webdriver.Chrome(service=service, options=options)
             self.wait = WebDriverWait(self.driver, self.timeout)
+            self.waiter = DomWaiter(self.driver, self.timeout)
+            
+            # Perfil de bloqueio de imagens, fontes, mídia e terceiros
+            self.blocker = ResourceBlocker(self.driver)
+            self._prepare_tab()
             
-            # Remove flags de automação
-            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-                "source": """
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    })
-                """
-            })
+            # Canal direto para execute_script (cai para o WebDriver se indisponível)
+            self.cdp = CDPChannel(self.driver) if CDP_EVAL else None
+            if self.cdp and not self.cdp.available:
+                logger.warning("debuggerAddress indisponível - execute_script via WebDriver")
+                self.cdp = None
             
             logger.info("Navegador iniciado com sucesso")
             return True
             
         except Exception as e:
             logger.error(f"Erro ao iniciar navegador: {e}")
+            release_profile(self.profile_dir)
             return False
     
+    def _prepare_tab(self):
+        """Aplica os comandos CDP que valem por aba (a aba atual)"""
+        # Remove flags de automação
+        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+            "source": """
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                })
+            """
+        })
+        self.blocker.install()
+    
+    def open_tab(self) -> Optional[str]:
+        """
+        Abre nova aba no mesmo Chrome, já na página de consulta
+        
+        Returns:
+            Window handle da nova aba ou None
+        """
+        try:
+            self.driver.switch_to.new_window("tab")
+            if self.cdp:
+                self.cdp.current_handle = self.driver.current_window_handle
+            self._prepare_tab()
+            if not self.navigate_to_stj():
+                return None
+            return self.driver.current_window_handle
+        except Exception as e:
+            logger.error(f"Erro ao abrir nova aba: {e}")
+            return None
+    
+    def switch_to_tab(self, handle: str):
+        """
+        Troca a aba ativa do WebDriver e do canal CDP
+        
+        Args:
+            handle: Window handle da aba
+        """
+        self.driver.switch_to.window(handle)
+        if self.cdp:
+            self.cdp.current_handle = handle
+    
+    def close_tab(self, handle: str):
+        """
+        Fecha uma aba (o foco deve ser trocado em seguida com switch_to_tab)
+        
+        Args:
+            handle: Window handle da aba
+        """
+        self.switch_to_tab(handle)
+        self.driver.close()
+        if self.cdp:
+            self.cdp.drop(handle)
+            self.cdp.current_handle = None
+    
     def navigate_to_stj(self) -> bool:
         """
         Navega para página de consulta do STJ
@@ -93,14 +195,14 @@ class BrowserHandler:
         for attempt in range(1, max_attempts + 1):
             try:
                 logger.info(f"Navegando para {STJ_URL} (tentativa {attempt}/{max_attempts})")
-                self.driver.get(STJ_URL)
-                
-                # Aguarda página carregar
-                time.sleep(3)  # Pequeno delay para garantir carregamento
+                with for_host(STJ_HOST).slot():
+                    self.driver.get(STJ_URL)
                 
-                self.wait.until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
+                # Retorna assim que o formulário de pesquisa estiver utilizável
+                if not self.wait_until_ready():
+                    # O bloqueio pode ter removido a função de pesquisa: recarrega sem ele
+                    if not (self._ensure_page_functions() and self.wait_until_ready(timeout=1)):
+                        raise TimeoutException("formulário de pesquisa não ficou pronto")
                 
                 # Verifica se chegou na página correta - mais flexível
                 titulo = self.driver.title.lower()
@@ -108,6 +210,9 @@ class BrowserHandler:
                 
                 if "stj" in titulo or "stj" in url_atual or "consulta" in titulo:
                     logger.info(f"Página STJ carregada com sucesso (título: {self.driver.title})")
+                    if not self._ensure_page_functions():
+                        logger.warning("Função de pesquisa ausente mesmo sem bloqueio de recursos")
+                    self.cache_metrics.record(self.driver)
                     return True
                 else:
                     logger.warning(f"Título inesperado: {self.driver.title}")
@@ -127,6 +232,38 @@ class BrowserHandler:
         
         return False
     
+    def wait_until_ready(self, timeout: Optional[int] = None) -> bool:
+        """
+        Aguarda o formulário de pesquisa do STJ ficar utilizável:
+        campo #idNumeroUnico presente e quandoClicaConsultar definida
+        
+        Args:
+            timeout: Timeout customizado (usa padrão se None)
+            
+        Returns:
+            True se a página ficou pronta
+        """
+        try:
+            WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=0.1).until(
+                lambda d: d.execute_script(READY_SCRIPT, SELECTORS["campo_nup"])
+            )
+            return True
+        except TimeoutException:
+            logger.warning("Timeout aguardando formulário de pesquisa do STJ")
+            return False
+    
+    def is_ready(self) -> bool:
+        """
+        Confere numa única chamada, sem esperar, se a aba está no formulário de pesquisa
+        
+        Returns:
+            True se o formulário já está utilizável
+        """
+        try:
+            return bool(self.driver.execute_script(READY_SCRIPT, SELECTORS["campo_nup"]))
+        except Exception:
+            return False
+    
     def wait_for_element(
         self, 
         by: By, 
@@ -154,18 +291,40 @@ class BrowserHandler:
             logger.warning(f"Timeout aguardando elemento: {value}")
             return None
     
-    def execute_script(self, script: str) -> any:
+    def execute_script(self, script: str, *args) -> any:
         """
-        Executa JavaScript no contexto da página
+        Executa JavaScript no contexto da página.
+        
+        Usa o canal CDP direto quando disponível (uma ida e volta local,
+        resultado por valor). Só cai para o WebDriver quando o comando nem
+        chegou à aba (argumentos não serializáveis em JSON, ex: WebElement,
+        ou websocket indisponível): se a resposta se perder depois do envio o
+        script não é repetido, porque pode ter rodado (clique, submissão).
         
         Args:
             script: Código JavaScript
+            *args: Valores disponíveis no script como arguments[i]
             
         Returns:
-            Resultado da execução
+            Resultado da execução (None se a resposta do CDP se perdeu)
+            
+        Raises:
+            CDPEvaluationError: o script lançou exceção na página
         """
+        if self.cdp:
+            try:
+                return self.cdp.evaluate(script, *args)
+            except CDPEvaluationError as e:
+                logger.error(f"Erro no script da página: {e}")
+                raise
+            except CDPNotSentError as e:
+                logger.debug(f"Canal CDP indisponível ({e}) - usando WebDriver")
+            except CDPResponseLostError as e:
+                logger.warning(f"Resposta do canal CDP perdida ({e}) - script não será repetido")
+                return None
+        
         try:
-            return self.driver.execute_script(script)
+            return self.driver.execute_script(script, *args)
         except Exception as e:
             logger.error(f"Erro ao executar script: {e}")
             return None
@@ -247,22 +406,109 @@ class BrowserHandler:
         Returns:
             True se desapareceu
         """
+        return self.wait_text_gone(text, timeout)
+
+    def wait_any(self, condicoes: List[Dict[str, Any]], timeout: Optional[float] = None,
+                 nome: Optional[str] = None) -> int:
+        """
+        Aguarda dentro da página a primeira condição verdadeira (MutationObserver)
+        
+        Args:
+            condicoes: Lista de {"tipo", "alvo", "extra"}; tipos: text_gone,
+                text_present, element (extra=True exige visível), count, url
+            timeout: Timeout em segundos (usa padrão se None)
+            nome: Rótulo da espera nas estatísticas
+            
+        Returns:
+            Índice da condição satisfeita ou -1 (timeout/erro)
+        """
         try:
-            end_time = time.time() + timeout
-            while time.time() < end_time:
-                if not self.page_contains_text(text):
-                    return True
-                time.sleep(0.5)
+            return self.waiter.wait_any(condicoes, timeout, nome)
+        except Exception as e:
+            logger.error(f"Erro ao aguardar condição na página: {e}")
+            return -1
+    
+    def wait_text_gone(self, text: str, timeout: Optional[float] = None) -> bool:
+        """Aguarda o texto sumir da página"""
+        return self.wait_any([{"tipo": "text_gone", "alvo": text}], timeout, "texto sumir") == 0
+    
+    def wait_element(self, selector: str, timeout: Optional[float] = None, visible: bool = False) -> bool:
+        """Aguarda o elemento existir (ou ficar visível) na página"""
+        return self.wait_any(
+            [{"tipo": "element", "alvo": selector, "extra": visible}], timeout, f"elemento {selector}"
+        ) == 0
+    
+    def wait_count_change(self, selector: str, inicial: Optional[int] = None,
+                          timeout: Optional[float] = None) -> bool:
+        """Aguarda a quantidade de elementos mudar (inicial=None: conta no início da espera)"""
+        return self.wait_any(
+            [{"tipo": "count", "alvo": selector, "extra": inicial}], timeout, f"contagem {selector}"
+        ) == 0
+    
+    def wait_url_change(self, url_anterior: str, timeout: Optional[float] = None) -> bool:
+        """Aguarda a URL da aba deixar de ser url_anterior"""
+        return self.wait_any([{"tipo": "url", "alvo": url_anterior}], timeout, "mudança de URL") == 0
+    
+    def _ensure_page_functions(self) -> bool:
+        """
+        Confere se o bloqueio não removeu scripts que a pesquisa exige.
+        Se removeu, desativa o bloqueio e recarrega a página.
+        
+        Returns:
+            True se a página está íntegra
+        """
+        if not self.blocker or not self.blocker.enabled:
+            return True
+        
+        ausentes = self.blocker.missing_page_functions()
+        if not ausentes:
+            return True
+        
+        logger.warning(f"Funções ausentes com bloqueio ativo ({', '.join(ausentes)}) - recarregando sem bloqueio")
+        self.blocker.disable()
+        self.driver.refresh()
+        self.wait_until_ready()
+        return not self.blocker.missing_page_functions()
+    
+    def drain_network_log(self):
+        """Esvazia o log de performance nos contadores do bloqueio (uma vez por consulta)"""
+        if NETWORK_STATS and self.blocker and self.driver:
+            self.blocker.collect()
+    
+    def is_alive(self) -> bool:
+        """
+        Verifica se a sessão do navegador ainda responde
+        
+        Returns:
+            True se o Chrome e a aba atual respondem a comandos
+        """
+        if not self.driver:
             return False
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
         except Exception as e:
-            logger.error(f"Erro ao aguardar texto desaparecer: {e}")
+            logger.warning(f"Navegador não responde: {e}")
             return False
     
     def close(self):
         """Fecha o navegador"""
         try:
             if self.driver:
+                if self.blocker:
+                    self.blocker.report()
+                if self.cache_metrics:
+                    self.cache_metrics.report()
+                if self.waiter:
+                    self.waiter.report()
+                if self.cdp:
+                    self.cdp.close()
+                    self.cdp = None
                 self.driver.quit()
+                self.driver = None
                 logger.info("Navegador fechado")
         except Exception as e:
             logger.error(f"Erro ao fechar navegador: {e}")
+        finally:
+            release_profile(self.profile_dir)
+            self.profile_dir = None
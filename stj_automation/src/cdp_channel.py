@@ -0,0 +1,159 @@
+"""
+Canal direto de avaliação JavaScript via CDP (Runtime.evaluate por websocket)
+"""
+import itertools
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import websocket
+
+from .config import BROWSER_TIMEOUT
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class CDPEvaluationError(Exception):
+    """Exceção lançada pelo script avaliado na página"""
+
+
+class CDPNotSentError(Exception):
+    """O comando nem chegou à aba (conexão ou argumentos): pode ser refeito pelo WebDriver"""
+
+
+class CDPResponseLostError(Exception):
+    """O comando foi enviado mas a resposta se perdeu: o script pode ter rodado"""
+
+
+class CDPChannel:
+    """
+    Conexão websocket direta com a aba do Chrome já aberto pelo Selenium.
+
+    Cada execute_script via WebDriver passa por HTTP até o ChromeDriver, que
+    por sua vez fala CDP com o Chrome. Aqui o Runtime.evaluate vai direto ao
+    DevTools da aba: uma ida e volta local, promises aguardadas e resultado
+    serializado por valor (JSON), sem conversão para WebElement.
+
+    O handle de janela do ChromeDriver é o próprio targetId do CDP, então
+    mantemos uma conexão por aba, aberta sob demanda.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.debugger_address = (
+            driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+        )
+        self.current_handle: Optional[str] = None
+        self._sockets: Dict[str, websocket.WebSocket] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_time = 0.0
+
+    @property
+    def available(self) -> bool:
+        return bool(self.debugger_address)
+
+    def _socket(self, handle: str) -> websocket.WebSocket:
+        """Abre (ou reaproveita) o websocket do DevTools da aba"""
+        ws = self._sockets.get(handle)
+        if ws is None or not ws.connected:
+            url = f"ws://{self.debugger_address}/devtools/page/{handle}"
+            # Sem cabeçalho Origin o Chrome aceita a conexão sem --remote-allow-origins
+            ws = websocket.create_connection(url, timeout=BROWSER_TIMEOUT, suppress_origin=True)
+            self._sockets[handle] = ws
+            logger.debug(f"Canal CDP aberto para a aba {handle[:8]}")
+        return ws
+
+    def _call(self, handle: str, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Envia um comando CDP e aguarda a resposta correspondente
+
+        Raises:
+            CDPNotSentError: falha antes do envio (nada rodou na aba)
+            CDPResponseLostError: falha depois do envio (o comando pode ter rodado)
+        """
+        msg_id = next(self._ids)
+        try:
+            ws = self._socket(handle)
+            ws.send(json.dumps({"id": msg_id, "method": method, "params": params}))
+        except (websocket.WebSocketException, OSError, TypeError, ValueError) as e:
+            self.drop(handle)
+            raise CDPNotSentError(str(e)) from e
+
+        try:
+            while True:
+                resposta = json.loads(ws.recv())
+                if resposta.get("id") != msg_id:
+                    continue  # Eventos ou respostas atrasadas
+                break
+        except (websocket.WebSocketException, OSError, ValueError) as e:
+            self.drop(handle)
+            raise CDPResponseLostError(str(e)) from e
+        if "error" in resposta:
+            # Erro de protocolo (ex.: aba navegou durante a avaliação)
+            raise CDPResponseLostError(resposta["error"].get("message", "erro CDP"))
+        return resposta.get("result", {})
+
+    def evaluate(self, script: str, *args) -> Any:
+        """
+        Executa o script com a mesma semântica do execute_script do Selenium
+        (corpo de função com 'return' e arguments[i])
+
+        Args:
+            script: Código JavaScript
+            *args: Argumentos serializáveis em JSON
+
+        Returns:
+            Valor retornado pelo script (promises são aguardadas)
+
+        Raises:
+            CDPNotSentError: argumentos não serializáveis ou aba inacessível
+            CDPResponseLostError: resposta perdida depois do envio
+            CDPEvaluationError: exceção lançada pelo próprio script
+        """
+        if not self.current_handle:
+            self.current_handle = self.driver.current_window_handle
+
+        try:
+            argumentos = json.dumps(list(args))
+        except (TypeError, ValueError) as e:
+            raise CDPNotSentError(f"argumentos não serializáveis: {e}") from e
+        expressao = f"(function() {{\n{script}\n}}).apply(null, {argumentos})"
+        params = {
+            "expression": expressao,
+            "awaitPromise": True,
+            "returnByValue": True,
+            "userGesture": True,
+        }
+
+        inicio = time.perf_counter()
+        with self._lock:
+            resultado = self._call(self.current_handle, "Runtime.evaluate", params)
+        self.calls += 1
+        self.total_time += time.perf_counter() - inicio
+
+        if "exceptionDetails" in resultado:
+            detalhes = resultado["exceptionDetails"]
+            descricao = detalhes.get("exception", {}).get("description") or detalhes.get("text")
+            raise CDPEvaluationError(descricao)
+        return resultado.get("result", {}).get("value")
+
+    def drop(self, handle: str):
+        """Descarta a conexão de uma aba (fechada ou com falha)"""
+        ws = self._sockets.pop(handle, None)
+        if ws:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Fecha todas as conexões e registra o tempo médio por avaliação"""
+        for handle in list(self._sockets):
+            self.drop(handle)
+        if self.calls:
+            media = self.total_time / self.calls * 1000
+            logger.info(f"Canal CDP: {self.calls} avaliações, média de {media:.1f} ms")
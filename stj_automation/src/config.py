@@ -14,6 +14,19 @@ BASE_DIR = Path(__file__).parent
 LOGS_DIR = BASE_DIR / "logs"
 SCREENSHOTS_DIR = BASE_DIR / "screenshots"
 CHROME_PROFILE_DIR = BASE_DIR / "chrome_profile"
+CHROME_PROFILE_CLONES_DIR = BASE_DIR / "chrome_profile_clones"
+# Estratégia de preenchimento de campos aprendida (ver input_fill.py)
+INPUT_FILL_STATE_FILE = BASE_DIR / "input_fill.json"
+# Cache tjsp → identificador do processo no portal (SQLite); False = sempre pesquisar
+ID_CACHE = os.getenv("ID_CACHE", "True").lower() == "true"
+ID_CACHE_FILE = BASE_DIR / "identificadores.db"
+
+# Limite de requisições por host (token bucket comum a threads e processos)
+RATE_LIMIT = os.getenv("RATE_LIMIT", "True").lower() == "true"
+RATE_LIMIT_PER_SEC = float(os.getenv("RATE_LIMIT_PER_SEC", "1"))        # Taxa sustentada
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "3"))            # Requisições seguidas permitidas
+RATE_LIMIT_MIN_PER_SEC = float(os.getenv("RATE_LIMIT_MIN_PER_SEC", "0.1"))  # Piso após erros/429/503
+RATE_LIMIT_FILE = BASE_DIR / "rate_limit.db"
 
 # Cria diretórios se não existirem
 LOGS_DIR.mkdir(exist_ok=True)
@@ -27,11 +40,80 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
 # URLs STJ
 STJ_URL = "https://processo.stj.jus.br/processo/pesquisa/?aplicacao=processos.ea"
+STJ_HOST = "processo.stj.jus.br"
 
 # Configurações do navegador
 HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"
 BROWSER_TIMEOUT = int(os.getenv("BROWSER_TIMEOUT", "30"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+# normal = espera todos os recursos; eager = só o DOM; none = retorna imediatamente.
+# Em eager/none a navegação termina pelo predicado de prontidão do portal.
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "eager").lower()
+# Perfil persistente em CHROME_PROFILE_DIR: cache HTTP e sessão reaproveitados entre execuções
+PERSISTENT_PROFILE = os.getenv("PERSISTENT_PROFILE", "True").lower() == "true"
+CHROME_DISK_CACHE_MB = int(os.getenv("CHROME_DISK_CACHE_MB", "256"))
+
+# execute_script via websocket CDP direto na aba (Runtime.evaluate), sem passar pelo ChromeDriver
+CDP_EVAL = os.getenv("CDP_EVAL", "True").lower() == "true"
+
+# Pool de navegadores pré-aquecidos
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_POOL_ACQUIRE_TIMEOUT = int(os.getenv("DRIVER_POOL_ACQUIRE_TIMEOUT", "120"))
+
+# Modo multi-abas: K abas no mesmo Chrome com pesquisas intercaladas (1 = serial)
+STJ_TABS = int(os.getenv("STJ_TABS", "1"))
+TAB_SEARCH_TIMEOUT = int(os.getenv("TAB_SEARCH_TIMEOUT", "15"))
+
+# Modo multi-worker: N workers, cada um com navegador (ou motor HTTP) próprio (1 = serial)
+STJ_WORKERS = int(os.getenv("STJ_WORKERS", "1"))
+
+# Modo pipeline: pesquisa/extração no navegador, classificação e gravação no banco em etapas
+# assíncronas ligadas por filas limitadas (a gravação de um item corre junto com o próximo)
+PIPELINE = os.getenv("PIPELINE", "False").lower() == "true"
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))  # Itens em espera entre etapas
+
+# Motor de consulta: "selenium" (navegador) ou "http" (requisições diretas, navegador só como fallback)
+STJ_ENGINE = os.getenv("STJ_ENGINE", "selenium").lower()
+STJ_SEARCH_URL = "https://processo.stj.jus.br/processo/pesquisa/"
+# Pesquisa por URL (GET parametrizado) em vez do formulário + "Nova Consulta" a cada item
+# Desligada por padrão: ainda não validada contra o portal
+URL_SEARCH = os.getenv("URL_SEARCH", "False").lower() == "true"
+HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "20"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+
+# Watchdog do navegador: recicla o Chrome a cada N consultas ou acima do limite de memória
+WATCHDOG_RECYCLE_EVERY = int(os.getenv("WATCHDOG_RECYCLE_EVERY", "150"))  # 0 desativa
+WATCHDOG_MAX_RSS_MB = int(os.getenv("WATCHDOG_MAX_RSS_MB", "1500"))  # 0 desativa (requer psutil)
+WATCHDOG_SAMPLE_EVERY = int(os.getenv("WATCHDOG_SAMPLE_EVERY", "10"))
+WATCHDOG_MAX_RETRIES = int(os.getenv("WATCHDOG_MAX_RETRIES", "1"))
+
+# Cache local do ChromeDriver (compartilhado entre os robôs STF e STJ)
+DRIVER_CACHE_DIR = Path(os.getenv("DRIVER_CACHE_DIR", str(Path.home() / ".monitor_chromedriver")))
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")  # Caminho explícito, ignora o cache
+DRIVER_OFFLINE = os.getenv("DRIVER_OFFLINE", "False").lower() == "true"
+
+# Modo daemon (python run.py --daemon): navegador residente recebendo jobs via HTTP local
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("STJ_DAEMON_PORT", "8766"))
+
+# Bloqueio de recursos via CDP (imagens, fontes, mídia e hosts de terceiros)
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "True").lower() == "true"
+# Log de performance do ChromeDriver (contadores de rede do relatório de bloqueio)
+NETWORK_STATS = os.getenv("NETWORK_STATS", "True").lower() == "true"
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+]
+BLOCKED_HOSTS = [
+    "fonts.googleapis.com", "fonts.gstatic.com", "use.fontawesome.com",
+    "vlibras.gov.br", "www.googletagmanager.com", "www.google-analytics.com",
+    "cdn.appdynamics.com", "www.youtube.com",
+]
+# Hosts isentos de BLOCKED_HOSTS (não é lista de permissão: os demais hosts carregam)
+# e funções JS que a pesquisa exige após o carregamento
+ALLOWED_HOSTS = ["processo.stj.jus.br"]
+REQUIRED_PAGE_FUNCTIONS = ["quandoClicaConsultar"]
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -39,6 +121,16 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 # User Agent
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+# Cadeias de seletores por campo (CSS ou XPath), reordenadas pela taxa de acerto
+# observada; cada cadeia é testada numa única chamada com prazo curto
+SELECTOR_PROBE_TIMEOUT = float(os.getenv("SELECTOR_PROBE_TIMEOUT", "2"))
+SELECTOR_CHAINS = {
+    "link_decisao": [
+        "a.clsDecisoesMonocraticasTopoLink",
+        "a[onclick*='/processo/dj/documento/mediado/']",
+    ],
+}
+
 # Seletores (CSS)
 SELECTORS = {
     "campo_nup": "#idNumeroUnico",
@@ -0,0 +1,155 @@
+"""
+Esperas dentro da página com MutationObserver (execute_async_script)
+"""
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from selenium.common.exceptions import WebDriverException
+
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Erros do WebDriver que indicam apenas troca de documento durante a espera
+NAVIGATION_ERRORS = ("unload", "context", "detached", "navigat")
+
+# Resolve quando qualquer uma das condições for verdadeira; reavalia a cada
+# mutação do DOM (e a cada 50 ms para mudanças de URL via history API)
+WAIT_SCRIPT = """
+    var condicoes = arguments[0], limite = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var inicio = performance.now();
+    var obs = null, timer = null, intervalo = null;
+
+    function visivel(el) {
+        return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+    }
+    condicoes.forEach(function(c) {
+        if (c.tipo === 'count' && c.extra === null) {
+            c.extra = document.querySelectorAll(c.alvo).length;
+        }
+    });
+    function avaliar() {
+        var texto = null;
+        function conteudo() {
+            if (texto === null) texto = document.body ? document.body.textContent : '';
+            return texto;
+        }
+        for (var i = 0; i < condicoes.length; i++) {
+            var c = condicoes[i];
+            if ((c.tipo === 'text_gone' && conteudo().indexOf(c.alvo) === -1) ||
+                (c.tipo === 'text_present' && conteudo().indexOf(c.alvo) !== -1) ||
+                (c.tipo === 'element' && (c.extra ? visivel(document.querySelector(c.alvo))
+                                                  : !!document.querySelector(c.alvo))) ||
+                (c.tipo === 'count' && document.querySelectorAll(c.alvo).length !== c.extra) ||
+                (c.tipo === 'url' && location.href !== c.alvo)) {
+                return i;
+            }
+        }
+        return -1;
+    }
+    function terminar(indice) {
+        if (obs) obs.disconnect();
+        clearTimeout(timer);
+        clearInterval(intervalo);
+        done({indice: indice, ms: Math.round(performance.now() - inicio)});
+    }
+
+    var indice = avaliar();
+    if (indice !== -1) { terminar(indice); return; }
+
+    obs = new MutationObserver(function() {
+        var i = avaliar();
+        if (i !== -1) terminar(i);
+    });
+    obs.observe(document.documentElement, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['style', 'class', 'hidden']
+    });
+    intervalo = setInterval(function() {
+        var i = avaliar();
+        if (i !== -1) terminar(i);
+    }, 50);
+    timer = setTimeout(function() { terminar(-1); }, limite);
+"""
+
+
+class DomWaiter:
+    """
+    Esperas resolvidas pelo próprio navegador no instante em que o DOM muda,
+    em vez de puxar page_source a cada 500 ms.
+
+    Se a espera atravessa uma navegação (o documento é descarregado), o
+    script é reinstalado no documento novo até o prazo acabar. Cada tipo de
+    espera acumula quantidade, tempo total e timeouts para o relatório.
+    """
+
+    def __init__(self, driver, timeout: int):
+        self.driver = driver
+        self.timeout = timeout
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"esperas": 0, "ms": 0.0, "timeouts": 0}
+        )
+        # Folga para o script assíncrono sempre terminar antes do WebDriver desistir
+        driver.set_script_timeout(timeout + 5)
+
+    def wait_any(self, condicoes: Sequence[Dict[str, Any]], timeout: Optional[float] = None,
+                 nome: Optional[str] = None) -> int:
+        """
+        Aguarda a primeira condição verdadeira
+
+        Args:
+            condicoes: Lista de {"tipo", "alvo", "extra"} (ver WAIT_SCRIPT)
+            timeout: Segundos máximos (padrão: timeout do navegador)
+            nome: Rótulo da espera nas estatísticas
+
+        Returns:
+            Índice da condição satisfeita ou -1 em timeout
+        """
+        limite = min(timeout or self.timeout, self.timeout)
+        nome = nome or "+".join(c["tipo"] for c in condicoes)
+        payload: List[Dict[str, Any]] = [
+            {"tipo": c["tipo"], "alvo": c.get("alvo"), "extra": c.get("extra")} for c in condicoes
+        ]
+
+        inicio = time.perf_counter()
+        fim = inicio + limite
+        indice = -1
+        while True:
+            restante_ms = int((fim - time.perf_counter()) * 1000)
+            if restante_ms <= 0:
+                break
+            try:
+                resultado = self.driver.execute_async_script(WAIT_SCRIPT, payload, restante_ms)
+                indice = resultado["indice"] if resultado else -1
+                break
+            except WebDriverException as e:
+                if not any(marca in str(e.msg).lower() for marca in NAVIGATION_ERRORS):
+                    raise
+                # Documento descarregado no meio da espera: tenta no documento novo
+                logger.debug(f"Espera '{nome}' interrompida por navegação: {e.msg}")
+                time.sleep(0.05)
+
+        decorrido = (time.perf_counter() - inicio) * 1000
+        registro = self.stats[nome]
+        registro["esperas"] += 1
+        registro["ms"] += decorrido
+        if indice == -1:
+            registro["timeouts"] += 1
+            logger.debug(f"Espera '{nome}' expirou após {decorrido:.0f} ms")
+        else:
+            logger.debug(f"Espera '{nome}' resolvida em {decorrido:.0f} ms")
+        return indice
+
+    def report(self):
+        """Registra no log o tempo médio de cada tipo de espera"""
+        if not self.stats:
+            return
+        logger.info("Esperas no DOM:")
+        for nome, registro in sorted(self.stats.items()):
+            media = registro["ms"] / registro["esperas"]
+            logger.info(
+                f"  {nome}: {registro['esperas']:.0f} esperas, média {media:.0f} ms, "
+                f"{registro['timeouts']:.0f} timeouts"
+            )
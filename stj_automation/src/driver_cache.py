@@ -0,0 +1,224 @@
+"""
+Resolução offline do ChromeDriver com cache local por versão do Chrome
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from .config import DRIVER_CACHE_DIR, CHROMEDRIVER_PATH, DRIVER_OFFLINE
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+# Executáveis procurados fora do Windows, em ordem de preferência
+CHROME_BINARIES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+_lock = threading.Lock()
+_resolved: Optional[str] = None
+
+
+def _read_manifest() -> Dict[str, Any]:
+    """Lê o manifesto do cache (vazio se não existir ou estiver corrompido)"""
+    try:
+        with open(DRIVER_CACHE_DIR / MANIFEST_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: Dict[str, Any]):
+    """Grava o manifesto de forma atômica"""
+    DRIVER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = DRIVER_CACHE_DIR / f"{MANIFEST_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, DRIVER_CACHE_DIR / MANIFEST_FILE)
+
+
+def _chrome_version_windows() -> Optional[str]:
+    """Lê a versão do Chrome no registro do Windows (sem abrir processo)"""
+    import winreg
+
+    chaves = [
+        (winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon"),
+        (winreg.HKEY_LOCAL_MACHINE, r"Software\Google\Chrome\BLBeacon"),
+        (winreg.HKEY_LOCAL_MACHINE, r"Software\WOW6432Node\Google\Chrome\BLBeacon"),
+    ]
+    for raiz, caminho in chaves:
+        try:
+            with winreg.OpenKey(raiz, caminho) as chave:
+                versao, _ = winreg.QueryValueEx(chave, "version")
+                return versao
+        except OSError:
+            continue
+    return None
+
+
+def _chrome_version_posix(manifest: Dict[str, Any]) -> Optional[str]:
+    """
+    Obtém a versão do Chrome via '--version', reaproveitando o valor
+    gravado no manifesto enquanto o binário não mudar
+    """
+    for nome in CHROME_BINARIES:
+        binario = shutil.which(nome) or (nome if os.path.isfile(nome) else None)
+        if not binario:
+            continue
+
+        mtime = os.path.getmtime(binario)
+        anterior = manifest.get("chrome", {})
+        if anterior.get("binary") == binario and anterior.get("mtime") == mtime:
+            return anterior.get("version")
+
+        try:
+            saida = subprocess.run(
+                [binario, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+
+        match = re.search(r"(\d+\.\d+\.\d+\.\d+)", saida)
+        if match:
+            manifest["chrome"] = {"binary": binario, "mtime": mtime, "version": match.group(1)}
+            return match.group(1)
+    return None
+
+
+def detect_chrome_major(manifest: Dict[str, Any]) -> Optional[str]:
+    """
+    Detecta a versão principal (major) do Chrome instalado
+
+    Args:
+        manifest: Manifesto do cache (pode ser atualizado com a versão lida)
+
+    Returns:
+        Versão major como string (ex: '131') ou None
+    """
+    try:
+        if sys.platform.startswith("win"):
+            versao = _chrome_version_windows()
+        else:
+            versao = _chrome_version_posix(manifest)
+    except Exception as e:
+        logger.warning(f"Não foi possível detectar versão do Chrome: {e}")
+        return None
+
+    return versao.split(".")[0] if versao else None
+
+
+def _driver_major(caminho: Path) -> Optional[str]:
+    """
+    Lê a versão major do próprio ChromeDriver ('ChromeDriver 131.0.6778.85 ...')
+
+    Args:
+        caminho: Executável do ChromeDriver
+
+    Returns:
+        Versão major como string ou None
+    """
+    try:
+        saida = subprocess.run(
+            [str(caminho), "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"ChromeDriver (\d+)\.", saida)
+    return match.group(1) if match else None
+
+
+def _download_driver(major: str) -> Optional[Path]:
+    """
+    Baixa o ChromeDriver (única etapa com acesso à rede) e copia para o cache
+
+    Args:
+        major: Versão major do Chrome instalado
+
+    Returns:
+        Caminho do executável no cache ou None
+    """
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    logger.info(f"ChromeDriver para Chrome {major} não está no cache - baixando...")
+    origem = Path(ChromeDriverManager().install())
+
+    destino_dir = DRIVER_CACHE_DIR / f"chromedriver-{major}"
+    destino_dir.mkdir(parents=True, exist_ok=True)
+    destino = destino_dir / origem.name
+    shutil.copy2(origem, destino)
+    destino.chmod(0o755)
+    return destino
+
+
+def resolve_chromedriver() -> Optional[str]:
+    """
+    Resolve o caminho do ChromeDriver compatível com o Chrome instalado.
+
+    Ordem: CHROMEDRIVER_PATH, resultado já resolvido neste processo,
+    manifesto local, e só então download (desativado com DRIVER_OFFLINE).
+
+    Returns:
+        Caminho do executável ou None se não foi possível resolver
+    """
+    global _resolved
+
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+
+    with _lock:
+        if _resolved and os.path.isfile(_resolved):
+            return _resolved
+
+        manifest = _read_manifest()
+        original = json.dumps(manifest, sort_keys=True)
+        major = detect_chrome_major(manifest)
+        drivers = manifest.setdefault("drivers", {})
+
+        # Versão do Chrome ilegível: usa o driver baixado da última vez nessa situação
+        chave = major or manifest.get("sem_versao_chrome")
+        if chave and chave in drivers and os.path.isfile(drivers[chave]["path"]):
+            _resolved = drivers[chave]["path"]
+            if json.dumps(manifest, sort_keys=True) != original:
+                _write_manifest(manifest)
+            logger.debug(f"ChromeDriver {chave} resolvido pelo cache: {_resolved}")
+            return _resolved
+
+        if DRIVER_OFFLINE:
+            logger.error(
+                f"ChromeDriver para Chrome {major or '?'} ausente no cache "
+                f"({DRIVER_CACHE_DIR}) e DRIVER_OFFLINE=True"
+            )
+            return None
+
+        try:
+            caminho = _download_driver(major or "desconhecido")
+        except Exception as e:
+            logger.error(f"Erro ao baixar ChromeDriver: {e}")
+            return None
+
+        # Sem a versão do Chrome, registra pela versão do próprio driver
+        chave = major or _driver_major(caminho) or "desconhecido"
+        if not major:
+            manifest["sem_versao_chrome"] = chave
+        drivers[chave] = {
+            "path": str(caminho),
+            "registrado_em": datetime.now().isoformat(timespec="seconds"),
+        }
+        _write_manifest(manifest)
+        logger.info(f"ChromeDriver {chave} registrado no cache: {caminho}")
+
+        _resolved = str(caminho)
+        return _resolved
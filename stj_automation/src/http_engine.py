@@ -0,0 +1,315 @@
+"""
+Consulta ao portal STJ por HTTP direto (sem navegador)
+"""
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from lxml import html
+from requests.adapters import HTTPAdapter
+
+from .config import STJ_SEARCH_URL, STJ_HOST, HTTP_TIMEOUT, HTTP_POOL_SIZE, USER_AGENT
+from .rate_limiter import for_host
+from .utils import (
+    get_logger, sanitize_text, clean_url_for_pdf, is_hc_process,
+    pick_most_recent_candidate
+)
+
+logger = get_logger(__name__)
+
+STJ_BASE_URL = "https://processo.stj.jus.br"
+
+# Mesmo padrão do onclick usado na leitura dentro da página
+PDF_LINK_PATTERN = re.compile(r"'([^']*/processo/dj/documento/mediado/[^']*)'")
+
+
+def search_url(processo: str) -> str:
+    """URL GET da pesquisa do processo (leva direto ao detalhe quando há um só resultado)"""
+    return requests.Request("GET", STJ_SEARCH_URL, params=STJHttpEngine.search_params(processo)).prepare().url
+
+
+class STJHttpEngine:
+    """
+    Executa a pesquisa com uma sessão HTTP reaproveitada (keep-alive) e lê
+    as páginas de resultado e detalhes com lxml, devolvendo o mesmo dict de
+    STJScraper.extract_data().
+
+    Quando a resposta não se parece com nenhuma das páginas conhecidas
+    (status inesperado, layout alterado, bloqueio), lookup() retorna None e
+    o item deve seguir pelo navegador.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "pt-BR,pt;q=0.9",
+        })
+        self.stats = {"consultas": 0, "respondidas": 0, "fallbacks": 0, "requisicoes": 0, "ms": 0.0}
+
+    def _get(self, url: str, params: Optional[Dict[str, str]] = None) -> Optional[html.HtmlElement]:
+        """
+        Busca uma página e devolve a árvore HTML
+
+        Returns:
+            Documento parseado ou None se a resposta não for HTML válido
+        """
+        limiter = for_host(STJ_HOST)
+        with limiter.slot():
+            inicio = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=HTTP_TIMEOUT)
+            except requests.Timeout:
+                limiter.penalize("timeout na requisição")
+                raise
+            finally:
+                self.stats["requisicoes"] += 1
+                self.stats["ms"] += (time.perf_counter() - inicio) * 1000
+        limiter.feedback_status(response.status_code)
+
+        if response.status_code != 200 or "html" not in response.headers.get("Content-Type", "html"):
+            logger.warning(f"Resposta inesperada do STJ: HTTP {response.status_code} em {response.url}")
+            return None
+
+        doc = html.fromstring(response.content, base_url=response.url)
+        doc.make_links_absolute(response.url, resolve_base_href=True)
+        return doc
+
+    @staticmethod
+    def search_params(processo: str) -> Dict[str, str]:
+        """
+        Parâmetros da pesquisa equivalentes ao formulário
+
+        Args:
+            processo: Número do processo (NUP ou classe + número para HC)
+        """
+        if is_hc_process(processo):
+            tipo = "tipoPesquisaGenerica"
+            termo = processo.strip().upper()
+        else:
+            tipo = "tipoPesquisaNumeroUnico"
+            termo = re.sub(r"\D", "", processo)
+        return {
+            "tipoPesquisa": tipo,
+            "termo": termo,
+            "totalRegistrosPorPagina": "40",
+            "aplicacao": "processos.ea",
+        }
+
+    @staticmethod
+    def classify(doc: html.HtmlElement) -> Optional[str]:
+        """
+        Identifica a página recebida (mesma prioridade de STJScraper.verify_situation)
+
+        Returns:
+            'nao_encontrado', 'multiplos_processos', 'detalhes' ou None se desconhecida
+        """
+        for linha in doc.cssselect("#idDivBlocoMensagem.clsMensagemBloco .clsMensagemLinha"):
+            msg = linha.text_content().strip().lower()
+            if "nenhum registro" in msg or "não encontrado" in msg or "nao encontrado" in msg:
+                return "nao_encontrado"
+
+        if doc.cssselect("div.clsListaProcessoFormatoVerticalBlocoExterno"):
+            return "multiplos_processos"
+
+        if doc.cssselect("#idSpanClasseDescricao") and doc.cssselect(".classDivLinhaDetalhes"):
+            return "detalhes"
+
+        return None
+
+    @staticmethod
+    def candidates(doc: html.HtmlElement) -> List[Dict[str, Any]]:
+        """
+        Lê todos os blocos da lista de resultados de uma vez (mesmos campos
+        do PAGE_BUNDLE_SCRIPT do scraper)
+
+        Returns:
+            Lista de candidatos com registro, url, autuacao, classe, partes,
+            movimentacao e link
+        """
+        def texto(el) -> str:
+            return re.sub(r"\s+", " ", el.text_content()).strip()
+
+        lista = []
+        for index, bloco in enumerate(doc.cssselect("div.clsListaProcessoFormatoVerticalBlocoExterno")):
+            cand = {"index": index, "registro": "", "numero": "", "url": "", "autuacao": "", "classe": "",
+                    "partes": "", "movimentacao": "", "link": "", "campos": {}}
+
+            botao = bloco.cssselect("input.listaProcessosPartesBotoes")
+            match = re.search(r"idProcessosListaMaisMenosDetalhes(\d+)", botao[0].get("id") or "") if botao else None
+            if match:
+                cand["registro"] = match.group(1)
+
+            links = bloco.cssselect("a")
+            if links:
+                cand["url"] = links[0].get("href") or ""
+                cand["numero"] = texto(links[0])
+
+            for el in bloco.cssselect('[class*="clsLinhaProcessos"]'):
+                chave = re.search(r"clsLinhaProcessos(\w+)", el.get("class") or "")
+                valor = texto(el)
+                if chave and valor and chave.group(1) not in cand["campos"]:
+                    cand["campos"][chave.group(1)] = valor
+            for chave, valor in cand["campos"].items():
+                if chave == "DataAutuacao":
+                    cand["autuacao"] = valor
+                elif re.search("classe", chave, re.I) and not cand["classe"]:
+                    cand["classe"] = valor
+                elif re.search("fase|movimenta", chave, re.I) and not cand["movimentacao"]:
+                    cand["movimentacao"] = valor
+                elif re.search("parte", chave, re.I) and not cand["partes"]:
+                    cand["partes"] = valor
+
+            partes = []
+            for linha in bloco.cssselect(".classDivLinhaDetalhes"):
+                label = linha.cssselect(".classSpanDetalhesLabel")
+                valor = linha.cssselect(".classSpanDetalhesTexto a")
+                if label and valor and texto(label[0]) and texto(valor[0]):
+                    partes.append(f"{texto(label[0])} {texto(valor[0])}")
+            if partes:
+                cand["partes"] = " | ".join(partes)
+
+            for el in bloco.cssselect("[onclick]"):
+                pdf = PDF_LINK_PATTERN.search(el.get("onclick") or "")
+                if pdf:
+                    cand["link"] = STJ_BASE_URL + pdf.group(1)
+                    break
+
+            lista.append(cand)
+        return lista
+
+    @staticmethod
+    def parse_details(doc: html.HtmlElement) -> Dict[str, str]:
+        """
+        Extrai os campos da página de detalhes
+
+        Returns:
+            Dict com reu, superior, movimentacao e link (já sanitizados)
+        """
+        def texto(el) -> str:
+            return re.sub(r"\s+", " ", el.text_content()).strip()
+
+        partes = []
+        for linha in doc.cssselect("#idDetalhesPartesAdvogadosProcuradores .classDivLinhaDetalhes"):
+            label = linha.cssselect(".classSpanDetalhesLabel")
+            valor = linha.cssselect(".classSpanDetalhesTexto a")
+            if label and valor and texto(label[0]) and texto(valor[0]):
+                partes.append(f"{texto(label[0])} {texto(valor[0])}")
+
+        classe = doc.cssselect("#idSpanClasseDescricao")
+
+        movimentacao = ""
+        for linha in doc.cssselect(".classDivLinhaDetalhes"):
+            label = linha.cssselect(".classSpanDetalhesLabel")
+            valor = linha.cssselect(".classSpanDetalhesTexto")
+            if label and valor:
+                rotulo = texto(label[0]).upper()
+                if "ÚLTIMA FASE" in rotulo or "ULTIMA FASE" in rotulo:
+                    movimentacao = valor[0].text_content().strip()
+
+        link = doc.base_url or ""
+        for a in doc.cssselect("a.clsDecisoesMonocraticasTopoLink"):
+            match = PDF_LINK_PATTERN.search(a.get("onclick") or "")
+            if match:
+                link = STJ_BASE_URL + match.group(1)
+                break
+
+        return {
+            "reu": sanitize_text(" | ".join(partes)),
+            "superior": sanitize_text(texto(classe[0]) if classe else ""),
+            "movimentacao": sanitize_text(movimentacao),
+            "link": clean_url_for_pdf(link),
+        }
+
+    @staticmethod
+    def same_process(doc: html.HtmlElement, processo: str) -> bool:
+        """Confere se o número do processo aparece na página (ignorando a máscara)"""
+        digitos = re.sub(r"\D", "", processo)
+        return bool(digitos) and digitos in re.sub(r"\D", "", doc.text_content())
+
+    def _open_cached(self, processo: str, cache) -> Optional[html.HtmlElement]:
+        """
+        Abre a página de detalhes guardada no cache de identificadores,
+        invalidando a entrada se a URL não leva mais ao mesmo processo
+        """
+        entrada = cache.get(processo)
+        if not entrada:
+            return None
+        doc = self._get(entrada["url"])
+        if doc is not None and self.classify(doc) == "detalhes" and self.same_process(doc, processo):
+            return doc
+        cache.invalidate(processo, "URL não abre mais a página de detalhes")
+        return None
+
+    def lookup(self, processo: str, cache=None) -> Optional[Dict[str, Any]]:
+        """
+        Pesquisa um processo (ou abre direto a URL do cache de identificadores)
+
+        Args:
+            processo: Número do processo
+            cache: IdentifierCache opcional; o detalhe encontrado é gravado nele
+
+        Returns:
+            {"tipo": 'detalhes'|'nao_encontrado', "multiplos": bool, "dados": dict}
+            ou None se o item deve ser refeito pelo navegador
+        """
+        self.stats["consultas"] += 1
+        try:
+            doc = self._open_cached(processo, cache) if cache else None
+            if doc is not None:
+                self.stats["respondidas"] += 1
+                return {"tipo": "detalhes", "multiplos": False, "dados": self.parse_details(doc)}
+
+            doc = self._get(STJ_SEARCH_URL, self.search_params(processo))
+            tipo = self.classify(doc) if doc is not None else None
+            multiplos = tipo == "multiplos_processos"
+
+            if multiplos:
+                escolhido = pick_most_recent_candidate(self.candidates(doc))
+                if not escolhido or not escolhido["url"]:
+                    logger.warning("HTTP: lista de processos sem data de autuação legível")
+                    tipo = None
+                else:
+                    logger.info(f"HTTP: múltiplos processos - abrindo o mais recente ({escolhido['url']})")
+                    doc = self._get(escolhido["url"])
+                    tipo = self.classify(doc) if doc is not None else None
+                    if tipo != "detalhes":
+                        tipo = None
+
+            if tipo is None:
+                self.stats["fallbacks"] += 1
+                logger.warning(f"HTTP: página não reconhecida para {processo} - usando o navegador")
+                return None
+
+            self.stats["respondidas"] += 1
+            if tipo == "nao_encontrado":
+                return {"tipo": tipo, "multiplos": False, "dados": {}}
+
+            if cache:
+                match = re.search(r"num_registro=(\d+)", doc.base_url or "")
+                cache.put(processo, match.group(1) if match else "", doc.base_url)
+            return {"tipo": tipo, "multiplos": multiplos, "dados": self.parse_details(doc)}
+
+        except Exception as e:
+            self.stats["fallbacks"] += 1
+            logger.warning(f"HTTP: erro ao consultar {processo} ({e}) - usando o navegador")
+            return None
+
+    def report(self):
+        """Registra no log quantas consultas o HTTP resolveu e o tempo médio por requisição"""
+        if not self.stats["consultas"]:
+            return
+        media = self.stats["ms"] / self.stats["requisicoes"] if self.stats["requisicoes"] else 0
+        logger.info(
+            f"Motor HTTP: {self.stats['respondidas']}/{self.stats['consultas']} consultas sem navegador, "
+            f"{self.stats['fallbacks']} pelo navegador, média {media:.0f} ms por requisição"
+        )
+
+    def close(self):
+        """Encerra a sessão HTTP"""
+        self.report()
+        self.session.close()
@@ -3,16 +3,32 @@ Automação STJ - Entrada principal
 Consulta processos no portal do STJ e atualiza banco Supabase
 """
 import sys
+import threading
 import time
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from .browser_handler import BrowserHandler
 from .scraper import STJScraper
 from .supabase_client import SupabaseClient
 from .utils import get_logger, is_hc_process, take_screenshot
-from .config import MAX_RETRIES
+from .config import (
+    MAX_RETRIES, STJ_TABS, STJ_WORKERS, WATCHDOG_MAX_RETRIES, STJ_ENGINE, ID_CACHE, RATE_LIMIT, PIPELINE,
+    WATCHDOG_RECYCLE_EVERY,
+)
 from .progress_window import ProgressWindow
+from .multi_tab import MultiTabRunner
+from .worker_pool import WorkerPool
+from .pipeline import PipelineRunner
+from .driver_cache import resolve_chromedriver
+from .driver_pool import shared_pool, lease_browser, release_browser, close_shared_pool
+from .startup import StartupProfiler, bootstrap
+from .watchdog import BrowserWatchdog, BrowserDeadError, is_session_dead_error
+from .http_engine import STJHttpEngine
+from .id_cache import IdentifierCache
+from .page_outcome import Outcome, OUTCOMES
+from .selector_registry import SELECTORS_REGISTRY
+from .rate_limiter import report_all as report_rate_limits
 
 logger = get_logger(__name__)
 
@@ -20,11 +36,32 @@ logger = get_logger(__name__)
 class STJAutomation:
     """Classe principal da automação"""
     
-    def __init__(self):
+    def __init__(self, compartilhado: Optional["STJAutomation"] = None):
+        """
+        Args:
+            compartilhado: Automação principal, quando esta instância é um worker
+                extra (reaproveita cliente Supabase, cache e janela de progresso)
+        """
         self.browser = BrowserHandler()
         self.scraper = None
-        self.supabase = SupabaseClient()
-        self.progress_window = None  # Janela de progresso flutuante
+        self.supabase = compartilhado.supabase if compartilhado else SupabaseClient()
+        # Janela de progresso flutuante
+        self.progress_window = compartilhado.progress_window if compartilhado else None
+        self.watchdog = BrowserWatchdog(self.browser, on_recycle=self._on_browser_recycled)
+        # Motor HTTP: o navegador só é aberto quando algum item precisa de fallback
+        self.http_engine = STJHttpEngine() if STJ_ENGINE == "http" else None
+        # tjsp → URL de detalhes já resolvida em execuções anteriores
+        if compartilhado:
+            self.id_cache = compartilhado.id_cache
+        else:
+            self.id_cache = IdentifierCache("STJ") if ID_CACHE else None
+        # Worker extra não zera os desfechos, que são da execução inteira
+        self.reset_stats(desfechos=compartilhado is None)
+    
+    def reset_stats(self, desfechos: bool = True):
+        """Zera as estatísticas (cada execução/job começa do zero)"""
+        if desfechos:
+            OUTCOMES.reset()
         self.stats = {
             "total": 0,
             "sucesso": 0,
@@ -33,6 +70,9 @@ class STJAutomation:
             "multiplos_processos": 0,
             "hc_count": 0,
             "processos_com_mudanca_status": 0,
+            "reciclagens_navegador": 0,
+            "consultas_http": 0,
+            "via_cache": 0,
             "status_detectados": {
                 "Recebido": 0,
                 "Baixa": 0,
@@ -50,34 +90,67 @@ class STJAutomation:
         Returns:
             True se sucesso
         """
-        try:
-            self.stats["tempo_inicio"] = datetime.now()
+        self.stats["tempo_inicio"] = datetime.now()
+        self._log_header()
+        
+        if not self._start_browser(threading.Event(), StartupProfiler()):
+            return False
+        
+        logger.info("Setup concluído com sucesso")
+        return True
+    
+    def _log_header(self):
+        """Registra o cabeçalho da execução"""
+        logger.info("=" * 60)
+        logger.info("INICIANDO AUTOMAÇÃO STJ")
+        logger.info(f"Data/Hora: {self.stats['tempo_inicio'].strftime('%d/%m/%Y %H:%M:%S')}")
+        logger.info("=" * 60)
+    
+    def _start_browser(self, abortar: threading.Event, profiler: StartupProfiler) -> bool:
+        """
+        Abre o navegador até a página de consulta, conferindo entre as etapas
+        se a inicialização foi abortada (lista de processos vazia)
+        
+        Args:
+            abortar: Evento sinalizado quando o navegador não é mais necessário
+            profiler: Registro das fases da inicialização
             
-            logger.info("=" * 60)
-            logger.info("INICIANDO AUTOMAÇÃO STJ")
-            logger.info(f"Data/Hora: {self.stats['tempo_inicio'].strftime('%d/%m/%Y %H:%M:%S')}")
-            logger.info("=" * 60)
+        Returns:
+            True se o navegador ficou pronto
+        """
+        try:
+            with profiler.fase("navegador", "resolução do ChromeDriver"):
+                resolve_chromedriver()
+            if abortar.is_set():
+                return False
             
             # Inicia navegador
             logger.info("Iniciando navegador...")
-            if not self.browser.start():
+            with profiler.fase("navegador", "abertura do Chrome"):
+                iniciado = self.browser.start()
+            if not iniciado:
                 logger.error("Falha ao iniciar navegador")
                 return False
-            logger.info("Navegador iniciado com sucesso")
+            if abortar.is_set():
+                self.browser.close()
+                return False
             
             # Navega para STJ
             logger.info("Navegando para portal STJ...")
-            if not self.browser.navigate_to_stj():
+            with profiler.fase("navegador", "primeira navegação"):
+                no_portal = self.browser.navigate_to_stj()
+            if not no_portal:
                 logger.error("Falha ao acessar portal STJ")
                 logger.info("\nEncerrando navegador...")
                 self.browser.close()
                 return False
+            if abortar.is_set():
+                self.browser.close()
+                return False
             logger.info("Portal STJ acessado com sucesso")
             
             # Inicializa scraper
             self.scraper = STJScraper(self.browser)
-            
-            logger.info("Setup concluído com sucesso")
             return True
             
         except Exception as e:
@@ -86,18 +159,71 @@ class STJAutomation:
             logger.error(traceback.format_exc())
             return False
     
-    def process_single(self, processo: Dict) -> bool:
+    def ensure_ready(self) -> bool:
+        """
+        Garante navegador vivo e no formulário de pesquisa, reabrindo se preciso
+        
+        Returns:
+            True se pronto para pesquisar
+        """
+        if not self.browser.is_alive():
+            logger.warning("Navegador indisponível - reiniciando")
+            novo = lease_browser()
+            if novo:
+                # Já vem do pool no portal
+                release_browser(self.browser, descartar=True)
+                self._adopt_browser(novo)
+                return True
+            self.browser.close()
+            if not self.browser.start():
+                return False
+            self.scraper = STJScraper(self.browser)
+        elif self.browser.is_ready():
+            return True
+        
+        return self.browser.navigate_to_stj()
+    
+    def _adopt_browser(self, browser: BrowserHandler):
+        """Passa a usar um navegador emprestado do pool (já no portal)"""
+        self.browser = browser
+        self.watchdog.browser = browser
+        self.scraper = STJScraper(browser)
+    
+    def _on_browser_recycled(self):
+        """Chamado pelo watchdog após reabrir o navegador"""
+        self.browser = self.watchdog.browser
+        self.scraper = STJScraper(self.browser)
+        self.stats["reciclagens_navegador"] += 1
+    
+    def _registrar_erro(self):
+        """
+        Conta um erro do item atual, a menos que a causa seja o navegador morto
+        
+        Raises:
+            BrowserDeadError: Se a sessão do navegador não responde mais
+        """
+        if not self.browser.is_alive():
+            raise BrowserDeadError("sessão do navegador não responde")
+        self.stats["erro"] += 1
+    
+    def process_single(self, processo: Dict, pesquisado: bool = False) -> bool:
         """
         Processa um único processo
         
         Args:
             processo: Dict com dados do processo
+            pesquisado: True se a pesquisa já foi disparada e concluída na aba atual
             
         Returns:
             True se processou com sucesso
+            
+        Raises:
+            BrowserDeadError: Se o navegador morreu durante o item (o item deve ser refeito)
         """
+        tjsp = processo.get("tjsp", "")
+        navegador_morto = False
+        via_cache = False
         try:
-            tjsp = processo.get("tjsp", "")
             if not tjsp:
                 logger.warning("Processo sem número TJSP, pulando")
                 return False
@@ -105,96 +231,304 @@ class STJAutomation:
             # Remove % do início/fim se houver (do Power Automate)
             tjsp = tjsp.strip('%')
             
-            logger.info(f"\n{'='*60}")
-            logger.info(f"PROCESSANDO: {tjsp}")
-            logger.info(f"{'='*60}")
-            
-            # Atualiza janela de progresso
-            if self.progress_window:
-                self.progress_window.update(current=tjsp, action="Pesquisando no portal...")
-            
-            # 1. Pesquisa processo
-            if not self.scraper.search_process(tjsp):
-                logger.error(f"Falha ao pesquisar processo {tjsp}")
-                self.stats["erro"] += 1
+            # 1 a 4. Pesquisa e classifica a página de resultado
+            consulta = self._pesquisar(tjsp, pesquisado)
+            if consulta is None:
+                self._registrar_erro()
                 return False
+            via_cache = consulta["via_cache"]
             
-            # 2. Verifica situação do resultado
-            if self.progress_window:
-                self.progress_window.update(action="Verificando resultado...")
-            encontrou, tipo = self.scraper.verify_situation()
-            
-            # 3. Trata resultado não encontrado
-            if not encontrou or tipo == "nao_encontrado":
-                logger.info(f"Processo {tjsp} não cadastrado no STJ")
-                if self.progress_window:
-                    self.progress_window.update(action="Processo não encontrado no STJ")
+            if consulta["tipo"] == "nao_encontrado":
                 self._handle_not_found(tjsp)
                 self.stats["nao_encontrado"] += 1
                 return True
             
-            # 4. Trata múltiplos processos (2 ou mais)
-            if tipo == "multiplos_processos":
-                self.stats["multiplos_processos"] += 1
-                if self.progress_window:
-                    self.progress_window.update(action="Selecionando processo mais recente...")
-                if not self.scraper.handle_two_processes():
-                    logger.error("Falha ao selecionar processo mais recente")
-                    self.stats["erro"] += 1
-                    return False
-                time.sleep(2)
-            
             # 5. Extrai dados
-            if self.progress_window:
-                self.progress_window.update(action="Extraindo dados do processo...")
-            dados = self.scraper.extract_data()
+            dados = self._extrair(tjsp, via_cache)
             
-            if not dados.get("movimentacao"):
-                logger.warning("Não conseguiu extrair movimentação")
-                dados["movimentacao"] = "Dados não disponíveis"
+            return self._save_dados(processo, tjsp, dados)
             
-            # 6. Detecta mudanças de status baseado nas palavras-chave
-            is_hc = is_hc_process(tjsp)
-            novo_status = self._detectar_novo_status(dados["movimentacao"], processo.get("situacao", "Em trâmite"))
+        except BrowserDeadError:
+            navegador_morto = True
+            raise
+        except Exception as e:
+            if is_session_dead_error(e) or not self.browser.is_alive():
+                navegador_morto = True
+                raise BrowserDeadError(str(e)) from e
+            logger.error(f"Erro ao processar {tjsp}: {e}")
+            take_screenshot(self.browser.driver, f"erro_{tjsp}")
+            self.stats["erro"] += 1
+            return False
+        finally:
+            if not navegador_morto:
+                self._finalizar_pesquisa(via_cache)
+    
+    def _pesquisar(self, tjsp: str, pesquisado: bool = False) -> Optional[Dict]:
+        """
+        Abre o detalhe já conhecido ou pesquisa o processo e classifica a página
+        (seleciona o mais recente quando a pesquisa traz dois processos)
+        
+        Args:
+            tjsp: Número TJSP já normalizado
+            pesquisado: True se a pesquisa já foi disparada e concluída na aba atual
             
-            if novo_status != processo.get("situacao", "Em trâmite"):
-                self.stats["processos_com_mudanca_status"] += 1
-                self.stats["status_detectados"][novo_status] += 1
-                logger.info(f"🔄 Mudança de status detectada: {processo.get('situacao', 'Em trâmite')} → {novo_status}")
+        Returns:
+            Dict com tipo ('detalhes' ou 'nao_encontrado') e via_cache,
+            ou None se a pesquisa falhou
+        """
+        logger.info(f"\n{'='*60}")
+        logger.info(f"PROCESSANDO: {tjsp}")
+        logger.info(f"{'='*60}")
+        
+        # Atualiza janela de progresso
+        if self.progress_window:
+            self.progress_window.update(current=tjsp, action="Pesquisando no portal...")
+        
+        # Contabiliza o tráfego da consulta anterior antes que o log de rede acumule
+        self.browser.drain_network_log()
+        
+        # 1. Abre direto o detalhe já conhecido ou pesquisa o processo
+        via_cache = False
+        cache = self.id_cache.get(tjsp) if self.id_cache and not pesquisado else None
+        if cache:
+            via_cache = self.scraper.open_cached(cache["url"], tjsp)
+            if not via_cache:
+                self.id_cache.invalidate(tjsp, "URL não abre mais a página de detalhes")
+                if not self.browser.navigate_to_stj():
+                    return None
+        
+        if not via_cache and not pesquisado and not self.scraper.search_process(tjsp):
+            logger.error(f"Falha ao pesquisar processo {tjsp}")
+            return None
+        
+        # 2. Verifica situação do resultado
+        if self.progress_window:
+            self.progress_window.update(action="Verificando resultado...")
+        if via_cache:
+            self.stats["via_cache"] += 1
+            encontrou, tipo = True, "detalhes"
+        else:
+            encontrou, tipo = self.scraper.verify_situation()
+        
+        # 3. Página bloqueada (captcha, sessão expirada, erro): não diz nada sobre o processo
+        if Outcome.parse(tipo).is_blocking:
+            logger.error(f"Pesquisa de {tjsp} bloqueada: {tipo}")
+            if tipo == Outcome.SESSAO_EXPIRADA:
+                self.browser.navigate_to_stj()
+            return None
+        
+        # 3.1 Resultado não encontrado
+        if not encontrou or tipo == "nao_encontrado":
+            logger.info(f"Processo {tjsp} não cadastrado no STJ")
+            if self.progress_window:
+                self.progress_window.update(action="Processo não encontrado no STJ")
+            return {"tipo": "nao_encontrado", "via_cache": via_cache}
+        
+        # 4. Trata múltiplos processos (2 ou mais)
+        if tipo == "multiplos_processos":
+            self.stats["multiplos_processos"] += 1
+            if self.progress_window:
+                self.progress_window.update(action="Selecionando processo mais recente...")
+            if not self.scraper.handle_two_processes():
+                logger.error("Falha ao selecionar processo mais recente")
+                return None
+        
+        return {"tipo": "detalhes", "via_cache": via_cache}
+    
+    def _extrair(self, tjsp: str, via_cache: bool) -> Dict[str, str]:
+        """
+        Extrai os dados da página de detalhes e guarda o identificador no cache
+        
+        Args:
+            tjsp: Número TJSP já normalizado
+            via_cache: True se o detalhe foi aberto pelo cache
             
-            if is_hc:
-                self.stats["hc_count"] += 1
+        Returns:
+            Dict com reu, superior, movimentacao e link
+        """
+        if self.progress_window:
+            self.progress_window.update(action="Extraindo dados do processo...")
+        dados = self.scraper.extract_data()
+        
+        if self.id_cache and not via_cache:
+            self.id_cache.put(tjsp, *self.scraper.detail_identifier(tjsp))
+        return dados
+    
+    def _finalizar_pesquisa(self, via_cache: bool):
+        """
+        Deixa a aba pronta para o próximo item
+        
+        Args:
+            via_cache: True se o detalhe foi aberto pelo cache
+        """
+        # Pesquisa por URL: o próximo item é outra navegação, nada a limpar.
+        # Formulário: clica em Nova Consulta (detalhe aberto pelo cache pode
+        # não ter o formulário: recarrega o portal)
+        if not self.scraper.url_search:
+            if not self.scraper.click_new_search() and via_cache:
+                self.browser.navigate_to_stj()
+    
+    def _save_dados(self, processo: Dict, tjsp: str, dados: Dict[str, str]) -> bool:
+        """
+        Detecta mudança de status e grava os dados extraídos (comum aos motores
+        Selenium e HTTP)
+        
+        Args:
+            processo: Dict com dados do processo
+            tjsp: Número TJSP já normalizado
+            dados: Dict com reu, superior, movimentacao e link
             
-            # 7. Atualiza Supabase
-            if self.progress_window:
-                self.progress_window.update(action="Atualizando banco de dados...")
-            success = self.supabase.update_processo_stj(
-                tjsp=tjsp,
-                reu=dados["reu"],
-                superior=dados["superior"] if not is_hc else None,
-                movimentacao=dados["movimentacao"],
-                link=dados["link"],
-                is_hc=is_hc
-            )
+        Returns:
+            True se o banco foi atualizado
+        """
+        is_hc = self._classificar(processo, tjsp, dados)
+        
+        # 7. Atualiza Supabase
+        if self.progress_window:
+            self.progress_window.update(action="Atualizando banco de dados...")
+        if self._gravar(tjsp, dados, is_hc):
+            self.stats["sucesso"] += 1
+            return True
+        self.stats["erro"] += 1
+        return False
+    
+    def _classificar(self, processo: Dict, tjsp: str, dados: Dict[str, str]) -> bool:
+        """
+        Detecta a mudança de status pela movimentação e conta HC
+        
+        Args:
+            processo: Dict com dados do processo
+            tjsp: Número TJSP já normalizado
+            dados: Dict com reu, superior, movimentacao e link
             
-            if success:
-                logger.info(f"[OK] Processo {tjsp} atualizado com sucesso")
-                self.stats["sucesso"] += 1
-                return True
-            else:
-                logger.error(f"Falha ao atualizar banco para {tjsp}")
-                self.stats["erro"] += 1
-                return False
+        Returns:
+            True se for Habeas Corpus
+        """
+        if not dados.get("movimentacao"):
+            logger.warning("Não conseguiu extrair movimentação")
+            dados["movimentacao"] = "Dados não disponíveis"
+        
+        # 6. Detecta mudanças de status baseado nas palavras-chave
+        is_hc = is_hc_process(tjsp)
+        novo_status = self._detectar_novo_status(dados["movimentacao"], processo.get("situacao", "Em trâmite"))
+        
+        if novo_status != processo.get("situacao", "Em trâmite"):
+            self.stats["processos_com_mudanca_status"] += 1
+            self.stats["status_detectados"][novo_status] += 1
+            logger.info(f"🔄 Mudança de status detectada: {processo.get('situacao', 'Em trâmite')} → {novo_status}")
+        
+        if is_hc:
+            self.stats["hc_count"] += 1
+        return is_hc
+    
+    def _gravar(self, tjsp: str, dados: Dict[str, str], is_hc: bool) -> bool:
+        """
+        Grava os dados extraídos no Supabase
+        
+        Args:
+            tjsp: Número TJSP já normalizado
+            dados: Dict com reu, superior, movimentacao e link
+            is_hc: Se é Habeas Corpus (não grava superior)
+            
+        Returns:
+            True se o banco foi atualizado
+        """
+        success = self.supabase.update_processo_stj(
+            tjsp=tjsp,
+            reu=dados["reu"],
+            superior=dados["superior"] if not is_hc else None,
+            movimentacao=dados["movimentacao"],
+            link=dados["link"],
+            is_hc=is_hc
+        )
+        
+        if success:
+            logger.info(f"[OK] Processo {tjsp} atualizado com sucesso")
+        else:
+            logger.error(f"Falha ao atualizar banco para {tjsp}")
+        return success
+    
+    def process_http(self, processo: Dict) -> Optional[bool]:
+        """
+        Processa um item pelo motor HTTP, sem navegador
+        
+        Args:
+            processo: Dict com dados do processo
             
+        Returns:
+            True/False como process_single, ou None se o item deve ir para o navegador
+        """
+        tjsp = processo.get("tjsp", "").strip('%')
+        if not tjsp:
+            logger.warning("Processo sem número TJSP, pulando")
+            return False
+        
+        resultado = self._consultar_http(tjsp)
+        if resultado is None:
+            return None
+        
+        if resultado["tipo"] == "nao_encontrado":
+            logger.info(f"Processo {tjsp} não cadastrado no STJ")
+            self._save_not_found(tjsp)
+            self.stats["nao_encontrado"] += 1
+            return True
+        
+        try:
+            return self._save_dados(processo, tjsp, resultado["dados"])
         except Exception as e:
             logger.error(f"Erro ao processar {tjsp}: {e}")
-            take_screenshot(self.browser.driver, f"erro_{tjsp}")
             self.stats["erro"] += 1
             return False
-        finally:
-            # Sempre clica em Nova Consulta para próximo processo
-            self.scraper.click_new_search()
-            time.sleep(1)
+    
+    def _consultar_http(self, tjsp: str) -> Optional[Dict]:
+        """
+        Consulta o processo pelo motor HTTP
+        
+        Args:
+            tjsp: Número TJSP já normalizado
+            
+        Returns:
+            Resultado de STJHttpEngine.lookup, ou None se o item deve ir para o navegador
+        """
+        logger.info(f"\n{'='*60}")
+        logger.info(f"PROCESSANDO (HTTP): {tjsp}")
+        logger.info(f"{'='*60}")
+        if self.progress_window:
+            self.progress_window.update(current=tjsp, action="Consultando portal (HTTP)...")
+        
+        resultado = self.http_engine.lookup(tjsp, self.id_cache)
+        if resultado is None:
+            return None
+        
+        self.stats["consultas_http"] += 1
+        if resultado["multiplos"]:
+            self.stats["multiplos_processos"] += 1
+        return resultado
+    
+    def process_with_recovery(self, processo: Dict, pesquisado: bool = False) -> bool:
+        """
+        Processa um item refazendo-o em navegador novo se a sessão morrer
+        
+        Args:
+            processo: Dict com dados do processo
+            pesquisado: True se a pesquisa já foi disparada na aba atual
+            
+        Returns:
+            True se processou com sucesso
+        """
+        tentativas = 0
+        while True:
+            try:
+                return self.process_single(processo, pesquisado=pesquisado)
+            except BrowserDeadError as e:
+                logger.warning(f"Navegador caiu durante {processo.get('tjsp', 'N/A')}: {e}")
+                recuperou = self.watchdog.recycle("sessão morta durante o processamento")
+                if not recuperou or tentativas >= WATCHDOG_MAX_RETRIES:
+                    self.stats["erro"] += 1
+                    return False
+                tentativas += 1
+                pesquisado = False
+                logger.info("Refazendo o processo no navegador novo...")
     
     def _detectar_novo_status(self, movimentacao: str, status_atual: str) -> str:
         """
@@ -232,10 +566,11 @@ class STJAutomation:
     
     def _handle_not_found(self, tjsp: str):
         """Trata processo não encontrado"""
-        # Clica em Nova Consulta
-        self.scraper.click_new_search()
-        
-        # Atualiza com movimentação vazia
+        # Nova Consulta fica para o finally de process_single
+        self._save_not_found(tjsp)
+    
+    def _save_not_found(self, tjsp: str):
+        """Atualiza processo não encontrado com movimentação vazia"""
         self.supabase.update_processo_stj(
             tjsp=tjsp,
             reu="",
@@ -262,32 +597,40 @@ class STJAutomation:
         except Exception as e:
             logger.warning(f"Não foi possível carregar estatísticas finais do banco: {e}")
     
-    def run(self) -> bool:
+    def run(self, progresso=None) -> bool:
         """
         Executa automação completa
         
+        Args:
+            progresso: Janela de progresso a usar no lugar da própria (supervisor)
+            
         Returns:
             True se sucesso
         """
         try:
             # Inicia janela de progresso flutuante
-            self.progress_window = ProgressWindow("STJ")
+            self.progress_window = progresso or ProgressWindow("STJ")
             self.progress_window.start()
             self.progress_window.update(status="Inicializando...")
             
-            # 1. Setup
-            if not self.setup():
-                if self.progress_window:
-                    self.progress_window.complete(success=False)
-                    time.sleep(3)
-                    self.progress_window.close()
-                return False
+            self.stats["tempo_inicio"] = datetime.now()
+            self._log_header()
             
+            # 1. Busca processos no Supabase enquanto o navegador abre
             self.progress_window.update(status="Buscando processos...")
-            
-            # 2. Busca processos
-            logger.info("\nBuscando processos no Supabase...")
-            processos = self.supabase.get_processos_em_tramite()
+            logger.info("\nBuscando processos no Supabase (navegador abrindo em paralelo)...")
+            profiler = StartupProfiler()
+            if self.http_engine:
+                # Navegador fica para o primeiro item que precisar de fallback
+                start_browser = lambda abortar: True
+            else:
+                start_browser = lambda abortar: self._start_browser(abortar, profiler)
+            processos, pronto = bootstrap(
+                self.supabase.get_processos_em_tramite,
+                start_browser,
+                profiler
+            )
+            profiler.report()
             
             if not processos:
                 logger.warning("Nenhum processo encontrado para processar")
@@ -298,40 +641,16 @@ class STJAutomation:
                     self.progress_window.close()
                 return True
             
-            self.stats["total"] = len(processos)
-            logger.info(f"Encontrados {len(processos)} processos para processar\n")
-            
-            # Atualiza janela de progresso com total
-            self.progress_window.update(
-                total=len(processos),
-                processed=0,
-                status="Em execução..."
-            )
-            
-            # 3. Processa cada processo
-            for i, processo in enumerate(processos, 1):
-                tjsp = processo.get('tjsp', 'N/A')
-                
-                # Atualiza progresso
-                self.progress_window.update(
-                    processed=i,
-                    current=tjsp,
-                    action="Iniciando pesquisa..."
-                )
-                
-                logger.info(f"\n[{i}/{len(processos)}] Processando...")
-                self.process_single(processo)
-                
-                # Pequeno delay entre processos
-                if i < len(processos):
-                    time.sleep(1)
-            
-            # 4. Registra tempo de fim
-            self.stats["tempo_fim"] = datetime.now()
+            # 2. Navegador precisa ter chegado ao portal
+            if not pronto:
+                if self.progress_window:
+                    self.progress_window.complete(success=False)
+                    time.sleep(3)
+                    self.progress_window.close()
+                return False
             
-            # 5. Busca estatísticas finais do banco e exibe relatório
-            self._load_final_stats()
-            self._print_stats()
+            # 3. Processa cada processo e exibe relatório
+            self.run_batch(processos)
             
             # Finaliza janela de progresso
             if self.progress_window:
@@ -361,6 +680,110 @@ class STJAutomation:
             # Sempre fecha navegador
             logger.info("\nEncerrando navegador...")
             self.browser.close()
+            if self.http_engine:
+                self.http_engine.close()
+            if self.id_cache:
+                self.id_cache.report()
+            close_shared_pool()
+    
+    def run_batch(self, processos: List[Dict]):
+        """
+        Processa uma lista de processos com o navegador já no portal
+        e exibe o relatório ao final
+        
+        Args:
+            processos: Lista de dicts com tjsp/situacao
+        """
+        self.stats["total"] = len(processos)
+        logger.info(f"Encontrados {len(processos)} processos para processar\n")
+        
+        # Atualiza janela de progresso com total
+        if self.progress_window:
+            self.progress_window.update(
+                total=len(processos),
+                processed=0,
+                status="Em execução..."
+            )
+        
+        # Varredura longa: navegadores de reserva para as reciclagens do watchdog
+        if not self.http_engine and WATCHDOG_RECYCLE_EVERY and len(processos) > WATCHDOG_RECYCLE_EVERY:
+            shared_pool()
+        
+        if STJ_WORKERS > 1 and len(processos) > 1:
+            self._run_workers(processos)
+        elif STJ_TABS > 1 and len(processos) > 1 and not self.http_engine:
+            self._run_multi_tab(processos)
+        elif PIPELINE and len(processos) > 1:
+            self._run_pipeline(processos)
+        else:
+            self._run_serial(processos)
+        
+        # Registra tempo de fim
+        self.stats["tempo_fim"] = datetime.now()
+        
+        # Busca estatísticas finais do banco e exibe relatório
+        self._load_final_stats()
+        self._print_stats()
+    
+    def _run_serial(self, processos: List[Dict]):
+        """Processa um por vez na aba atual"""
+        for i, processo in enumerate(processos, 1):
+            tjsp = processo.get('tjsp', 'N/A')
+            
+            # Atualiza progresso
+            if self.progress_window:
+                self.progress_window.update(
+                    processed=i,
+                    current=tjsp,
+                    action="Iniciando pesquisa..."
+                )
+            
+            logger.info(f"\n[{i}/{len(processos)}] Processando...")
+            if not self.http_engine or self.process_http(processo) is None:
+                self._process_in_browser(processo)
+            
+            # Pequeno delay entre processos (com RATE_LIMIT o limite do host cadencia as requisições)
+            if i < len(processos) and not RATE_LIMIT:
+                time.sleep(1)
+    
+    def _process_in_browser(self, processo: Dict):
+        """Processa um item pelo navegador (motor Selenium ou fallback do HTTP)"""
+        if self.http_engine and not self.ensure_ready():
+            logger.error("Navegador indisponível para o fallback")
+            self.stats["erro"] += 1
+            return
+        self.watchdog.before_lookup()
+        self.process_with_recovery(processo)
+        self.watchdog.after_lookup()
+    
+    def _run_workers(self, processos: List[Dict]):
+        """Processa com STJ_WORKERS workers consumindo a mesma fila"""
+        pool = WorkerPool(self, STJ_WORKERS)
+        try:
+            pool.run(processos)
+        finally:
+            pool.close()
+    
+    def _run_pipeline(self, processos: List[Dict]):
+        """Processa em etapas assíncronas (gravação no banco junto com a próxima pesquisa)"""
+        PipelineRunner(self).run(processos)
+    
+    def _run_multi_tab(self, processos: List[Dict]):
+        """Processa intercalando pesquisas em STJ_TABS abas do mesmo Chrome"""
+        runner = MultiTabRunner(self, STJ_TABS)
+        try:
+            runner.open()
+            runner.run(processos)
+        except BrowserDeadError as e:
+            # As abas morreram com o navegador: o restante segue em série no Chrome novo
+            restantes = runner.drain()
+            logger.warning(f"Navegador caiu no modo multi-abas ({e}) - {len(restantes)} processo(s) restantes")
+            if self.watchdog.recycle("sessão morta no modo multi-abas"):
+                self._run_serial(restantes)
+            else:
+                self.stats["erro"] += len(restantes)
+        finally:
+            runner.close()
     
     def _print_stats(self):
         """Exibe relatório gerencial completo da execução"""
@@ -397,6 +820,24 @@ class STJAutomation:
         print(f"  ⚡ Habeas Corpus:           {self.stats['hc_count']}")
         print(f"  ⚠ Não Encontrados:         {self.stats['nao_encontrado']}")
         print(f"  ✗ Erros:                   {self.stats['erro']}")
+        if self.stats.get('via_cache'):
+            print(f"  ⏩ Abertos pelo Cache:      {self.stats['via_cache']}")
+        if self.stats.get('consultas_http'):
+            print(f"  🌐 Consultas via HTTP:      {self.stats['consultas_http']}")
+        if self.stats.get('reciclagens_navegador'):
+            print(f"  ♻ Navegador Reciclado:     {self.stats['reciclagens_navegador']}x")
+        if self.watchdog.peak_rss_mb:
+            print(f"  Pico de Memória Chrome:    {self.watchdog.peak_rss_mb:.0f} MB")
+        
+        # Desfechos das pesquisas (classificador da página)
+        desfechos = OUTCOMES.as_dict()
+        if desfechos:
+            print("\n🔎 DESFECHOS DAS PESQUISAS")
+            print("-" * 80)
+            for nome, total in sorted(desfechos.items(), key=lambda x: x[1], reverse=True):
+                print(f"  • {nome:20s}: {total}")
+        SELECTORS_REGISTRY.report()
+        report_rate_limits()
         
         # Mudanças de status detectadas
         print("\n🔄 MUDANÇAS DE STATUS DETECTADAS")
@@ -444,6 +885,11 @@ class STJAutomation:
 def main():
     """Função principal"""
     try:
+        if "--daemon" in sys.argv:
+            from .daemon import serve
+            serve()
+            sys.exit(0)
+        
         automation = STJAutomation()
         success = automation.run()
         
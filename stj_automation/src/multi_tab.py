@@ -0,0 +1,183 @@
+"""
+Pesquisas intercaladas em várias abas de um único Chrome
+"""
+import time
+from collections import deque
+from typing import List, Dict, Optional
+
+from .config import STJ_TABS, TAB_SEARCH_TIMEOUT
+from .scraper import STJScraper
+from .watchdog import BrowserDeadError
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class TabContext:
+    """Estado de uma aba: handle, scraper próprio e o processo em andamento"""
+
+    def __init__(self, handle: str, scraper: STJScraper):
+        self.handle = handle
+        self.scraper = scraper
+        self.processo: Optional[Dict] = None
+        self.indice = 0
+        self.disparado_em = 0.0
+
+    @property
+    def livre(self) -> bool:
+        return self.processo is None
+
+
+class MultiTabRunner:
+    """
+    Distribui a lista de processos entre K abas do mesmo navegador.
+
+    Cada aba segue o ciclo disparar pesquisa -> aguardar -> extrair. O
+    WebDriver só atende uma aba por vez, mas enquanto ele digita ou extrai
+    numa aba as outras continuam carregando a resposta do portal.
+
+    O watchdog é consultado antes de cada pesquisa; quando pede reciclagem,
+    nenhuma pesquisa nova é disparada até as abas em andamento terminarem,
+    e então o navegador é trocado e as abas reabertas.
+    """
+
+    def __init__(self, automation, tabs: int = STJ_TABS):
+        self.automation = automation
+        self.browser = automation.browser
+        self.tabs = max(1, tabs)
+        self.contexts: List[TabContext] = []
+        self._ativa: Optional[str] = None
+        self.pendentes: deque = deque()
+        self.concluidos = 0
+
+    def open(self) -> bool:
+        """
+        Abre as abas extras (a aba atual é reaproveitada)
+
+        Returns:
+            True se pelo menos uma aba está pronta
+        """
+        principal = self.browser.driver.current_window_handle
+        self.contexts = [TabContext(principal, STJScraper(self.browser))]
+
+        for _ in range(self.tabs - 1):
+            handle = self.browser.open_tab()
+            if handle:
+                self.contexts.append(TabContext(handle, STJScraper(self.browser)))
+
+        self._ativa = self.browser.driver.current_window_handle
+        logger.info(f"Modo multi-abas: {len(self.contexts)} aba(s) prontas")
+        return bool(self.contexts)
+
+    def _activate(self, ctx: TabContext):
+        """Troca o foco do WebDriver para a aba (só se necessário)"""
+        if self._ativa != ctx.handle:
+            self.browser.switch_to_tab(ctx.handle)
+            self._ativa = ctx.handle
+
+    def _start(self, ctx: TabContext, indice: int, processo: Dict, total: int):
+        """Dispara a pesquisa de um processo na aba"""
+        tjsp = processo.get("tjsp", "").strip('%')
+        ctx.processo = processo
+        ctx.indice = indice
+
+        logger.info(f"\n[{indice}/{total}] Processando (aba {self.contexts.index(ctx) + 1})...")
+        if self.automation.progress_window:
+            self.automation.progress_window.update(current=tjsp, action="Pesquisando no portal...")
+
+        if tjsp and ctx.scraper.submit_search(tjsp):
+            ctx.disparado_em = time.monotonic()
+            return
+
+        # Falha ao disparar: refaz pelo caminho serial, que conta o erro
+        self._finish(ctx, pesquisado=False)
+
+    def _finish(self, ctx: TabContext, pesquisado: bool = True):
+        """Conclui o processo da aba (verificação, extração e banco)"""
+        self.automation.scraper = ctx.scraper
+        self.automation.process_single(ctx.processo, pesquisado=pesquisado)
+        self.automation.watchdog.after_lookup()
+        self.concluidos += 1
+        if self.automation.progress_window:
+            self.automation.progress_window.update(processed=self.concluidos)
+        ctx.processo = None
+
+    def _recycle(self, motivo: str):
+        """Com todas as abas livres, recicla o navegador pelo watchdog e reabre as abas"""
+        self.close()
+        if not self.automation.watchdog.recycle(motivo):
+            raise BrowserDeadError(f"falha ao reciclar o navegador ({motivo})")
+        self.browser = self.automation.browser
+        self.open()
+
+    def run(self, processos: List[Dict]):
+        """
+        Processa a lista intercalando as abas
+
+        Args:
+            processos: Lista de dicts com tjsp/situacao
+        """
+        self.pendentes = pendentes = deque(enumerate(processos, 1))
+        total = len(processos)
+        motivo = None
+
+        while pendentes or any(not ctx.livre for ctx in self.contexts):
+            avancou = False
+
+            for ctx in self.contexts:
+                if ctx.livre:
+                    if pendentes and not motivo:
+                        self._activate(ctx)
+                        motivo = self.automation.watchdog.recycle_reason()
+                        if motivo:
+                            continue
+                        indice, processo = pendentes.popleft()
+                        self._start(ctx, indice, processo, total)
+                        avancou = True
+                    continue
+
+                self._activate(ctx)
+                expirou = time.monotonic() - ctx.disparado_em > TAB_SEARCH_TIMEOUT
+                if ctx.scraper.search_done() or expirou:
+                    if expirou:
+                        logger.debug("Resultado da pesquisa não apareceu no prazo - seguindo")
+                    self._finish(ctx)
+                    avancou = True
+
+            if motivo and all(ctx.livre for ctx in self.contexts):
+                self._recycle(motivo)
+                motivo = None
+                avancou = True
+
+            if not avancou:
+                time.sleep(0.05)
+
+    def drain(self) -> List[Dict]:
+        """
+        Abandona as abas (navegador morto) e devolve o que não foi concluído
+
+        Returns:
+            Processos em andamento nas abas seguidos dos ainda pendentes
+        """
+        em_andamento = sorted(
+            (ctx for ctx in self.contexts if not ctx.livre), key=lambda ctx: ctx.indice
+        )
+        restantes = [ctx.processo for ctx in em_andamento] + [p for _, p in self.pendentes]
+        self.contexts = []
+        self.pendentes = deque()
+        return restantes
+
+    def close(self):
+        """Fecha as abas extras e volta para a principal"""
+        for ctx in self.contexts[1:]:
+            try:
+                self.browser.close_tab(ctx.handle)
+            except Exception as e:
+                logger.warning(f"Erro ao fechar aba: {e}")
+        if self.contexts:
+            try:
+                self.browser.switch_to_tab(self.contexts[0].handle)
+            except Exception:
+                pass
+            self.automation.scraper = self.contexts[0].scraper
+        self.contexts = []
@@ -0,0 +1,89 @@
+"""
+Desfecho da página de resultado (classificador dentro da página) e contadores
+"""
+import threading
+from collections import Counter
+from enum import Enum
+from typing import Any, Dict
+
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class Outcome(str, Enum):
+    """Resultado de uma pesquisa, como classificado dentro da página"""
+    DETALHES = "detalhes"
+    MULTIPLOS = "multiplos_processos"
+    NAO_ENCONTRADO = "nao_encontrado"
+    PAGINA_ERRO = "pagina_erro"
+    CAPTCHA = "captcha"
+    SESSAO_EXPIRADA = "sessao_expirada"
+    DESCONHECIDO = "erro"
+
+    @classmethod
+    def parse(cls, valor: Any) -> "Outcome":
+        """Converte o texto devolvido pelo script (desconhecido se inválido)"""
+        try:
+            return cls(valor)
+        except ValueError:
+            return cls.DESCONHECIDO
+
+    @property
+    def is_blocking(self) -> bool:
+        """Página que impede a pesquisa (e não diz nada sobre o processo)"""
+        return self in (Outcome.PAGINA_ERRO, Outcome.CAPTCHA, Outcome.SESSAO_EXPIRADA, Outcome.DESCONHECIDO)
+
+
+# Função JS comum aos classificadores: detecta, só com seletores pontuais e o
+# título, as páginas que bloqueiam a pesquisa. Retorna o desfecho ou null.
+BLOCKERS_JS = r"""
+    function bloqueio() {
+        var captcha = document.querySelector(
+            'iframe[src*="recaptcha"], iframe[src*="hcaptcha"], iframe[src*="turnstile"], ' +
+            '.g-recaptcha, .h-captcha, .cf-turnstile, #captcha, img[src*="captcha" i], input[name*="captcha" i]'
+        );
+        if (captcha) return 'captcha';
+
+        var titulo = (document.title || '').toLowerCase();
+        var aviso = document.querySelector('#idDivBlocoMensagem, .message-404, .alert-danger, h1');
+        var textoAviso = aviso ? (aviso.textContent || '').toLowerCase().slice(0, 300) : '';
+        if (/sess[aã]o (expirada|encerrada|inv[aá]lida)/.test(titulo + ' ' + textoAviso)) return 'sessao_expirada';
+
+        if (/(^|\W)(erro|error|403|404|500|502|503|504)(\W|$)|service unavailable|bad gateway|acesso negado|access denied/.test(titulo)) {
+            return 'pagina_erro';
+        }
+        return null;
+    }
+"""
+
+
+class OutcomeCounter:
+    """Contagem de desfechos da execução (compartilhada entre abas/threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contagem: Counter = Counter()
+
+    def record(self, desfecho: Outcome):
+        with self._lock:
+            self._contagem[desfecho] += 1
+
+    def reset(self):
+        with self._lock:
+            self._contagem.clear()
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {desfecho.value: total for desfecho, total in self._contagem.items()}
+
+    def report(self):
+        """Registra no log a contagem de cada desfecho"""
+        contagem = self.as_dict()
+        if contagem:
+            resumo = ", ".join(f"{nome}={total}" for nome, total in sorted(contagem.items()))
+            logger.info(f"Desfechos das pesquisas: {resumo}")
+
+
+# Contador da execução atual (zerado em reset_stats)
+OUTCOMES = OutcomeCounter()
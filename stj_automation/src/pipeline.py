@@ -0,0 +1,342 @@
+"""
+Pipeline em etapas (asyncio): lista → pesquisa → extração → classificação → gravação
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .config import PIPELINE_QUEUE_SIZE, RATE_LIMIT, WATCHDOG_MAX_RETRIES
+from .utils import get_logger, take_screenshot, deferred_logging, deferred_screenshots
+from .watchdog import BrowserDeadError, is_session_dead_error
+
+logger = get_logger(__name__)
+
+# Sentinela de fim de fila
+_FIM = object()
+
+
+class Etapa:
+    """
+    Uma etapa do pipeline: função síncrona aplicada a cada item
+
+    executor:
+        "loop"      roda no laço de eventos (trabalho curto, sem E/S)
+        "navegador" roda na thread única do Selenium
+        "io"        roda numa thread de E/S (asyncio.to_thread)
+
+    reserva/libera: a etapa que reserva o navegador só o devolve quando a
+    etapa que libera termina o mesmo item (a pesquisa do próximo processo
+    espera a extração do anterior, que ainda usa a página).
+    """
+
+    def __init__(self, nome: str, funcao: Callable[[Dict], Optional[Dict]], executor: str = "loop",
+                 reserva: bool = False, libera: bool = False):
+        self.nome = nome
+        self.funcao = funcao
+        self.executor = executor
+        self.reserva = reserva
+        self.libera = libera
+        self.itens = 0
+        self.ocupada_s = 0.0
+
+
+class StagedPipeline:
+    """
+    Liga as etapas por filas asyncio limitadas e mede a ocupação de cada uma
+    (tempo trabalhando / tempo total), para mostrar onde está o gargalo.
+
+    A função da etapa devolve o item (segue para a próxima) ou None (descarta).
+    Uma exceção descarta o item e chama ao_falhar; o item que passa pela
+    última etapa vai para ao_concluir. Ambos rodam no laço de eventos.
+    """
+
+    def __init__(self, etapas: List[Etapa], ao_concluir: Callable[[Dict], None],
+                 ao_falhar: Callable[[Dict, Exception], None], tamanho_fila: int = PIPELINE_QUEUE_SIZE):
+        self.fonte = Etapa("lista", None)
+        self.etapas = etapas
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.tamanho_fila = max(1, tamanho_fila)
+        self.duracao_s = 0.0
+        self._thread_navegador: Optional[ThreadPoolExecutor] = None
+        self._navegador: Optional[asyncio.Semaphore] = None
+
+    def run(self, itens: Iterable[Dict]):
+        """
+        Processa os itens até a última etapa
+
+        Args:
+            itens: Lista ou gerador de itens (consumido sob demanda pela fila)
+        """
+        self._thread_navegador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="navegador")
+        inicio = time.perf_counter()
+        try:
+            asyncio.run(self._run(itens))
+        finally:
+            self.duracao_s = time.perf_counter() - inicio
+            self._thread_navegador.shutdown(wait=True)
+
+    async def _run(self, itens: Iterable[Dict]):
+        self._navegador = asyncio.Semaphore(1)
+        filas = [asyncio.Queue(maxsize=self.tamanho_fila) for _ in self.etapas]
+        tarefas = [asyncio.create_task(self._produzir(itens, filas[0]))]
+        for indice, etapa in enumerate(self.etapas):
+            saida = filas[indice + 1] if indice + 1 < len(filas) else None
+            tarefas.append(asyncio.create_task(self._consumir(etapa, filas[indice], saida)))
+        await asyncio.gather(*tarefas)
+
+    async def _produzir(self, itens: Iterable[Dict], saida: asyncio.Queue):
+        """Etapa inicial: alimenta a primeira fila à medida que ela esvazia"""
+        iterador = iter(itens)
+        while True:
+            inicio = time.perf_counter()
+            item = next(iterador, _FIM)
+            self.fonte.ocupada_s += time.perf_counter() - inicio
+            await saida.put(item)
+            if item is _FIM:
+                return
+            self.fonte.itens += 1
+
+    async def _consumir(self, etapa: Etapa, entrada: asyncio.Queue, saida: Optional[asyncio.Queue]):
+        while True:
+            item = await entrada.get()
+            if item is _FIM:
+                if saida:
+                    await saida.put(_FIM)
+                return
+
+            if etapa.reserva:
+                await self._navegador.acquire()
+            inicio = time.perf_counter()
+            try:
+                resultado = await self._executar(etapa, item)
+            except Exception as e:
+                logger.error(f"Pipeline: erro na etapa {etapa.nome}: {e}")
+                self.ao_falhar(item, e)
+                resultado = None
+            etapa.ocupada_s += time.perf_counter() - inicio
+            etapa.itens += 1
+            if etapa.libera or (etapa.reserva and resultado is None):
+                self._navegador.release()
+
+            if resultado is None:
+                continue
+            if saida:
+                await saida.put(resultado)
+            else:
+                self.ao_concluir(resultado)
+
+    async def _executar(self, etapa: Etapa, item: Dict) -> Any:
+        if etapa.executor == "navegador":
+            return await asyncio.get_running_loop().run_in_executor(self._thread_navegador, etapa.funcao, item)
+        if etapa.executor == "io":
+            return await asyncio.to_thread(etapa.funcao, item)
+        return etapa.funcao(item)
+
+    def report(self):
+        """Registra no log a ocupação de cada etapa e o gargalo"""
+        if not self.duracao_s or not self.fonte.itens:
+            return
+        logger.info(f"Pipeline: {self.fonte.itens} item(ns) em {self.duracao_s:.1f}s")
+        etapas = [self.fonte] + self.etapas
+        for etapa in etapas:
+            logger.info(
+                f"  • {etapa.nome:14s}: ocupada {etapa.ocupada_s / self.duracao_s:6.1%} "
+                f"({etapa.ocupada_s:.1f}s, {etapa.itens} item(ns))"
+            )
+        gargalo = max(etapas, key=lambda e: e.ocupada_s)
+        logger.info(f"  Gargalo: {gargalo.nome}")
+
+
+class PipelineRunner:
+    """
+    Processa a lista em etapas ligadas por filas limitadas:
+    lista → pesquisa → extração → classificação → gravação.
+
+    Pesquisa e extração usam o navegador (thread única, um item por vez);
+    a detecção de status roda no laço de eventos e o PATCH no Supabase numa
+    thread de E/S, então a gravação de um processo corre junto com a
+    pesquisa do próximo. Durante o pipeline, logs e capturas de tela também
+    são gravados em threads próprias.
+
+    Com o motor HTTP, a consulta acontece na etapa de pesquisa e o navegador
+    só entra no fallback. Os contadores são os mesmos da execução em série.
+    """
+
+    def __init__(self, automation):
+        self.automation = automation
+        self.total = 0
+        self.concluidos = 0
+        self.pipeline = StagedPipeline(
+            [
+                Etapa("pesquisa", self._pesquisa, executor="navegador", reserva=True),
+                Etapa("extração", self._extracao, executor="navegador", libera=True),
+                Etapa("classificação", self._classificacao),
+                Etapa("gravação", self._gravacao, executor="io"),
+            ],
+            ao_concluir=self._concluir,
+            ao_falhar=self._falhou,
+        )
+
+    def run(self, processos: List[Dict]):
+        """
+        Processa a lista e registra a ocupação das etapas
+
+        Args:
+            processos: Lista de dicts com tjsp/situacao
+        """
+        self.total = len(processos)
+        logger.info(f"Modo pipeline: {self.total} processo(s) em etapas")
+        itens = (self._novo_item(indice, processo) for indice, processo in enumerate(processos, 1))
+        with deferred_logging(), deferred_screenshots():
+            self.pipeline.run(itens)
+        self.pipeline.report()
+
+    @staticmethod
+    def _novo_item(indice: int, processo: Dict) -> Dict:
+        return {
+            "indice": indice,
+            "processo": processo,
+            # Remove % do início/fim se houver (do Power Automate)
+            "tjsp": processo.get("tjsp", "").strip('%'),
+            "tipo": None,          # 'detalhes' ou 'nao_encontrado'
+            "via_cache": False,
+            "navegador": False,    # Passou pelo Selenium (precisa de Nova Consulta/watchdog)
+            "morto": False,        # Navegador caiu durante o item
+            "dados": None,
+            "is_hc": False,
+            "gravado": False,
+            "erro": None,
+        }
+
+    # Etapas no navegador
+
+    def _pesquisa(self, item: Dict) -> Dict:
+        """Pesquisa o processo (HTTP ou navegador) e classifica a página"""
+        automation = self.automation
+        if item["indice"] > 1 and not RATE_LIMIT:
+            # Mesmo intervalo da execução em série
+            time.sleep(1)
+        logger.info(f"\n[{item['indice']}/{self.total}] Processando...")
+        if not item["tjsp"]:
+            logger.warning("Processo sem número TJSP, pulando")
+            return item
+
+        if automation.http_engine:
+            resultado = automation._consultar_http(item["tjsp"])
+            if resultado is not None:
+                if resultado["tipo"] == "nao_encontrado":
+                    logger.info(f"Processo {item['tjsp']} não cadastrado no STJ")
+                item.update(tipo=resultado["tipo"], dados=resultado.get("dados"))
+                return item
+            if not automation.ensure_ready():
+                item["erro"] = "navegador indisponível para o fallback"
+                return item
+
+        item["navegador"] = True
+        automation.watchdog.before_lookup()
+        tentativas = 0
+        while True:
+            try:
+                consulta = self._no_navegador(item, self._pesquisar)
+                break
+            except BrowserDeadError as e:
+                logger.warning(f"Navegador caiu durante {item['tjsp']}: {e}")
+                recuperou = automation.watchdog.recycle("sessão morta durante o processamento")
+                if not recuperou or tentativas >= WATCHDOG_MAX_RETRIES:
+                    item.update(erro=f"navegador caiu: {e}", morto=True)
+                    return item
+                tentativas += 1
+                item["erro"] = None
+                logger.info("Refazendo o processo no navegador novo...")
+
+        if consulta:
+            item.update(consulta)
+        elif not item["erro"]:
+            item["erro"] = "falha na pesquisa"
+        return item
+
+    def _pesquisar(self, item: Dict) -> Optional[Dict]:
+        consulta = self.automation._pesquisar(item["tjsp"])
+        if consulta is None and not self.automation.browser.is_alive():
+            raise BrowserDeadError("sessão do navegador não responde")
+        return consulta
+
+    def _extracao(self, item: Dict) -> Dict:
+        """Extrai os dados do detalhe e deixa a aba pronta para o próximo item"""
+        automation = self.automation
+        if not item["navegador"]:
+            return item
+        try:
+            if item["tipo"] == "detalhes" and not item["erro"]:
+                try:
+                    item["dados"] = self._no_navegador(
+                        item, lambda i: automation._extrair(i["tjsp"], i["via_cache"])
+                    )
+                except BrowserDeadError as e:
+                    logger.warning(f"Navegador caiu durante {item['tjsp']}: {e}")
+                    item.update(erro=f"navegador caiu: {e}", morto=True)
+                    automation.watchdog.recycle("sessão morta durante o processamento")
+            if not item["morto"]:
+                automation._finalizar_pesquisa(item["via_cache"])
+        finally:
+            automation.watchdog.after_lookup()
+        return item
+
+    def _no_navegador(self, item: Dict, passo: Callable[[Dict], Any]) -> Any:
+        """
+        Executa um passo do Selenium com o mesmo tratamento de process_single
+
+        Raises:
+            BrowserDeadError: Se a sessão do navegador não responde mais
+        """
+        try:
+            return passo(item)
+        except BrowserDeadError:
+            raise
+        except Exception as e:
+            if is_session_dead_error(e) or not self.automation.browser.is_alive():
+                raise BrowserDeadError(str(e)) from e
+            logger.error(f"Erro ao processar {item['tjsp']}: {e}")
+            take_screenshot(self.automation.browser.driver, f"erro_{item['tjsp']}")
+            item["erro"] = str(e)
+            return None
+
+    # Etapas fora do navegador
+
+    def _classificacao(self, item: Dict) -> Dict:
+        """Detecta a mudança de status pela movimentação"""
+        if item["tipo"] == "detalhes" and item["dados"] and not item["erro"]:
+            item["is_hc"] = self.automation._classificar(item["processo"], item["tjsp"], item["dados"])
+        return item
+
+    def _gravacao(self, item: Dict) -> Dict:
+        """Grava o resultado no Supabase (thread de E/S)"""
+        automation = self.automation
+        if item["erro"]:
+            return item
+        if item["tipo"] == "nao_encontrado":
+            automation._save_not_found(item["tjsp"])
+        elif item["tipo"] == "detalhes":
+            item["gravado"] = automation._gravar(item["tjsp"], item["dados"], item["is_hc"])
+        return item
+
+    def _concluir(self, item: Dict):
+        stats = self.automation.stats
+        if item["erro"]:
+            stats["erro"] += 1
+        elif item["tipo"] == "nao_encontrado":
+            stats["nao_encontrado"] += 1
+        elif item["tipo"] == "detalhes":
+            stats["sucesso" if item["gravado"] else "erro"] += 1
+        self._avancar()
+
+    def _falhou(self, item: Dict, erro: Exception):
+        self.automation.stats["erro"] += 1
+        self._avancar()
+
+    def _avancar(self):
+        self.concluidos += 1
+        if self.automation.progress_window:
+            self.automation.progress_window.update(processed=self.concluidos)
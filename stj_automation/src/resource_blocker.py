@@ -0,0 +1,140 @@
+"""
+Bloqueio de recursos desnecessários via CDP (Network.setBlockedURLs)
+"""
+import json
+from collections import Counter
+from typing import List, Dict, Any
+from urllib.parse import urlparse
+
+from .config import (
+    BLOCK_RESOURCES, BLOCKED_RESOURCE_PATTERNS, BLOCKED_HOSTS,
+    ALLOWED_HOSTS, REQUIRED_PAGE_FUNCTIONS
+)
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResourceBlocker:
+    """
+    Instala o perfil de bloqueio do portal e contabiliza o tráfego.
+
+    O Chrome cancela as requisições bloqueadas antes de enviá-las, por isso
+    o relatório conta requisições bloqueadas (por tipo) e os bytes que de
+    fato trafegaram; o tamanho do que foi bloqueado não chega a existir.
+    Os eventos de rede são lidos do log 'performance' do ChromeDriver.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.enabled = BLOCK_RESOURCES
+        self.patterns = self.build_patterns()
+        self.blocked_requests = 0
+        self.blocked_by_type: Counter = Counter()
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.unlisted_hosts: Counter = Counter()
+        self._request_hosts: Dict[str, str] = {}
+
+    @staticmethod
+    def build_patterns() -> List[str]:
+        """
+        Monta a lista de padrões respeitando os hosts permitidos
+
+        Returns:
+            Padrões no formato aceito por Network.setBlockedURLs
+        """
+        hosts = [h for h in BLOCKED_HOSTS if h not in ALLOWED_HOSTS]
+        return list(BLOCKED_RESOURCE_PATTERNS) + [f"*://{host}/*" for host in hosts]
+
+    def install(self) -> bool:
+        """
+        Ativa o bloqueio na sessão atual
+
+        Returns:
+            True se o perfil foi aplicado
+        """
+        if not self.enabled:
+            return False
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+            logger.info(f"Bloqueio de recursos ativo ({len(self.patterns)} padrões)")
+            return True
+        except Exception as e:
+            logger.warning(f"Não foi possível ativar bloqueio de recursos: {e}")
+            self.enabled = False
+            return False
+
+    def disable(self):
+        """Remove o bloqueio (usado quando a página perde funções essenciais)"""
+        try:
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        except Exception as e:
+            logger.warning(f"Erro ao remover bloqueio de recursos: {e}")
+        self.enabled = False
+
+    def missing_page_functions(self) -> List[str]:
+        """
+        Lista as funções exigidas pela pesquisa que não existem na página
+
+        Returns:
+            Nomes das funções ausentes (vazio se a página está íntegra)
+        """
+        if not REQUIRED_PAGE_FUNCTIONS:
+            return []
+        try:
+            return self.driver.execute_script(
+                "return arguments[0].filter(function(n) { return typeof window[n] !== 'function'; });",
+                REQUIRED_PAGE_FUNCTIONS
+            ) or []
+        except Exception as e:
+            logger.warning(f"Erro ao verificar funções da página: {e}")
+            return []
+
+    def collect(self):
+        """Consome o log de performance e acumula os contadores de rede"""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get("method")
+            params: Dict[str, Any] = message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                host = urlparse(params.get("request", {}).get("url", "")).hostname or ""
+                self._request_hosts[params.get("requestId")] = host
+            elif method == "Network.loadingFailed":
+                self._request_hosts.pop(params.get("requestId"), None)
+                if params.get("blockedReason"):
+                    self.blocked_requests += 1
+                    self.blocked_by_type[params.get("type", "Other")] += 1
+            elif method == "Network.loadingFinished":
+                self.loaded_requests += 1
+                self.loaded_bytes += int(params.get("encodedDataLength", 0))
+                host = self._request_hosts.pop(params.get("requestId"), "")
+                if host and host not in ALLOWED_HOSTS:
+                    self.unlisted_hosts[host] += 1
+
+    def report(self):
+        """Registra no log o resumo do tráfego bloqueado e carregado"""
+        self.collect()
+        if not self.enabled and not self.blocked_requests:
+            return
+
+        tipos = ", ".join(f"{tipo}={qtd}" for tipo, qtd in self.blocked_by_type.most_common())
+        logger.info(f"Recursos bloqueados: {self.blocked_requests} requisições ({tipos or 'nenhuma'})")
+        logger.info(
+            f"Recursos carregados: {self.loaded_requests} requisições, "
+            f"{self.loaded_bytes / 1024:.0f} KB"
+        )
+        if self.unlisted_hosts:
+            hosts = ", ".join(h for h, _ in self.unlisted_hosts.most_common(5))
+            logger.info(f"Hosts de terceiros ainda carregados (candidatos a BLOCKED_HOSTS): {hosts}")
@@ -1,30 +1,322 @@
 """
 Lógica de scraping do STJ
 """
-from typing import Optional, Dict, Tuple
-from datetime import datetime
+from typing import Optional, Dict, Tuple, Any
 from selenium.webdriver.common.by import By
+import re
 import time
 
 from .browser_handler import BrowserHandler
-from .config import SELECTORS, MAX_RETRIES
+from .input_fill import InputFiller
+from .config import SELECTORS, MAX_RETRIES, STJ_URL, STJ_HOST, URL_SEARCH
+from .http_engine import search_url
+from .page_outcome import Outcome, OUTCOMES, BLOCKERS_JS
+from .rate_limiter import for_host
+from .selector_registry import SELECTORS_REGISTRY
 from .utils import (
     get_logger, sanitize_text, extract_digits_from_process,
-    is_hc_process, take_screenshot, clean_url_for_pdf
+    is_hc_process, take_screenshot, clean_url_for_pdf,
+    pick_most_recent_candidate
 )
 
 logger = get_logger(__name__)
 
+# Elementos que só existem quando a pesquisa trouxe um resultado
+RESULT_MARKERS = [
+    {"tipo": "element", "alvo": "#idSpanClasseDescricao, #idDetalhesPartesAdvogadosProcuradores"},
+    {"tipo": "element", "alvo": "div.clsListaProcessoFormatoVerticalBlocoExterno"},
+    {"tipo": "element", "alvo": "#idDivBlocoMensagem.clsMensagemBloco .clsMensagemLinha"},
+]
+
+# Falhas seguidas da pesquisa por URL antes de voltar ao formulário
+URL_SEARCH_MAX_FAILURES = 3
+
+# Leitura da página de resultado numa única ida e volta: classifica a página
+# e, se for de detalhes, extrai todos os campos. Registra o tempo de cada
+# etapa (ms) e qual seletor casou em cada campo.
+PAGE_BUNDLE_SCRIPT = BLOCKERS_JS + r"""
+    var t0 = performance.now();
+    var registro = {tipo: 'erro', dados: {}, tempos: {}, seletores: {}};
+
+    function medir(campo, fn) {
+        var inicio = performance.now();
+        try { return fn(); }
+        finally { registro.tempos[campo] = Math.round((performance.now() - inicio) * 100) / 100; }
+    }
+    function texto(el) {
+        return el ? (el.innerText || el.textContent || '').trim() : '';
+    }
+    function concluir() {
+        registro.url = window.location.href;
+        registro.tempos.total = Math.round((performance.now() - t0) * 100) / 100;
+        return registro;
+    }
+
+    // 1. Classificação por seletores pontuais (sem serializar o DOM)
+    registro.tipo = medir('classificacao', function() {
+        var bloqueada = bloqueio();
+        if (bloqueada) {
+            registro.seletores.classificacao = 'bloqueio';
+            return bloqueada;
+        }
+        var msgLinha = document.querySelector('#idDivBlocoMensagem.clsMensagemBloco .clsMensagemLinha');
+        if (msgLinha) {
+            var msg = msgLinha.textContent.trim().toLowerCase();
+            if (msg.includes('nenhum registro') || msg.includes('não encontrado') ||
+                msg.includes('nao encontrado')) {
+                registro.seletores.classificacao = '#idDivBlocoMensagem .clsMensagemLinha';
+                return 'nao_encontrado';
+            }
+        }
+        if (document.querySelector('div.clsListaProcessoFormatoVerticalBlocoExterno')) {
+            registro.seletores.classificacao = 'div.clsListaProcessoFormatoVerticalBlocoExterno';
+            return 'multiplos_processos';
+        }
+        var detalhe = document.querySelector('#idSpanClasseDescricao, #idDetalhesPartesAdvogadosProcuradores');
+        if (detalhe) {
+            registro.seletores.classificacao = '#' + detalhe.id;
+            return 'detalhes';
+        }
+        var formulario = document.getElementById('idDivLinhaFormulario');
+        if (formulario && formulario.style.display !== 'none') {
+            registro.seletores.classificacao = '#idDivLinhaFormulario';
+            return 'nao_encontrado';
+        }
+        return 'erro';
+    });
+
+    // Lista de múltiplos resultados: cada bloco vira um candidato estruturado
+    if (registro.tipo === 'multiplos_processos') {
+        registro.candidatos = medir('candidatos', function() {
+            var padraoPdf = /'([^']*\/processo\/dj\/documento\/mediado\/[^']*)'/;
+            var lista = [];
+            document.querySelectorAll('div.clsListaProcessoFormatoVerticalBlocoExterno').forEach(function(bloco, index) {
+                var cand = {index: index, registro: '', numero: '', url: '', autuacao: '', classe: '',
+                            partes: '', movimentacao: '', link: '', campos: {}};
+
+                var botao = bloco.querySelector('input.listaProcessosPartesBotoes');
+                var idBotao = botao ? (botao.getAttribute('id') || '') : '';
+                var matchRegistro = idBotao.match(/idProcessosListaMaisMenosDetalhes(\d+)/);
+                if (matchRegistro) cand.registro = matchRegistro[1];
+
+                var primeiroLink = bloco.querySelector('a');
+                if (primeiroLink) {
+                    cand.url = primeiroLink.href;
+                    cand.numero = texto(primeiroLink);
+                }
+
+                // Campos da linha: classe CSS clsLinhaProcessosXxx -> campos.Xxx
+                bloco.querySelectorAll('[class*="clsLinhaProcessos"]').forEach(function(el) {
+                    var m = (el.className || '').match(/clsLinhaProcessos(\w+)/);
+                    var valor = texto(el).replace(/\s+/g, ' ');
+                    if (m && valor && !(m[1] in cand.campos)) cand.campos[m[1]] = valor;
+                });
+                Object.keys(cand.campos).forEach(function(chave) {
+                    var valor = cand.campos[chave];
+                    if (chave === 'DataAutuacao') cand.autuacao = valor;
+                    else if (/classe/i.test(chave) && !cand.classe) cand.classe = valor;
+                    else if (/(fase|movimenta)/i.test(chave) && !cand.movimentacao) cand.movimentacao = valor;
+                    else if (/parte/i.test(chave) && !cand.partes) cand.partes = valor;
+                });
+
+                // Partes no mesmo formato da página de detalhes, quando o bloco as traz
+                var partes = [];
+                bloco.querySelectorAll('.classDivLinhaDetalhes').forEach(function(linha) {
+                    var label = linha.querySelector('.classSpanDetalhesLabel');
+                    var valor = linha.querySelector('.classSpanDetalhesTexto a');
+                    if (label && valor && texto(label) && texto(valor)) {
+                        partes.push(texto(label).replace(/\s+/g, ' ') + ' ' + texto(valor).replace(/\s+/g, ' '));
+                    }
+                });
+                if (partes.length) cand.partes = partes.join(' | ');
+
+                bloco.querySelectorAll('[onclick]').forEach(function(el) {
+                    var m = (el.getAttribute('onclick') || '').match(padraoPdf);
+                    if (m && !cand.link) cand.link = 'https://processo.stj.jus.br' + m[1];
+                });
+
+                lista.push(cand);
+            });
+            registro.seletores.candidatos = 'div.clsListaProcessoFormatoVerticalBlocoExterno';
+            return lista;
+        });
+    }
+
+    if (registro.tipo !== 'detalhes') return concluir();
+
+    // 2. Partes/advogados
+    registro.dados.reu = medir('reu', function() {
+        var container = document.getElementById('idDetalhesPartesAdvogadosProcuradores');
+        if (!container) return '';
+        registro.seletores.reu = '#idDetalhesPartesAdvogadosProcuradores .classDivLinhaDetalhes';
+        var resultados = [];
+        container.querySelectorAll('.classDivLinhaDetalhes').forEach(function(linha) {
+            var label = linha.querySelector('.classSpanDetalhesLabel');
+            var valor = linha.querySelector('.classSpanDetalhesTexto a');
+            if (label && valor) {
+                var labelText = label.innerText.trim().replace(/\s+/g, ' ');
+                var valorText = valor.innerText.trim().replace(/\s+/g, ' ');
+                if (labelText && valorText) resultados.push(labelText + ' ' + valorText);
+            }
+        });
+        return resultados.join(' | ');
+    });
+
+    // 3. Classe
+    registro.dados.superior = medir('superior', function() {
+        var el = document.getElementById('idSpanClasseDescricao');
+        if (el) registro.seletores.superior = '#idSpanClasseDescricao';
+        return texto(el);
+    });
+
+    // 4. Última movimentação (linha cujo rótulo é "Última fase")
+    registro.dados.movimentacao = medir('movimentacao', function() {
+        var movimentacao = '';
+        document.querySelectorAll('.classDivLinhaDetalhes').forEach(function(linha) {
+            var label = linha.querySelector('.classSpanDetalhesLabel');
+            var valor = linha.querySelector('.classSpanDetalhesTexto');
+            if (label && valor) {
+                var labelText = label.innerText.trim().toUpperCase();
+                if (labelText.includes('ÚLTIMA FASE') || labelText.includes('ULTIMA FASE')) {
+                    movimentacao = valor.innerText || valor.textContent || '';
+                    registro.seletores.movimentacao = '.classDivLinhaDetalhes [ÚLTIMA FASE]';
+                }
+            }
+        });
+        return movimentacao.trim();
+    });
+
+    // 5. Aba de decisões e link do PDF (aguarda o link até 1 s após ativar a aba);
+    //    arguments[0] é a cadeia "link_decisao" na ordem da taxa de acerto
+    var cadeiaLink = arguments[0] || ['a.clsDecisoesMonocraticasTopoLink'];
+    var inicioLink = performance.now();
+    if (typeof setVisibilidadeAbaDecisoes === 'function') {
+        setVisibilidadeAbaDecisoes();
+        registro.seletores.decisoes = 'setVisibilidadeAbaDecisoes()';
+    }
+
+    function acharLink() {
+        for (var i = 0; i < cadeiaLink.length; i++) {
+            try {
+                var el = document.querySelector(cadeiaLink[i]);
+                if (el) return {el: el, seletor: cadeiaLink[i]};
+            } catch (e) {}
+        }
+        return null;
+    }
+    function lerLink() {
+        var achado = acharLink();
+        var el = achado ? achado.el : null;
+        var onclick = el ? (el.getAttribute('onclick') || '') : '';
+        var match = onclick.match(/'([^']*\/processo\/dj\/documento\/mediado\/[^']*)'/);
+        registro.tempos.link = Math.round((performance.now() - inicioLink) * 100) / 100;
+        if (match && match[1]) {
+            registro.seletores.link = achado.seletor;
+            registro.dados.link = 'https://processo.stj.jus.br' + match[1];
+        } else {
+            registro.seletores.link = 'location.href';
+            registro.dados.link = window.location.href;
+        }
+        return concluir();
+    }
+
+    if (acharLink()) return lerLink();
+    return new Promise(function(resolve) {
+        var obs = new MutationObserver(function() {
+            if (acharLink()) { obs.disconnect(); clearTimeout(timer); resolve(lerLink()); }
+        });
+        obs.observe(document.documentElement, {childList: true, subtree: true});
+        var timer = setTimeout(function() { obs.disconnect(); resolve(lerLink()); }, 1000);
+    });
+"""
+
 
 class STJScraper:
     """Scraper para portal do STJ"""
     
     def __init__(self, browser: BrowserHandler):
         self.browser = browser
+        self.filler = InputFiller(browser, "STJ", self._type_per_char)
+        self.ultimo_registro: Optional[Dict[str, Any]] = None
+        # Registro/URL do processo escolhido na lista de múltiplos resultados
+        self.escolhido: Optional[Dict[str, str]] = None
+        self.url_detalhes: Optional[str] = None
+        # Pesquisa por URL: cada item é uma navegação, sem reset do formulário entre itens
+        self.url_search = URL_SEARCH
+        self._falhas_url = 0
+        # Toda navegação/pesquisa passa pelo limite de requisições do host
+        self.limiter = for_host(STJ_HOST)
+    
+    def _type_per_char(self, campo_selector: str, valor: str):
+        """Digitação caractere por caractere (como Power Automate fazia) - último recurso"""
+        self.browser.execute_script(
+            "var el = document.querySelector(arguments[0]); if (el) el.value = '';",
+            campo_selector
+        )
+        for char in valor:
+            # Usa JavaScript para garantir que chegue ao campo
+            self.browser.execute_script("""
+                var el = document.querySelector(arguments[0]);
+                if (el) {
+                    el.value += arguments[1];
+                    el.dispatchEvent(new Event('input', { bubbles: true }));
+                }
+            """, campo_selector, char)
+            time.sleep(0.05)  # Pequeno delay entre caracteres
+    
+    def _url_failed(self, motivo: str):
+        """Conta uma falha da pesquisa por URL e desliga o modo após falhas seguidas"""
+        self._falhas_url += 1
+        logger.warning(f"Pesquisa por URL falhou ({motivo})")
+        if self.url_search and self._falhas_url >= URL_SEARCH_MAX_FAILURES:
+            logger.warning("Pesquisa por URL desativada nesta execução - usando o formulário")
+            self.url_search = False
     
     def search_process(self, processo: str) -> bool:
         """
-        Pesquisa processo no portal STJ
+        Pesquisa processo no portal STJ: navegação direta para a URL da
+        pesquisa; se não trouxer resultado, recarrega o portal e usa o formulário
+        
+        Args:
+            processo: Número do processo
+            
+        Returns:
+            True se sucesso
+        """
+        if self.url_search:
+            if self._search_via_url(processo):
+                return True
+            if not self.browser.navigate_to_stj():
+                return False
+        return self._search_via_form(processo)
+    
+    def _search_via_url(self, processo: str) -> bool:
+        """
+        Abre a URL parametrizada da pesquisa e aguarda um resultado
+        
+        Returns:
+            True se a página trouxe detalhes, lista ou mensagem de não encontrado
+        """
+        try:
+            logger.info(f"Pesquisando processo por URL: {processo}")
+            self.escolhido = None
+            self.url_detalhes = None
+            with self.limiter.slot():
+                self.browser.driver.get(search_url(processo))
+            encontrou = self.browser.wait_any(RESULT_MARKERS, timeout=15, nome="pesquisa por URL") != -1
+            if not encontrou:
+                self.limiter.penalize("pesquisa por URL sem resultado no prazo")
+                self._url_failed("página sem resultado")
+                return False
+            self._falhas_url = 0
+            return True
+        except Exception as e:
+            self._url_failed(str(e))
+            return False
+    
+    def _search_via_form(self, processo: str) -> bool:
+        """
+        Pesquisa processo pelo formulário do portal STJ
         
         Args:
             processo: Número do processo
@@ -34,6 +326,8 @@ class STJScraper:
         """
         try:
             logger.info(f"Pesquisando processo: {processo}")
+            self.escolhido = None
+            self.url_detalhes = None
             
             # Verifica se é HC para escolher campo correto
             is_hc = is_hc_process(processo)
@@ -44,46 +338,38 @@ class STJScraper:
                 logger.error(f"Não encontrou campo de busca para: {processo}")
                 return False
             
-            time.sleep(1)
-            
-            # Digita número caractere por caractere (como Power Automate fazia)
-            digits = extract_digits_from_process(processo)
-            for digit in digits:
-                # Usa JavaScript para garantir que chegue ao campo
-                self.browser.execute_script(f"""
-                    var el = document.querySelector('{campo_selector}');
-                    if (el) {{
-                        el.value += '{digit}';
-                        el.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                    }}
-                """)
-                time.sleep(0.05)  # Pequeno delay entre caracteres
-            
-            logger.debug(f"Digitou processo: {''.join(digits)}")
+            # Preenche o número (estratégia rápida aprendida; digitação só se necessário)
+            numero = ''.join(extract_digits_from_process(processo))
+            estrategia = self.filler.fill(campo_selector, numero)
+            if not estrategia:
+                logger.error(f"Não foi possível preencher o campo com {numero}")
+                return False
             
-            # Clica no botão de consultar via JavaScript
-            time.sleep(1)
-            result = self.browser.execute_script("""
-                function ExecuteScript() {
-                    if (typeof quandoClicaConsultar === "function") {
-                        quandoClicaConsultar();
-                        return "OK";
-                    } else {
-                        return "Função não encontrada";
+            logger.debug(f"Digitou processo: {numero} ({estrategia})")
+            
+            with self.limiter.slot():
+                # Clica no botão de consultar via JavaScript
+                result = self.browser.execute_script("""
+                    function ExecuteScript() {
+                        if (typeof quandoClicaConsultar === "function") {
+                            quandoClicaConsultar();
+                            return "OK";
+                        } else {
+                            return "Função não encontrada";
+                        }
                     }
-                }
-                return ExecuteScript();
-            """)
+                    return ExecuteScript();
+                """)
             
             if result != "OK":
                 logger.error("Função quandoClicaConsultar não encontrada")
                 return False
             
-            # Aguarda página carregar (desaparecer texto de ajuda)
-            if not self.browser.wait_for_text_to_disappear("O que eu consigo ver aqui?", timeout=15):
-                logger.debug("Texto de ajuda já desapareceu")
+            # Aguarda página carregar (desaparecer texto de ajuda) - resolve na mutação do DOM
+            if not self.browser.wait_text_gone("O que eu consigo ver aqui?", timeout=15):
+                self.limiter.penalize("resultado da pesquisa não carregou no prazo")
+                logger.debug("Texto de ajuda não desapareceu no prazo")
             
-            time.sleep(0.5)
             logger.info("Pesquisa realizada com sucesso")
             return True
             
@@ -92,191 +378,244 @@ class STJScraper:
             take_screenshot(self.browser.driver, f"erro_pesquisa_{processo}")
             return False
     
-    def verify_situation(self) -> Tuple[bool, Optional[str]]:
+    def submit_search(self, processo: str) -> bool:
         """
-        Verifica situação do resultado da pesquisa
+        Preenche o campo e dispara a pesquisa sem aguardar o resultado.
+        Usado no modo multi-abas: enquanto esta aba carrega, outra trabalha.
         
+        Args:
+            processo: Número do processo
+            
         Returns:
-            (encontrou, tipo) onde tipo pode ser: 'detalhes', 'multiplos_processos', 'nao_encontrado'
+            True se a pesquisa foi disparada
         """
         try:
-            page_source = self.browser.driver.page_source
-            
-            # 1. Verifica primeiro se é "Não Encontrado" (mais específico)
-            # Usa seletores CSS específicos da página de erro
-            nao_encontrado = self.browser.execute_script("""
-                // Verifica presença do bloco de mensagem de erro
-                var msgBloco = document.getElementById('idDivBlocoMensagem');
-                if (msgBloco && msgBloco.classList.contains('clsMensagemBloco')) {
-                    var msgLinha = msgBloco.querySelector('.clsMensagemLinha');
-                    if (msgLinha) {
-                        var texto = msgLinha.textContent.trim().toLowerCase();
-                        // Verifica se contém mensagem de "não encontrado"
-                        return texto.includes('nenhum registro') || 
-                               texto.includes('não encontrado') ||
-                               texto.includes('nao encontrado');
-                    }
-                }
-                return false;
-            """)
+            logger.info(f"Disparando pesquisa: {processo}")
+            self.escolhido = None
+            self.url_detalhes = None
+            
+            # A resposta chega depois, em segundo plano: só a ficha é tomada aqui
+            self.limiter.acquire()
+            if self.url_search:
+                # Marca o documento atual: search_done só aceita o documento novo
+                self.browser.execute_script(
+                    "window.__pesquisaAnterior = true; window.location.assign(arguments[0]);",
+                    search_url(processo)
+                )
+                return True
             
-            if nao_encontrado:
-                logger.info("Processo não cadastrado no STJ (mensagem explícita)")
-                return False, "nao_encontrado"
+            is_hc = is_hc_process(processo)
+            campo_selector = SELECTORS["campo_processo"] if is_hc else SELECTORS["campo_nup"]
+            numero = ''.join(extract_digits_from_process(processo))
             
-            # 2. Verifica se retornou múltiplos processos (2 ou mais)
-            if "Pesquisa resultou em" in page_source and "registro" in page_source:
-                logger.info("Encontrou múltiplos processos - selecionando mais recente")
-                return True, "multiplos_processos"
+            if not self.filler.fill(campo_selector, numero):
+                logger.error(f"Não foi possível preencher o campo com {numero}")
+                return False
             
-            # 3. Verifica se tem botão "Detalhes" (1 processo encontrado)
-            time.sleep(0.3)
-            page_source_lower = page_source.lower()
+            result = self.browser.execute_script("""
+                if (typeof quandoClicaConsultar !== "function") return "Função não encontrada";
+                quandoClicaConsultar();
+                return "OK";
+            """)
             
-            if "detalhes" in page_source_lower or "idspanclassedescricao" in page_source_lower:
-                logger.info("Processo encontrado - página de detalhes")
-                return True, "detalhes"
+            if result != "OK":
+                logger.error(f"Não foi possível disparar pesquisa de {processo}: {result}")
+                return False
+            return True
             
-            # 4. Fallback: verifica se voltou ao formulário sem mensagem clara
-            formulario_visivel = self.browser.execute_script("""
-                var formulario = document.getElementById('idDivLinhaFormulario');
-                return formulario && formulario.style.display !== 'none';
-            """)
+        except Exception as e:
+            logger.error(f"Erro ao disparar pesquisa {processo}: {e}")
+            return False
+    
+    def search_done(self) -> bool:
+        """
+        Verifica, sem bloquear, se o resultado da pesquisa já foi carregado
+        (pesquisa por URL: documento novo com um resultado; formulário: texto
+        de ajuda sumiu)
+        
+        Returns:
+            True se o resultado está na tela
+        """
+        if self.url_search:
+            done = self.browser.execute_script("""
+                if (window.__pesquisaAnterior || document.readyState === 'loading') return false;
+                return arguments[0].some(function(seletor) { return !!document.querySelector(seletor); });
+            """, [marcador["alvo"] for marcador in RESULT_MARKERS])
+            return bool(done)
+        
+        done = self.browser.execute_script("""
+            return document.readyState !== 'loading' && !!document.body &&
+                   document.body.textContent.indexOf(arguments[0]) === -1;
+        """, "O que eu consigo ver aqui?")
+        return bool(done)
+    
+    def read_page(self) -> Dict[str, Any]:
+        """
+        Lê a página de resultado numa única chamada (PAGE_BUNDLE_SCRIPT)
+        
+        Returns:
+            Registro com tipo (Outcome), dados, tempos (ms) por campo e seletores que casaram
+        """
+        registro = self.browser.execute_script(
+            PAGE_BUNDLE_SCRIPT, SELECTORS_REGISTRY.chain("link_decisao")
+        ) or {"dados": {}}
+        registro["tipo"] = Outcome.parse(registro.get("tipo"))
+        self.ultimo_registro = registro
+        if registro["tipo"] == Outcome.DETALHES:
+            self.url_detalhes = registro.get("url")
+            SELECTORS_REGISTRY.record_match("link_decisao", (registro.get("seletores") or {}).get("link"))
+        logger.debug(
+            f"Leitura da página: tipo={registro['tipo'].value} "
+            f"tempos={registro.get('tempos')} seletores={registro.get('seletores')}"
+        )
+        return registro
+    
+    def open_cached(self, url: str, processo: str) -> bool:
+        """
+        Abre direto a página de detalhes guardada no cache de identificadores
+        
+        Args:
+            url: URL de detalhes gravada numa execução anterior
+            processo: Número do processo (conferido contra o conteúdo da página)
             
-            if formulario_visivel:
-                logger.info("Processo não encontrado (voltou ao formulário)")
-                return False, "nao_encontrado"
+        Returns:
+            True se a URL ainda leva aos detalhes do mesmo processo
+        """
+        try:
+            logger.info(f"Abrindo detalhes do cache: {url}")
+            self.escolhido = None
+            with self.limiter.slot():
+                self.browser.driver.get(url)
+            if self.read_page()["tipo"] != Outcome.DETALHES:
+                return False
             
-            # Se não se encaixou em nenhum caso
-            logger.warning("Situação não identificada - salvando screenshot")
-            take_screenshot(self.browser.driver, "situacao_nao_identificada")
-            return False, "erro"
+            digitos = "".join(c for c in processo if c.isdigit())
+            return bool(self.browser.execute_script(
+                "return (document.body.textContent || '').replace(/\\D/g, '').indexOf(arguments[0]) !== -1;",
+                digitos
+            ))
+        except Exception as e:
+            logger.warning(f"URL do cache não abriu: {e}")
+            return False
+    
+    def detail_identifier(self, processo: str) -> Tuple[str, str]:
+        """
+        Identificador e URL reutilizáveis da página de detalhes atual
+        
+        Args:
+            processo: Número do processo pesquisado
             
+        Returns:
+            (registro, url): registro pode ser vazio quando não aparece na URL
+        """
+        if self.escolhido:
+            return self.escolhido["registro"], self.escolhido["url"]
+        
+        url = self.url_detalhes or ""
+        if not url or url.rstrip("/") == STJ_URL.rstrip("/"):
+            # Pesquisa via POST: a própria pesquisa por GET leva ao detalhe
+            url = search_url(processo)
+        match = re.search(r"num_registro=(\d+)", url)
+        return (match.group(1) if match else ""), url
+    
+    def verify_situation(self) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica situação do resultado da pesquisa. Na página de detalhes a
+        mesma leitura já traz os campos, reaproveitados por extract_data()
+        
+        Returns:
+            (encontrou, tipo) onde tipo é o valor de um Outcome: 'detalhes',
+            'multiplos_processos', 'nao_encontrado' ou um desfecho de bloqueio
+            ('captcha', 'sessao_expirada', 'pagina_erro', 'erro')
+        """
+        try:
+            tipo = self.read_page()["tipo"]
         except Exception as e:
             logger.error(f"Erro ao verificar situação: {e}")
-            return False, "erro"
+            tipo = Outcome.DESCONHECIDO
+        OUTCOMES.record(tipo)
+        if tipo.is_blocking:
+            self.limiter.penalize(f"página de resultado '{tipo.value}'")
+        else:
+            self.limiter.reward()
+        
+        if tipo == Outcome.NAO_ENCONTRADO:
+            logger.info(f"Processo não cadastrado no STJ ({self.ultimo_registro['seletores'].get('classificacao')})")
+            return False, tipo.value
+        
+        if tipo == Outcome.MULTIPLOS:
+            logger.info("Encontrou múltiplos processos - selecionando mais recente")
+            return True, tipo.value
+        
+        if tipo == Outcome.DETALHES:
+            logger.info("Processo encontrado - página de detalhes")
+            return True, tipo.value
+        
+        # Captcha, sessão expirada, página de erro ou situação não identificada
+        logger.warning(f"Página de resultado bloqueada ou não identificada ({tipo.value}) - salvando screenshot")
+        take_screenshot(self.browser.driver, f"situacao_{tipo.value}")
+        return False, tipo.value
     
     def handle_two_processes(self) -> bool:
         """
-        Quando há múltiplos processos (2 ou mais), seleciona o com autuação mais recente
+        Quando há múltiplos processos (2 ou mais), seleciona o com autuação mais recente.
+        
+        Os blocos da lista já foram lidos junto com a classificação da página;
+        o escolhido é aberto e os dados vêm da página de detalhes, como na
+        pesquisa com um só resultado (a lista resume classe e última fase).
         
         Returns:
             True se sucesso
         """
+        registro = self.ultimo_registro or {}
+        # A leitura anterior era da lista; a página de detalhes será lida de novo
+        self.ultimo_registro = None
+        self.escolhido = None
         try:
             logger.info("Identificando processo com autuação mais recente...")
             
-            # Script para extrair todos os registros com suas datas de autuação
-            extract_script = r"""
-                var resultados = [];
-                
-                try {
-                    // Procura pelos containers de cada processo
-                    var containers = document.querySelectorAll('div.clsListaProcessoFormatoVerticalBlocoExterno');
-                    
-                    if (containers.length === 0) {
-                        return {total: 0, registros: [], metodo: 'nenhum', erro: 'Containers não encontrados'};
-                    }
-                    
-                    containers.forEach(function(container, index) {
-                        try {
-                            // Extrair data de autuação
-                            var dataElement = container.querySelector('span.clsLinhaProcessosDataAutuacao');
-                            if (!dataElement) {
-                                return;
-                            }
-                            
-                            var dataText = dataElement.textContent.trim();
-                            
-                            // Extrair botão "mais"
-                            var botao = container.querySelector('input.listaProcessosPartesBotoes');
-                            if (!botao) {
-                                return;
-                            }
-                            
-                            // Extrair número de registro do id do botão
-                            var botaoId = botao.getAttribute('id') || '';
-                            var match = botaoId.match(/idProcessosListaMaisMenosDetalhes(\d+)/);
-                            if (!match) {
-                                return;
-                            }
-                            
-                            var numRegistro = match[1];
-                            
-                            resultados.push({
-                                index: index,
-                                data: dataText,
-                                numRegistro: numRegistro,
-                                botao: botao
-                            });
-                        } catch(e) {
-                            console.log('Erro no container ' + index + ': ' + e.toString());
-                        }
-                    });
-                    
-                    return {
-                        total: resultados.length,
-                        registros: resultados,
-                        metodo: 'lista_vertical'
-                    };
-                    
-                } catch(e) {
-                    return {total: 0, registros: [], metodo: 'erro', erro: e.toString()};
-                }
-            """
-            
-            resultado_extracao = self.browser.execute_script(extract_script)
-            resultados = resultado_extracao.get('registros', [])
-            metodo = resultado_extracao.get('metodo', 'desconhecido')
+            candidatos = registro.get("candidatos")
+            if candidatos is None:
+                candidatos = self.read_page().get("candidatos") or []
+                self.ultimo_registro = None
             
-            if not resultados or len(resultados) == 0:
-                logger.warning(f"Não conseguiu extrair registros da tabela (método: {metodo})")
+            if not candidatos:
+                logger.warning("Não conseguiu extrair registros da lista de resultados")
                 take_screenshot(self.browser.driver, "erro_extracao_multiplos")
                 return False
             
-            logger.info(f"Encontrados {len(resultados)} registros (método: {metodo})")
-            
-            # Encontra o registro com data mais recente
-            mais_recente = None
-            data_mais_recente = None
-            
-            for registro in resultados:
-                try:
-                    # Parsea data no formato DD/MM/YYYY
-                    data_str = registro['data']
-                    data = datetime.strptime(data_str, "%d/%m/%Y")
-                    
-                    if data_mais_recente is None or data > data_mais_recente:
-                        data_mais_recente = data
-                        mais_recente = registro
-                        
-                except ValueError as e:
-                    logger.warning(f"Erro ao parsear data '{registro['data']}': {e}")
-                    continue
+            logger.info(f"Encontrados {len(candidatos)} registros na lista")
+            for candidato in candidatos:
+                logger.debug(
+                    f"  [{candidato['index']}] registro={candidato['registro']} {candidato['numero']} "
+                    f"autuação={candidato['autuacao']} classe={candidato['classe']} campos={list(candidato['campos'])}"
+                )
             
+            mais_recente = pick_most_recent_candidate(candidatos)
             if not mais_recente:
                 logger.warning("Não conseguiu determinar registro mais recente")
                 return False
             
-            logger.info(f"Selecionando registro com autuação: {mais_recente['data']} (índice: {mais_recente['index']})")
+            logger.info(f"Selecionando registro com autuação: {mais_recente['autuacao']} (índice: {mais_recente['index']})")
+            if mais_recente["url"].startswith("http"):
+                self.escolhido = {"registro": mais_recente["registro"], "url": mais_recente["url"]}
             
             # Clica diretamente no link do número do processo (não precisa expandir)
-            click_link_script = f"""
-                try {{
+            click_link_script = """
+                try {
                     var containers = document.querySelectorAll('div.clsListaProcessoFormatoVerticalBlocoExterno');
-                    var container = containers[{mais_recente['index']}];
+                    var container = containers[arguments[0]];
                     
-                    if (!container) {{
-                        return {{sucesso: false, erro: 'Container não encontrado'}};
-                    }}
+                    if (!container) {
+                        return {sucesso: false, erro: 'Container não encontrado'};
+                    }
                     
                     // Procura pelo primeiro link (é o link do número do processo)
-                    var links = container.querySelectorAll('a');
-                    var link = links[0];  // Primeiro link é sempre o número do processo
+                    var link = container.querySelector('a');
                     
-                    if (!link) {{
-                        return {{sucesso: false, erro: 'Link do processo não encontrado'}};
-                    }}
+                    if (!link) {
+                        return {sucesso: false, erro: 'Link do processo não encontrado'};
+                    }
                     
                     var href = link.href;
                     var texto = link.textContent.trim();
@@ -284,14 +623,15 @@ class STJScraper:
                     // Clica no link para abrir página de detalhes
                     link.click();
                     
-                    return {{sucesso: true, href: href, texto: texto}};
+                    return {sucesso: true, href: href, texto: texto};
                     
-                }} catch(e) {{
-                    return {{sucesso: false, erro: e.toString()}};
-                }}
+                } catch(e) {
+                    return {sucesso: false, erro: e.toString()};
+                }
             """
             
-            resultado = self.browser.execute_script(click_link_script)
+            self.limiter.acquire()
+            resultado = self.browser.execute_script(click_link_script, mais_recente["index"])
             
             if not resultado or not resultado.get('sucesso'):
                 logger.warning(f"Erro ao clicar no link: {resultado.get('erro', 'desconhecido') if resultado else 'sem resultado'}")
@@ -300,7 +640,10 @@ class STJScraper:
             
             logger.info(f"Clicou no link do processo: {resultado.get('texto', 'sem texto')}")
             logger.info(f"Navegando para página de detalhes: {resultado.get('href', 'sem href')}")
-            time.sleep(2.0)  # Aguarda carregar página de detalhes
+            
+            # Aguarda o cabeçalho do detalhe (os blocos da lista também usam .classDivLinhaDetalhes)
+            if not self.browser.wait_element("#idSpanClasseDescricao", timeout=10):
+                logger.warning("Página de detalhes não carregou no prazo")
             
             return True
                 
@@ -311,7 +654,8 @@ class STJScraper:
     
     def extract_data(self) -> Dict[str, str]:
         """
-        Extrai dados da página de detalhes
+        Extrai dados da página de detalhes (reaproveita a leitura feita em
+        verify_situation quando a página ainda é a mesma)
         
         Returns:
             Dict com dados extraídos
@@ -319,99 +663,19 @@ class STJScraper:
         try:
             logger.info("Extraindo dados do processo")
             
+            registro = self.ultimo_registro
+            if not registro or registro.get("tipo") != Outcome.DETALHES:
+                registro = self.read_page()
+            self.ultimo_registro = None
+            
+            extraidos = registro.get("dados", {})
             dados = {
-                "reu": "",
-                "superior": "",
-                "movimentacao": "",
-                "link": ""
+                "reu": sanitize_text(extraidos.get("reu") or ""),
+                "superior": sanitize_text(extraidos.get("superior") or ""),
+                "movimentacao": sanitize_text(extraidos.get("movimentacao") or ""),
+                "link": clean_url_for_pdf(extraidos.get("link") or "")
             }
             
-            # 1. Extrai partes/advogados
-            partes_script = """
-                function ExecuteScript() {
-                    var container = document.getElementById("idDetalhesPartesAdvogadosProcuradores");
-                    if (!container) return "";
-                    
-                    var linhas = container.querySelectorAll(".classDivLinhaDetalhes");
-                    var resultados = [];
-                    
-                    linhas.forEach(function(linha) {
-                        var label = linha.querySelector(".classSpanDetalhesLabel");
-                        var texto = linha.querySelector(".classSpanDetalhesTexto a");
-                        
-                        if (label && texto) {
-                            var labelText = label.innerText.trim().replace(/\\s+/g, ' ');
-                            var textoText = texto.innerText.trim().replace(/\\s+/g, ' ');
-                            
-                            if (labelText && textoText) {
-                                resultados.push(labelText + " " + textoText);
-                            }
-                        }
-                    });
-                    
-                    return resultados.join(" | ");
-                }
-                return ExecuteScript();
-            """
-            dados["reu"] = sanitize_text(self.browser.execute_script(partes_script) or "")
-            
-            # 2. Extrai classe
-            classe_script = """
-                var el = document.getElementById("idSpanClasseDescricao");
-                return el ? el.innerText.trim() : "";
-            """
-            dados["superior"] = sanitize_text(self.browser.execute_script(classe_script) or "")
-            
-            # 3. Extrai última movimentação
-            movimentacao_script = """
-                function ExecuteScript() {
-                    var linhas = document.querySelectorAll(".classDivLinhaDetalhes");
-                    var movimentacao = "";
-                    
-                    linhas.forEach(function(linha) {
-                        var label = linha.querySelector(".classSpanDetalhesLabel");
-                        var texto = linha.querySelector(".classSpanDetalhesTexto");
-                        
-                        if (label && texto) {
-                            var labelText = label.innerText.trim().toUpperCase();
-                            if (labelText.includes("ÚLTIMA FASE") || labelText.includes("ULTIMA FASE")) {
-                                movimentacao = texto.innerText || texto.textContent || "";
-                            }
-                        }
-                    });
-                    
-                    return movimentacao.trim();
-                }
-                return ExecuteScript();
-            """
-            dados["movimentacao"] = sanitize_text(self.browser.execute_script(movimentacao_script) or "")
-            
-            # 4. Ativa aba de decisões
-            decisoes_script = """
-                if (typeof setVisibilidadeAbaDecisoes === "function") {
-                    setVisibilidadeAbaDecisoes();
-                    return "OK";
-                }
-                return "Função não encontrada";
-            """
-            self.browser.execute_script(decisoes_script)
-            time.sleep(0.3)
-            
-            # 5. Extrai link do PDF
-            link_script = """
-                var el = document.querySelector("a.clsDecisoesMonocraticasTopoLink");
-                if (el) {
-                    var onclickAttr = el.getAttribute("onclick");
-                    var match = onclickAttr.match(/\'([^\']*\\/processo\\/dj\\/documento\\/mediado\\/[^\']*)\'/);
-                    if (match && match[1]) {
-                        return "https://processo.stj.jus.br" + match[1];
-                    }
-                }
-                return window.location.href;
-            """
-            link = self.browser.execute_script(link_script) or ""
-            dados["link"] = clean_url_for_pdf(link)
-            
             logger.info(f"Dados extraídos: movimentacao={dados['movimentacao'][:50]}...")
             return dados
             
@@ -451,7 +715,8 @@ class STJScraper:
             """
             
             result = self.browser.execute_script(script)
-            time.sleep(0.5)
+            if result == "OK":
+                self.browser.wait_element(SELECTORS["campo_nup"], timeout=2, visible=True)
             
             return result == "OK"
             
@@ -2,10 +2,14 @@
 Funções auxiliares
 """
 import logging
+import queue
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from selenium.webdriver.remote.webdriver import WebDriver
 from .config import SCREENSHOTS_DIR, LOGS_DIR, LOG_LEVEL
 
@@ -21,6 +25,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Escrita das capturas de tela fora da thread do navegador (pipeline); None = grava na hora
+_screenshot_writer: Optional[ThreadPoolExecutor] = None
+
 
 def sanitize_text(text: str) -> str:
     """
@@ -98,6 +105,11 @@ def take_screenshot(driver: WebDriver, name: str) -> Optional[Path]:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{name}_{timestamp}.png"
         filepath = SCREENSHOTS_DIR / filename
+        writer = _screenshot_writer
+        if writer:
+            # Só a captura usa o navegador; o arquivo é gravado em segundo plano
+            writer.submit(_write_screenshot, filepath, driver.get_screenshot_as_png())
+            return filepath
         driver.save_screenshot(str(filepath))
         logger.info(f"Screenshot salvo: {filepath}")
         return filepath
@@ -106,6 +118,81 @@ def take_screenshot(driver: WebDriver, name: str) -> Optional[Path]:
         return None
 
 
+def _write_screenshot(filepath: Path, png: bytes):
+    try:
+        filepath.write_bytes(png)
+        logger.info(f"Screenshot salvo: {filepath}")
+    except Exception as e:
+        logger.error(f"Erro ao salvar screenshot: {e}")
+
+
+@contextmanager
+def deferred_screenshots():
+    """
+    Grava os arquivos de take_screenshot numa thread própria enquanto o bloco
+    roda; o bloco termina só depois de todas as capturas estarem em disco
+    """
+    global _screenshot_writer
+    _screenshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshots")
+    try:
+        yield
+    finally:
+        writer, _screenshot_writer = _screenshot_writer, None
+        writer.shutdown(wait=True)
+
+
+class _DeferredHandler(logging.Handler):
+    """Entrega o registro aos handlers originais do logger numa thread própria"""
+    
+    def __init__(self, fila: "queue.SimpleQueue", destinos: List[logging.Handler]):
+        super().__init__()
+        self.fila = fila
+        self.destinos = destinos
+    
+    def emit(self, record: logging.LogRecord):
+        # Mensagem e traceback resolvidos agora: os objetos podem mudar até a escrita
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.fila.put((self.destinos, record))
+
+
+def _write_logs(fila: "queue.SimpleQueue"):
+    while True:
+        item = fila.get()
+        if item is None:
+            return
+        destinos, record = item
+        for handler in destinos:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+@contextmanager
+def deferred_logging():
+    """
+    Escreve os logs (arquivo e console) numa thread própria enquanto o bloco
+    roda, sem segurar quem registrou a mensagem
+    """
+    # Os módulos do pacote propagam para os handlers da raiz (basicConfig)
+    loggers = [logging.getLogger()]
+    fila: "queue.SimpleQueue" = queue.SimpleQueue()
+    originais = {lg: lg.handlers[:] for lg in loggers}
+    for lg, handlers in originais.items():
+        lg.handlers = [_DeferredHandler(fila, handlers)]
+    escritor = threading.Thread(target=_write_logs, args=(fila,), name="logs", daemon=True)
+    escritor.start()
+    try:
+        yield
+    finally:
+        for lg, handlers in originais.items():
+            lg.handlers = handlers
+        fila.put(None)
+        escritor.join()
+
+
 def format_processo_numero(processo: str) -> str:
     """
     Formata número do processo para exibição
@@ -142,6 +229,30 @@ def clean_url_for_pdf(url: str) -> str:
     return url
 
 
+def pick_most_recent_candidate(candidatos: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Escolhe, na lista de múltiplos resultados, o processo com autuação mais recente
+    
+    Args:
+        candidatos: Blocos da lista com a chave 'autuacao' (DD/MM/YYYY)
+        
+    Returns:
+        Candidato escolhido ou None se nenhuma data foi legível
+    """
+    mais_recente = None
+    data_mais_recente = None
+    for candidato in candidatos:
+        try:
+            data = datetime.strptime(candidato.get("autuacao", ""), "%d/%m/%Y")
+        except ValueError:
+            logger.warning(f"Erro ao parsear data '{candidato.get('autuacao')}' (índice {candidato.get('index')})")
+            continue
+        if data_mais_recente is None or data > data_mais_recente:
+            data_mais_recente = data
+            mais_recente = candidato
+    return mais_recente
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Retorna logger configurado
@@ -0,0 +1,174 @@
+"""
+Watchdog de saúde do navegador: detecta sessão morta e recicla o Chrome
+"""
+import time
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:  # Amostragem de memória fica desativada sem psutil
+    psutil = None
+
+from .config import WATCHDOG_RECYCLE_EVERY, WATCHDOG_MAX_RSS_MB, WATCHDOG_SAMPLE_EVERY
+from .driver_pool import lease_browser, release_browser
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Trechos de mensagens do Selenium/ChromeDriver que indicam sessão perdida
+SESSION_DEAD_MARKERS = (
+    "invalid session id",
+    "chrome not reachable",
+    "session deleted",
+    "tab crashed",
+    "target window already closed",
+    "no such window",
+    "disconnected",
+    "connection refused",
+    "max retries exceeded",
+)
+
+
+class BrowserDeadError(Exception):
+    """A sessão do navegador morreu durante o processamento de um item"""
+
+
+def is_session_dead_error(error: Exception) -> bool:
+    """
+    Verifica se a exceção indica navegador/sessão perdidos
+
+    Args:
+        error: Exceção capturada
+
+    Returns:
+        True se a mensagem corresponde a sessão morta
+    """
+    mensagem = str(error).lower()
+    return any(marcador in mensagem for marcador in SESSION_DEAD_MARKERS)
+
+
+class BrowserWatchdog:
+    """
+    Acompanha o Chrome ao longo da varredura e o recicla quando:
+    - a sessão morre (o item em andamento é refeito no navegador novo);
+    - atinge WATCHDOG_RECYCLE_EVERY consultas;
+    - a memória somada dos processos do Chrome passa de WATCHDOG_MAX_RSS_MB.
+    """
+
+    # Aviso de psutil ausente sai uma vez por processo, não por worker
+    _avisou_psutil = False
+
+    def __init__(self, browser, on_recycle=None):
+        """
+        Args:
+            browser: BrowserHandler monitorado
+            on_recycle: Callback chamado após reabrir o navegador (self.browser
+                pode ser outro objeto, vindo do pool)
+        """
+        self.browser = browser
+        self.on_recycle = on_recycle
+        self.lookups = 0
+        self.recycles = 0
+        self.last_rss_mb: Optional[float] = None
+        self.peak_rss_mb = 0.0
+
+        if WATCHDOG_MAX_RSS_MB and psutil is None and not BrowserWatchdog._avisou_psutil:
+            BrowserWatchdog._avisou_psutil = True
+            logger.warning(
+                f"WATCHDOG_MAX_RSS_MB={WATCHDOG_MAX_RSS_MB} ignorado: psutil não está instalado "
+                "(pip install psutil) - reciclagem só por contagem de consultas"
+            )
+
+    def chrome_rss_mb(self) -> Optional[float]:
+        """
+        Soma a memória residente do ChromeDriver e de todos os processos Chrome filhos
+
+        Returns:
+            RSS em MB ou None se indisponível
+        """
+        if psutil is None or not self.browser.driver:
+            return None
+        try:
+            raiz = psutil.Process(self.browser.driver.service.process.pid)
+            processos = [raiz] + raiz.children(recursive=True)
+            total = 0
+            for proc in processos:
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except Exception as e:
+            logger.debug(f"Não foi possível medir memória do Chrome: {e}")
+            return None
+
+    def recycle_reason(self) -> Optional[str]:
+        """
+        Decide se o navegador deve ser reciclado antes da próxima consulta
+
+        Returns:
+            Motivo da reciclagem ou None
+        """
+        if not self.browser.is_alive():
+            return "sessão sem resposta"
+
+        if WATCHDOG_RECYCLE_EVERY and self.lookups >= WATCHDOG_RECYCLE_EVERY:
+            return f"{self.lookups} consultas desde a última abertura"
+
+        if WATCHDOG_MAX_RSS_MB and WATCHDOG_SAMPLE_EVERY and self.lookups % WATCHDOG_SAMPLE_EVERY == 0:
+            rss = self.chrome_rss_mb()
+            if rss is not None:
+                self.last_rss_mb = rss
+                self.peak_rss_mb = max(self.peak_rss_mb, rss)
+                if rss > WATCHDOG_MAX_RSS_MB:
+                    return f"memória do Chrome em {rss:.0f} MB (limite {WATCHDOG_MAX_RSS_MB} MB)"
+
+        return None
+
+    def before_lookup(self) -> bool:
+        """
+        Verifica a saúde antes de cada consulta, reciclando se necessário
+
+        Returns:
+            True se o navegador está pronto
+        """
+        motivo = self.recycle_reason()
+        if motivo:
+            return self.recycle(motivo)
+        return True
+
+    def after_lookup(self):
+        """Conta uma consulta concluída no navegador atual"""
+        self.lookups += 1
+
+    def recycle(self, motivo: str) -> bool:
+        """
+        Troca o navegador por um do pool (já no portal) ou, sem pool,
+        fecha e reabre o atual
+
+        Args:
+            motivo: Descrição registrada no log
+
+        Returns:
+            True se o novo navegador ficou pronto
+        """
+        logger.warning(f"♻ Reciclando navegador: {motivo}")
+        inicio = time.perf_counter()
+
+        novo = lease_browser()
+        if novo:
+            release_browser(self.browser, descartar=True)
+            self.browser = novo
+        else:
+            self.browser.close()
+            self.browser.driver = None
+            if not self.browser.start() or not self.browser.navigate_to_stj():
+                logger.error("Falha ao reabrir navegador após reciclagem")
+                return False
+
+        self.recycles += 1
+        self.lookups = 0
+        if self.on_recycle:
+            self.on_recycle()
+        logger.info(f"Navegador reciclado em {time.perf_counter() - inicio:.1f}s")
+        return True
@@ -0,0 +1,157 @@
+"""
+Varredura com vários workers consumindo uma fila comum de processos
+"""
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .config import STJ_WORKERS, RATE_LIMIT
+from .driver_pool import shared_pool, lease_browser, release_browser
+from .startup import StartupProfiler
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Contadores que não são somados entre workers (definidos pelo principal)
+STATS_NAO_SOMADOS = ("total", "tempo_inicio", "tempo_fim", "status_atuais_banco")
+
+
+class WorkerPool:
+    """
+    Distribui a lista de processos entre N workers que consomem a mesma fila.
+
+    O worker 0 é a própria automação (navegador já aberto pelo bootstrap ou
+    motor HTTP); os demais são instâncias próprias da automação, com navegador
+    (perfil clonado) ou motor HTTP próprios, que compartilham o cliente
+    Supabase, o cache de identificadores e a janela de progresso.
+
+    Cada item passa pelo mesmo caminho da execução em série (process_http e
+    _process_in_browser), então o que é gravado no banco não muda, só a ordem
+    de conclusão. No fim, os contadores de cada worker são somados em
+    automation.stats.
+    """
+
+    def __init__(self, automation, workers: int = STJ_WORKERS):
+        self.automation = automation
+        self.workers = max(1, workers)
+        self.extras: List = []
+        self.fila: "queue.Queue" = queue.Queue()
+        self.total = 0
+        self.concluidos = 0
+        self._lock = threading.Lock()
+
+    def _open_worker(self, worker) -> bool:
+        """
+        Empresta um navegador do pool para um worker extra (a frio se o pool
+        estiver desativado ou vazio; motor HTTP abre sob demanda)
+        """
+        if worker.http_engine:
+            return True
+        browser = lease_browser()
+        if browser:
+            worker._adopt_browser(browser)
+            return True
+        return worker._start_browser(threading.Event(), StartupProfiler())
+
+    def _next(self) -> Optional[tuple]:
+        try:
+            return self.fila.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _loop(self, worker, nome: str, abrir: bool):
+        """Consome a fila até esvaziar"""
+        if abrir and not self._open_worker(worker):
+            logger.error(f"{nome}: navegador não abriu - os demais workers seguem com a fila")
+            return
+
+        processados = 0
+        while True:
+            item = self._next()
+            if item is None:
+                break
+            indice, processo = item
+            if processados and not RATE_LIMIT:
+                # Mesmo intervalo da execução em série, por worker
+                time.sleep(1)
+
+            logger.info(f"\n[{indice}/{self.total}] Processando ({nome})...")
+            try:
+                if not worker.http_engine or worker.process_http(processo) is None:
+                    worker._process_in_browser(processo)
+            except Exception as e:
+                logger.error(f"{nome}: erro inesperado em {processo.get('tjsp', 'N/A')}: {e}")
+                worker.stats["erro"] += 1
+            processados += 1
+
+            with self._lock:
+                self.concluidos += 1
+                concluidos = self.concluidos
+            if self.automation.progress_window:
+                self.automation.progress_window.update(processed=concluidos)
+
+        logger.info(f"{nome}: {processados} processo(s) concluídos")
+
+    def run(self, processos: List[Dict]):
+        """
+        Processa a lista com os N workers e soma os contadores
+
+        Args:
+            processos: Lista de dicts com tjsp/situacao
+        """
+        self.total = len(processos)
+        for item in enumerate(processos, 1):
+            self.fila.put(item)
+
+        # Navegadores dos workers extras saem do pool, aquecido desde já
+        if not self.automation.http_engine:
+            shared_pool()
+        
+        # Instâncias criadas antes de qualquer item ser processado
+        quantidade = min(self.workers, self.total)
+        self.extras = [type(self.automation)(compartilhado=self.automation) for _ in range(quantidade - 1)]
+        logger.info(f"Modo multi-worker: {quantidade} worker(s) para {self.total} processo(s)")
+
+        threads = [threading.Thread(target=self._loop, args=(self.automation, "worker 1", False),
+                                    name="stj-worker-1", daemon=True)]
+        for numero, worker in enumerate(self.extras, 2):
+            threads.append(threading.Thread(target=self._loop, args=(worker, f"worker {numero}", True),
+                                            name=f"stj-worker-{numero}", daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Sobrou item (todos os workers extras falharam e o principal parou): conta como erro
+        while self._next() is not None:
+            self.automation.stats["erro"] += 1
+
+        for worker in self.extras:
+            self._merge(worker)
+
+    def _merge(self, worker):
+        """Soma os contadores de um worker extra nos da automação principal"""
+        stats = self.automation.stats
+        for chave, valor in worker.stats.items():
+            if chave in STATS_NAO_SOMADOS:
+                continue
+            if isinstance(valor, dict):
+                for subchave, total in valor.items():
+                    stats[chave][subchave] = stats[chave].get(subchave, 0) + total
+            elif isinstance(valor, (int, float)):
+                stats[chave] = stats.get(chave, 0) + valor
+        self.automation.watchdog.peak_rss_mb = max(
+            self.automation.watchdog.peak_rss_mb, worker.watchdog.peak_rss_mb
+        )
+
+    def close(self):
+        """Devolve ao pool os navegadores dos workers extras e fecha os motores HTTP"""
+        for worker in self.extras:
+            try:
+                release_browser(worker.browser)
+                if worker.http_engine:
+                    worker.http_engine.close()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar worker: {e}")
+        self.extras = []
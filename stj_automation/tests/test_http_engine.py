@@ -0,0 +1,142 @@
+"""
+Teste offline do parser do motor HTTP do STJ
+Usa as páginas de examples/ (não acessa o portal): marcação sintética e
+reduzida, montada com os ids e classes que o motor lê; não são respostas
+capturadas do portal
+
+Execute: python -m unittest tests.test_http_engine
+"""
+import sys
+import os
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import html
+
+from src.http_engine import STJHttpEngine
+from src.page_outcome import Outcome
+from src.scraper import STJScraper
+from src.utils import pick_most_recent_candidate
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+DETALHE_URL = "https://processo.stj.jus.br/processo/pesquisa/?num_registro=202401987654&aplicacao=processos.ea"
+PDF_URL = (
+    "https://processo.stj.jus.br/processo/dj/documento/mediado/?tipo_documento=documento"
+    "&componente=MON&sequencial=254789123&num_registro=202401987654&data=20240918"
+)
+
+
+def carregar(nome: str, url: str = DETALHE_URL) -> html.HtmlElement:
+    """Lê a página como _get() faz (links absolutos a partir da URL da resposta)"""
+    with open(os.path.join(EXAMPLES_DIR, nome), "rb") as f:
+        doc = html.fromstring(f.read(), base_url=url)
+    doc.make_links_absolute(url, resolve_base_href=True)
+    return doc
+
+
+class TestPaginaDetalhes(unittest.TestCase):
+    """page_detalhes.html: detalhe do AREsp 2654321 com a aba Decisões carregada"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.doc = carregar("page_detalhes.html")
+        cls.dados = STJHttpEngine.parse_details(cls.doc)
+
+    def test_classificacao(self):
+        self.assertEqual(STJHttpEngine.classify(self.doc), "detalhes")
+
+    def test_mesmo_processo(self):
+        self.assertTrue(STJHttpEngine.same_process(self.doc, "1501234-56.2022.8.26.0050"))
+        self.assertFalse(STJHttpEngine.same_process(self.doc, "1509999-00.2022.8.26.0050"))
+
+    def test_partes(self):
+        # Só linhas com link no valor, espaços internos normalizados
+        self.assertEqual(
+            self.dados["reu"],
+            "AGRAVANTE : J S DA S | ADVOGADO : MARIA APARECIDA SOUZA - SP123456 | "
+            "AGRAVADO : MINISTÉRIO PÚBLICO DO ESTADO DE SÃO PAULO"
+        )
+
+    def test_classe(self):
+        self.assertEqual(self.dados["superior"], "AREsp 2654321 / SP")
+
+    def test_movimentacao(self):
+        # Linha "ÚLTIMA FASE", sem quebras de linha nem aspas
+        self.assertEqual(
+            self.dados["movimentacao"],
+            "18/09/2024 (14:32) - Conhecido o recurso de Fulano e não provido"
+        )
+
+    def test_link_do_pdf(self):
+        self.assertEqual(self.dados["link"], PDF_URL + "&formato=PDF")
+
+    def test_mesmas_chaves_de_extract_data(self):
+        # extract_data() reaproveita a leitura da página (ultimo_registro) sem
+        # tocar no navegador; com os mesmos campos brutos o resultado é idêntico
+        scraper = STJScraper.__new__(STJScraper)
+        scraper.ultimo_registro = {"tipo": Outcome.DETALHES, "dados": dict(self.dados)}
+        self.assertEqual(scraper.extract_data(), self.dados)
+
+
+class TestPaginaMultiplos(unittest.TestCase):
+    """page_multiplos.html: lista com três processos para o mesmo número de origem"""
+
+    @classmethod
+    def setUpClass(cls):
+        url = "https://processo.stj.jus.br/processo/pesquisa/?tipoPesquisa=tipoPesquisaNumeroUnico"
+        cls.doc = carregar("page_multiplos.html", url)
+        cls.candidatos = STJHttpEngine.candidates(cls.doc)
+
+    def test_classificacao(self):
+        self.assertEqual(STJHttpEngine.classify(self.doc), "multiplos_processos")
+
+    def test_candidatos(self):
+        self.assertEqual([c["registro"] for c in self.candidatos],
+                         ["202300456789", "202401987654", "202200111222"])
+        self.assertEqual([c["autuacao"] for c in self.candidatos],
+                         ["03/04/2023", "12/06/2024", "data indisponível"])
+        self.assertEqual(self.candidatos[0]["url"],
+                         "https://processo.stj.jus.br/processo/pesquisa/?num_registro=202300456789"
+                         "&aplicacao=processos.ea")
+
+    def test_escolhe_o_mais_recente(self):
+        escolhido = pick_most_recent_candidate(self.candidatos)
+        self.assertEqual(escolhido["registro"], "202401987654")
+        self.assertEqual(escolhido["numero"], "AREsp 2654321 / SP")
+
+    def test_campos_do_candidato(self):
+        escolhido = self.candidatos[1]
+        self.assertEqual(escolhido["classe"], "AREsp 2654321 / SP")
+        self.assertEqual(escolhido["movimentacao"], "18/09/2024 (14:32) - Conhecido o recurso e não provido")
+        # Partes no formato da página de detalhes substituem a linha resumida
+        self.assertEqual(escolhido["partes"],
+                         "AGRAVANTE : J S DA S | AGRAVADO : MINISTÉRIO PÚBLICO DO ESTADO DE SÃO PAULO")
+        self.assertEqual(escolhido["link"], PDF_URL)
+
+    def test_partes_resumidas_sem_detalhes(self):
+        self.assertEqual(self.candidatos[0]["partes"], "PACIENTE: J S DA S")
+        self.assertEqual(self.candidatos[0]["link"], "")
+
+
+class TestPaginaNaoEncontrado(unittest.TestCase):
+    """page_nao_encontrado.html: mensagem 'Nenhum registro encontrado' com o formulário"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.doc = carregar("page_nao_encontrado.html")
+
+    def test_classificacao(self):
+        self.assertEqual(STJHttpEngine.classify(self.doc), "nao_encontrado")
+
+    def test_sem_candidatos(self):
+        self.assertEqual(STJHttpEngine.candidates(self.doc), [])
+
+    def test_pagina_desconhecida(self):
+        # Sem mensagem, lista ou detalhe: o item segue pelo navegador
+        self.assertIsNone(STJHttpEngine.classify(html.fromstring("<html><body><p>Manutenção</p></body></html>")))
+
+
+if __name__ == "__main__":
+    unittest.main()
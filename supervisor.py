@@ -0,0 +1,236 @@
+"""
+Supervisor: executa as varreduras STF e STJ ao mesmo tempo, num único processo
+Execute: python supervisor.py [--sem-janela]
+
+Cada robô roda na própria thread com o próprio navegador (os portais são de
+hosts diferentes), então o tempo total é o da varredura mais longa, não a soma.
+Os pacotes stf_automation/src e stj_automation/src são carregados com nomes
+próprios (stf_src, stj_src) para poderem conviver no mesmo interpretador.
+"""
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT_DIR = Path(__file__).parent
+
+# Robôs supervisionados: pacote carregado, diretório e classe da automação
+ROBOS = {
+    "STF": {"pacote": "stf_src", "pasta": ROOT_DIR / "stf_automation" / "src", "classe": "STFAutomation"},
+    "STJ": {"pacote": "stj_src", "pasta": ROOT_DIR / "stj_automation" / "src", "classe": "STJAutomation"},
+}
+
+logger = logging.getLogger("supervisor")
+
+
+def carregar_pacote(nome: str, pasta: Path):
+    """
+    Importa um diretório src/ como pacote com nome próprio
+
+    Args:
+        nome: Nome do pacote em sys.modules (ex: stf_src)
+        pasta: Diretório com o __init__.py
+
+    Returns:
+        Módulo do pacote
+    """
+    spec = importlib.util.spec_from_file_location(
+        nome, pasta / "__init__.py", submodule_search_locations=[str(pasta)]
+    )
+    pacote = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = pacote
+    spec.loader.exec_module(pacote)
+    return pacote
+
+
+class _VisaoRobo:
+    """Interface de ProgressWindow que repassa o progresso de um robô ao combinado"""
+
+    def __init__(self, combinado: "ProgressoCombinado", robo: str):
+        self.combinado = combinado
+        self.robo = robo
+
+    def start(self):
+        self.combinado.start()
+
+    def update(self, total=None, processed=None, current=None, action=None, status=None):
+        self.combinado.atualizar(self.robo, total=total, processed=processed, current=current,
+                                 action=action, status=status)
+
+    def complete(self, success=True):
+        self.combinado.atualizar(self.robo, status="Concluído" if success else "Falhou")
+
+    def close(self):
+        # A janela é do supervisor: fecha só quando todos terminarem
+        pass
+
+
+class ProgressoCombinado:
+    """
+    Soma o progresso dos robôs numa única janela e numa linha de log
+    no formato [processados/total], lida pelo server.js
+    """
+
+    def __init__(self, janela=None):
+        self.janela = janela
+        self._lock = threading.Lock()
+        self._estado: Dict[str, Dict[str, Any]] = {}
+        self._iniciada = False
+        self._ultima_linha = None
+
+    def visao(self, robo: str) -> _VisaoRobo:
+        with self._lock:
+            self._estado[robo] = {"total": 0, "processed": 0, "current": "", "status": "Inicializando..."}
+        return _VisaoRobo(self, robo)
+
+    def start(self):
+        with self._lock:
+            if self._iniciada:
+                return
+            self._iniciada = True
+        if self.janela:
+            self.janela.start()
+
+    def atualizar(self, robo: str, **campos):
+        with self._lock:
+            estado = self._estado[robo]
+            for chave, valor in campos.items():
+                if valor is not None:
+                    estado[chave] = valor
+            total = sum(e["total"] for e in self._estado.values())
+            processados = sum(e["processed"] for e in self._estado.values())
+            resumo = " | ".join(
+                f"{nome} {e['processed']}/{e['total']}" for nome, e in sorted(self._estado.items())
+            )
+            linha = f"[{processados}/{total}] {resumo}"
+            mudou = linha != self._ultima_linha
+            self._ultima_linha = linha
+
+        if self.janela:
+            self.janela.update(
+                total=total, processed=processados,
+                current=f"{robo}: {campos['current']}" if campos.get("current") else None,
+                action=f"{robo}: {campos['action']}" if campos.get("action") else None,
+                status=resumo,
+            )
+        if mudou and (campos.get("processed") is not None or campos.get("total") is not None):
+            print(f"Progresso combinado {linha}", flush=True)
+
+    def fechar(self, sucesso: bool):
+        if self.janela:
+            self.janela.complete(success=sucesso)
+            time.sleep(3)
+            self.janela.close()
+
+
+class Supervisor:
+    """Executa STFAutomation e STJAutomation lado a lado e consolida o relatório"""
+
+    def __init__(self, janela: bool = True):
+        self.pacotes = {robo: carregar_pacote(cfg["pacote"], cfg["pasta"]) for robo, cfg in ROBOS.items()}
+        self.mains = {robo: importlib.import_module(f"{cfg['pacote']}.main") for robo, cfg in ROBOS.items()}
+
+        # Um só destino de log: os loggers do STF têm handlers próprios, não repassam à raiz
+        logging.getLogger(ROBOS["STF"]["pacote"]).propagate = False
+
+        progress_window = importlib.import_module(f"{ROBOS['STJ']['pacote']}.progress_window")
+        self.progresso = ProgressoCombinado(progress_window.ProgressWindow("STF + STJ") if janela else None)
+        self.automacoes = {
+            robo: getattr(self.mains[robo], cfg["classe"])() for robo, cfg in ROBOS.items()
+        }
+        self.resultados: Dict[str, Dict[str, Any]] = {}
+
+    def _executar(self, robo: str):
+        """Roda a varredura completa de um robô (thread própria)"""
+        inicio = time.perf_counter()
+        erro: Optional[str] = None
+        try:
+            retorno = self.automacoes[robo].run(progresso=self.progresso.visao(robo))
+            sucesso = retorno is not False
+        except Exception as e:
+            logger.error(f"Robô {robo} terminou com erro: {e}")
+            sucesso, erro = False, str(e)
+        self.resultados[robo] = {
+            "sucesso": sucesso,
+            "erro": erro,
+            "segundos": time.perf_counter() - inicio,
+            "stats": self.automacoes[robo].stats,
+        }
+
+    def run(self) -> bool:
+        """
+        Executa os dois robôs em paralelo e imprime o relatório combinado
+
+        Returns:
+            True se os dois terminaram sem erro fatal
+        """
+        inicio = time.perf_counter()
+        logger.info("=" * 80)
+        logger.info(f"SUPERVISOR: STF + STJ em paralelo - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        logger.info("=" * 80)
+
+        # ChromeDriver resolvido uma vez antes das threads (os dois pacotes usam o mesmo cache)
+        importlib.import_module(f"{ROBOS['STJ']['pacote']}.driver_cache").resolve_chromedriver()
+
+        threads = [
+            threading.Thread(target=self._executar, args=(robo,), name=robo, daemon=True)
+            for robo in self.automacoes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # join com prazo para o Ctrl+C chegar ao processo principal
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+
+        total = time.perf_counter() - inicio
+        sucesso = all(r["sucesso"] for r in self.resultados.values())
+        self._print_report(total)
+        self.progresso.fechar(sucesso)
+        return sucesso
+
+    def _print_report(self, total: float):
+        """Relatório combinado: contadores de cada robô e tempo de parede contra a soma"""
+        print("\n" + "=" * 80)
+        print("📊 RELATÓRIO COMBINADO STF + STJ")
+        print("=" * 80)
+        print(f"  {'Robô':6s} {'Total':>7s} {'Sucesso':>8s} {'Não enc.':>9s} {'Erros':>7s} {'Tempo':>10s}")
+        soma = 0.0
+        for robo, resultado in sorted(self.resultados.items()):
+            stats = resultado["stats"]
+            soma += resultado["segundos"]
+            print(
+                f"  {robo:6s} {stats.get('total', 0):>7d} {stats.get('sucesso', 0):>8d} "
+                f"{stats.get('nao_encontrado', 0):>9d} {stats.get('erro', 0):>7d} "
+                f"{resultado['segundos']:>9.0f}s"
+            )
+            if resultado["erro"]:
+                print(f"         ✗ {resultado['erro']}")
+        print("-" * 80)
+        print(f"  Tempo total (paralelo):      {total:.0f}s")
+        print(f"  Soma dos tempos (em série):  {soma:.0f}s")
+        if total > 0:
+            print(f"  Ganho:                       {soma / total:.2f}x")
+        print("=" * 80 + "\n")
+
+
+def main():
+    """Função principal"""
+    try:
+        supervisor = Supervisor(janela="--sem-janela" not in sys.argv)
+        sys.exit(0 if supervisor.run() else 1)
+    except KeyboardInterrupt:
+        logger.warning("Supervisor interrompido pelo usuário")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Erro fatal no supervisor: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()